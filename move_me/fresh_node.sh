@@ -129,7 +129,7 @@ export DEBIAN_FRONTEND=noninteractive
 run "sudo apt-get update -y"
 sudo DEBIAN_FRONTEND=readline apt-get install -y hostapd batctl wget curl
 sudo DEBIAN_FRONTEND=readline apt-get install -y python3 python3-pip pipx
-sudo DEBIAN_FRONTEND=readline apt-get install -y aircrack-ng iperf3 network-manager alfred dnsmasq python3-flask
+sudo DEBIAN_FRONTEND=readline apt-get install -y aircrack-ng iperf3 network-manager alfred dnsmasq python3-flask python3-waitress
 
 # Load batman-adv kernel module & keep it persistent
 run "sudo modprobe -v batman_adv"
@@ -249,6 +249,7 @@ run "sudo systemctl enable NetworkManager.service"
 run "sudo systemctl enable dnsmasq"
 run "sudo systemctl enable alfred.service"
 run "sudo systemctl enable alfred-hostname.timer"
+run "sudo systemctl enable mesh-privhelper.service"
 run "sudo systemctl enable ogm-monitor.service"
 run "sudo systemctl unmask hostapd || true"
 
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ALFRED unix socket client
+-------------------------
+Talks the ALFRED TLV protocol directly to the local alfred daemon over
+/var/run/alfred.sock, replacing `alfred -r <type>` / `alfred -s <type>`
+(and alfred-json) with one socket round trip.
+
+    AlfredClient().request(64)          -> [AlfredRecord(mac, type, version, data)]
+    AlfredClient().push(64, b"node-1")
+    AlfredClient().hostnames()          -> {mac: hostname}
+
+CLI (same flags as alfred):
+    python3 alfred_client.py -r 64
+    echo -n "node-1" | python3 alfred_client.py -s 64
+    python3 alfred_client.py --set-hostname
+"""
+
+import os
+import socket
+import struct
+from typing import Dict, List, NamedTuple, Optional
+
+ALFRED_SOCK_PATH = "/var/run/alfred.sock"
+ALFRED_VERSION = 0
+
+# packet types
+ALFRED_PUSH_DATA = 0
+ALFRED_REQUEST = 2
+ALFRED_STATUS_TXEND = 3
+ALFRED_STATUS_ERROR = 4
+
+ALFRED_HOSTNAME_TYPE = 64
+
+_TLV = struct.Struct("!BBH")            # type, version, length
+_TX = struct.Struct("!HH")              # tx id, seqno
+_DATA_HDR = struct.Struct("!6sBBH")     # source mac, type, version, length
+_REQUEST = struct.Struct("!BBHBH")      # tlv + requested_type + tx_id
+
+
+class AlfredError(Exception):
+    pass
+
+
+class AlfredRecord(NamedTuple):
+    mac: str
+    type: int
+    version: int
+    data: bytes
+
+
+def _mac(b: bytes) -> str:
+    return ":".join(f"{x:02x}" for x in b)
+
+
+def pack_request(data_type: int, tx_id: int) -> bytes:
+    return _REQUEST.pack(ALFRED_REQUEST, ALFRED_VERSION, _REQUEST.size - _TLV.size, data_type, tx_id)
+
+
+def pack_push(data_type: int, data: bytes, tx_id: int, version: int = 0,
+              source: bytes = b"\0" * 6, seqno: int = 0) -> bytes:
+    """One push_data packet with a single data item (source left empty for the daemon)."""
+    body = _TX.pack(tx_id, seqno) + _DATA_HDR.pack(source, data_type, version, len(data)) + data
+    return _TLV.pack(ALFRED_PUSH_DATA, ALFRED_VERSION, len(body)) + body
+
+
+def parse_push_body(body: bytes) -> List[AlfredRecord]:
+    """Data items of one push_data packet (body = everything after the TLV header)."""
+    out: List[AlfredRecord] = []
+    off = _TX.size
+    while off + _DATA_HDR.size <= len(body):
+        src, dtype, ver, dlen = _DATA_HDR.unpack_from(body, off)
+        off += _DATA_HDR.size
+        if off + dlen > len(body):
+            break
+        out.append(AlfredRecord(_mac(src), dtype, ver, body[off:off + dlen]))
+        off += dlen
+    return out
+
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            break
+        buf += chunk
+    return bytes(buf)
+
+
+class AlfredClient:
+    def __init__(self, path: str = ALFRED_SOCK_PATH, timeout: float = 2.0) -> None:
+        self.path = path
+        self.timeout = timeout
+
+    def _connect(self) -> socket.socket:
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        s.settimeout(self.timeout)
+        try:
+            s.connect(self.path)
+        except Exception:
+            s.close()
+            raise
+        return s
+
+    def request(self, data_type: int) -> List[AlfredRecord]:
+        """All records of `data_type` known to the daemon (like `alfred -r`)."""
+        records: List[AlfredRecord] = []
+        with self._connect() as s:
+            s.sendall(pack_request(data_type, int.from_bytes(os.urandom(2), "big")))
+            while True:
+                hdr = _recv_exact(s, _TLV.size)
+                if len(hdr) < _TLV.size:
+                    break                       # daemon closes after the last record
+                ptype, _ver, length = _TLV.unpack(hdr)
+                body = _recv_exact(s, length)
+                if ptype == ALFRED_STATUS_ERROR:
+                    raise AlfredError(f"alfred returned an error for type {data_type}")
+                if ptype != ALFRED_PUSH_DATA:
+                    break
+                if len(body) < length:
+                    raise AlfredError("truncated alfred packet")
+                records.extend(parse_push_body(body))
+        return records
+
+    def push(self, data_type: int, data: bytes, version: int = 0) -> None:
+        """Publish `data` under `data_type` (like `alfred -s`)."""
+        with self._connect() as s:
+            s.sendall(pack_push(data_type, data, int.from_bytes(os.urandom(2), "big"), version))
+
+    def hostnames(self, data_type: int = ALFRED_HOSTNAME_TYPE) -> Dict[str, str]:
+        """{ mac_lower: hostname } from the hostname records (type 64)."""
+        mapping: Dict[str, str] = {}
+        for rec in self.request(data_type):
+            name = rec.data.decode("utf-8", "replace").rstrip("\x00\x0a\r").strip()
+            if name:
+                mapping[rec.mac] = name
+        return mapping
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    import sys
+
+    ap = argparse.ArgumentParser(description="Minimal ALFRED client (unix socket).")
+    ap.add_argument("-u", "--unix-path", default=ALFRED_SOCK_PATH)
+    g = ap.add_mutually_exclusive_group(required=True)
+    g.add_argument("-r", "--request", type=int, metavar="TYPE", help="print records of TYPE")
+    g.add_argument("-s", "--set-data", type=int, metavar="TYPE", help="publish stdin under TYPE")
+    g.add_argument("--set-hostname", action="store_true", help="publish this host's name (type 64)")
+    ap.add_argument("-V", "--req-version", type=int, default=0, help="data version for -s")
+    args = ap.parse_args(argv)
+
+    client = AlfredClient(args.unix_path)
+    try:
+        if args.request is not None:
+            for rec in client.request(args.request):
+                # gleiches Format wie `alfred -r`
+                value = "".join(chr(c) if 32 <= c < 127 and c not in (34, 92) else f"\\x{c:02x}"
+                                for c in rec.data)
+                print(f'{{ "{rec.mac}", "{value}" }},')
+        elif args.set_hostname:
+            client.push(ALFRED_HOSTNAME_TYPE, socket.gethostname().encode())
+        else:
+            client.push(args.set_data, sys.stdin.buffer.read(), args.req_version)
+    except (OSError, AlfredError) as e:
+        print(f"alfred: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
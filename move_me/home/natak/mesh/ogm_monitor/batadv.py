@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+batman-adv originator readers
+-----------------------------
+Two sources for the originator table, both returning `Originator` records:
+
+- BatadvReader: the batman-adv generic netlink family ("batadv"), i.e.
+  BATADV_CMD_GET_ORIGINATORS / GET_NEIGHBORS / GET_TRANSTABLE_GLOBAL,
+  straight from the kernel without spawning `batctl`
+- BatctlOriginatorTable / parse_batctl_originators(): text fallback for
+  `batctl o` output
+
+`parse_originator_messages()` decodes raw netlink buffers, so both paths can
+be compared on the same canned data.
+"""
+
+import socket
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import genl
+
+BATADV_GENL_NAME = "batadv"
+
+# commands
+BATADV_CMD_GET_ORIGINATORS = 8
+BATADV_CMD_GET_NEIGHBORS = 9
+BATADV_CMD_GET_TRANSTABLE_GLOBAL = 7
+
+# attributes
+BATADV_ATTR_MESH_IFINDEX = 3
+BATADV_ATTR_HARD_IFINDEX = 6
+BATADV_ATTR_HARD_IFNAME = 7
+BATADV_ATTR_ORIG_ADDRESS = 9
+BATADV_ATTR_TT_ADDRESS = 16
+BATADV_ATTR_TT_TTVN = 17
+BATADV_ATTR_TT_FLAGS = 21
+BATADV_ATTR_FLAG_BEST = 22
+BATADV_ATTR_LAST_SEEN_MSECS = 23
+BATADV_ATTR_NEIGH_ADDRESS = 24
+BATADV_ATTR_TQ = 25
+BATADV_ATTR_THROUGHPUT = 26        # kbit/s (BATMAN_V)
+BATADV_ATTR_TT_VID = 20
+
+
+@dataclass
+class Originator:
+    mac: str
+    last_seen: float = 0.0            # Sekunden
+    throughput: float = 0.0           # Mbit/s (BATMAN_V) bzw. TQ 0..255 (BATMAN_IV)
+    nexthop: str = ""
+    iface: str = ""                   # outgoing interface
+    tq: Optional[int] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        d: Dict[str, Any] = {"last_seen": self.last_seen, "throughput": self.throughput,
+                             "nexthop": self.nexthop}
+        if self.iface:
+            d["iface"] = self.iface
+        return d
+
+
+def _ifname(attrs: Dict[int, bytes]) -> str:
+    if BATADV_ATTR_HARD_IFNAME in attrs:
+        return genl.cstr(attrs[BATADV_ATTR_HARD_IFNAME])
+    if BATADV_ATTR_HARD_IFINDEX in attrs:
+        try:
+            return socket.if_indextoname(genl.u32(attrs[BATADV_ATTR_HARD_IFINDEX]))
+        except OSError:
+            pass
+    return ""
+
+
+def _originator(attrs: Dict[int, bytes]) -> Optional[Originator]:
+    if BATADV_ATTR_ORIG_ADDRESS not in attrs:
+        return None
+    o = Originator(mac=genl.mac(attrs[BATADV_ATTR_ORIG_ADDRESS]))
+    if BATADV_ATTR_NEIGH_ADDRESS in attrs:
+        o.nexthop = genl.mac(attrs[BATADV_ATTR_NEIGH_ADDRESS])
+    if BATADV_ATTR_LAST_SEEN_MSECS in attrs:
+        o.last_seen = genl.u32(attrs[BATADV_ATTR_LAST_SEEN_MSECS]) / 1000.0
+    if BATADV_ATTR_TQ in attrs:
+        o.tq = genl.u8(attrs[BATADV_ATTR_TQ])
+        o.throughput = float(o.tq)
+    if BATADV_ATTR_THROUGHPUT in attrs:
+        o.throughput = genl.u32(attrs[BATADV_ATTR_THROUGHPUT]) / 1000.0
+    o.iface = _ifname(attrs)
+    return o
+
+
+def originators_from_attrs(entries: List[Dict[int, bytes]],
+                           local_mac: Optional[str] = None) -> Dict[str, Originator]:
+    """Keep only the best route per originator (what `batctl o` marks with '*')."""
+    me = (local_mac or "").lower()
+    nodes: Dict[str, Originator] = {}
+    for attrs in entries:
+        if BATADV_ATTR_FLAG_BEST not in attrs:
+            continue
+        o = _originator(attrs)
+        if o is None or o.mac == me:
+            continue
+        nodes[o.mac] = o
+    return nodes
+
+
+def parse_originator_messages(data: bytes, local_mac: Optional[str] = None) -> Dict[str, Originator]:
+    """Decode a raw GET_ORIGINATORS dump buffer."""
+    entries = [genl.genl_attrs(m.payload) for m in genl.parse_messages(data)
+               if m.type >= 0x10 and genl.genl_cmd(m.payload) == BATADV_CMD_GET_ORIGINATORS]
+    return originators_from_attrs(entries, local_mac)
+
+
+class BatadvReader:
+    """Persistent batadv genl socket for one mesh interface (bat0)."""
+
+    def __init__(self, mesh_iface: str = "bat0", timeout: float = 2.0) -> None:
+        self.mesh_iface = mesh_iface
+        self.timeout = timeout
+        self._sock: Optional[genl.GenlSocket] = None
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def _dump(self, cmd: int) -> List[Dict[int, bytes]]:
+        if self._sock is None:
+            self._sock = genl.GenlSocket(self.timeout)
+        attrs = genl.pack_u32(BATADV_ATTR_MESH_IFINDEX, socket.if_nametoindex(self.mesh_iface))
+        try:
+            replies = self._sock.dump(BATADV_GENL_NAME, cmd, attrs)
+        except Exception:
+            self.close()
+            raise
+        return [genl.genl_attrs(m.payload) for m in replies]
+
+    def originators(self, local_mac: Optional[str] = None) -> Dict[str, Originator]:
+        return originators_from_attrs(self._dump(BATADV_CMD_GET_ORIGINATORS), local_mac)
+
+    def neighbors(self) -> List[Dict[str, Any]]:
+        out: List[Dict[str, Any]] = []
+        for a in self._dump(BATADV_CMD_GET_NEIGHBORS):
+            if BATADV_ATTR_NEIGH_ADDRESS not in a:
+                continue
+            n: Dict[str, Any] = {"mac": genl.mac(a[BATADV_ATTR_NEIGH_ADDRESS]), "iface": _ifname(a)}
+            if BATADV_ATTR_LAST_SEEN_MSECS in a:
+                n["last_seen"] = genl.u32(a[BATADV_ATTR_LAST_SEEN_MSECS]) / 1000.0
+            if BATADV_ATTR_THROUGHPUT in a:
+                n["throughput"] = genl.u32(a[BATADV_ATTR_THROUGHPUT]) / 1000.0
+            out.append(n)
+        return out
+
+    def transtable_global(self) -> List[Dict[str, Any]]:
+        out: List[Dict[str, Any]] = []
+        for a in self._dump(BATADV_CMD_GET_TRANSTABLE_GLOBAL):
+            if BATADV_ATTR_TT_ADDRESS not in a or BATADV_ATTR_FLAG_BEST not in a:
+                continue
+            e: Dict[str, Any] = {"client": genl.mac(a[BATADV_ATTR_TT_ADDRESS])}
+            if BATADV_ATTR_ORIG_ADDRESS in a:
+                e["originator"] = genl.mac(a[BATADV_ATTR_ORIG_ADDRESS])
+            if BATADV_ATTR_TT_VID in a:
+                vid = genl.u16(a[BATADV_ATTR_TT_VID])
+                e["vid"] = -1 if vid & 0x8000 == 0 else vid & 0x0FFF
+            if BATADV_ATTR_TT_TTVN in a:
+                e["ttvn"] = genl.u8(a[BATADV_ATTR_TT_TTVN])
+            if BATADV_ATTR_TT_FLAGS in a:
+                e["flags"] = genl.u32(a[BATADV_ATTR_TT_FLAGS])
+            out.append(e)
+        return out
+
+
+# ---------------------- text fallback ----------------------
+_BRACKETS = str.maketrans("()[]", "    ")
+_DEFAULT_COLUMNS = ("originator", "last-seen", "throughput", "nexthop", "outgoingif")
+_METRIC_COLUMNS = ("throughput", "#/255", "tq")
+
+
+class BatctlOriginatorTable:
+    """
+    Column-aware `batctl o` parser with persistent per-originator records.
+
+    The column order is taken from the header line, which differs between
+    versions and routing algorithms:
+
+        Originator  last-seen ( throughput)  Nexthop  [outgoingIF]      BATMAN_V
+        Originator  last-seen (#/255)        Nexthop  [outgoingIF]      BATMAN_IV
+        ...         [outgoingIF]:   Potential nexthops ...              old debugfs format
+
+    Without a header (`batctl o -H`) the default order applies. Each row is
+    split once (brackets blanked out) instead of running several regex
+    searches. Only best routes ('*') count; if an originator has several
+    (one per outgoing interface), the best metric wins.
+
+    `nodes` maps mac -> {last_seen, throughput, nexthop, iface} (the
+    Originator.as_dict() form); update() changes these records in place and
+    drops originators that disappeared.
+    """
+
+    def __init__(self, local_mac: Optional[str] = None) -> None:
+        self.local_mac = (local_mac or "").lower()
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.algo = ""                  # BATMAN_V | BATMAN_IV, aus dem Header
+        self.rows = 0                   # '*'-Zeilen des letzten update()
+        self._set_columns(_DEFAULT_COLUMNS)
+
+    def _set_columns(self, names) -> None:
+        cols = [n.lower().rstrip(":") for n in names]
+        metric = next((c for c in cols if c in _METRIC_COLUMNS), None)
+        if "originator" not in cols or "last-seen" not in cols or metric is None or "nexthop" not in cols:
+            cols, metric = list(_DEFAULT_COLUMNS), "throughput"
+        if metric != "throughput" and not self.algo:
+            self.algo = "BATMAN_IV"
+        # Zeilen haben vorne zusätzlich das '*'
+        base = cols.index("originator")
+        self._i_seen = cols.index("last-seen") - base + 1
+        self._i_metric = cols.index(metric) - base + 1
+        self._i_nh = cols.index("nexthop") - base + 1
+        self._i_if = cols.index("outgoingif") - base + 1 if "outgoingif" in cols else None
+        self._min_tokens = max(self._i_seen, self._i_metric, self._i_nh) + 1
+
+    def _cols(self):
+        return self._i_seen, self._i_metric, self._i_nh, self._i_if, self._min_tokens
+
+    def update(self, text: str) -> Dict[str, Dict[str, Any]]:
+        nodes = self.nodes
+        me = self.local_mac
+        best: Dict[str, float] = {}
+        rows = 0
+        cols = self._cols()
+        for line in text.splitlines():
+            s = line.lstrip()
+            if s[:1] != "*":
+                if s.startswith("Originator"):
+                    self._set_columns(s.translate(_BRACKETS).split())
+                    cols = self._cols()
+                elif s.startswith("[B.A.T.M.A.N."):
+                    self.algo = "BATMAN_IV" if "BATMAN_IV" in s else "BATMAN_V" if "BATMAN_V" in s else ""
+                continue
+            rows += 1
+            i_seen, i_metric, i_nh, i_if, min_tokens = cols
+            tok = s.translate(_BRACKETS).split()
+            if len(tok) < min_tokens:
+                continue
+            mac = tok[1].lower()
+            if len(mac) != 17 or mac == me:
+                continue
+            try:
+                last_seen = float(tok[i_seen].rstrip("s"))
+                metric = float(tok[i_metric])
+            except ValueError:
+                continue
+            if metric <= best.get(mac, -1.0):
+                continue
+            best[mac] = metric
+
+            rec = nodes.get(mac)
+            if rec is None:
+                rec = nodes[mac] = {}
+            rec["last_seen"] = last_seen
+            rec["throughput"] = metric
+            rec["nexthop"] = tok[i_nh].lower()
+            iface = tok[i_if].rstrip(":") if i_if is not None and len(tok) > i_if else ""
+            if iface:
+                rec["iface"] = iface
+            elif "iface" in rec:
+                del rec["iface"]
+
+        self.rows = rows
+        if len(nodes) != len(best):
+            for mac in [m for m in nodes if m not in best]:
+                del nodes[mac]
+        return nodes
+
+
+def parse_batctl_originators(text: str, local_mac: Optional[str] = None) -> Dict[str, Originator]:
+    """Parse `batctl o` output (only best routes, marked with '*')."""
+    table = BatctlOriginatorTable(local_mac)
+    table.update(text)
+    iv = table.algo == "BATMAN_IV"
+    return {mac: Originator(mac=mac, tq=int(d["throughput"]) if iv else None, **d)
+            for mac, d in table.nodes.items()}
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    ap = argparse.ArgumentParser(description="Show the originator table via batadv genl.")
+    ap.add_argument("--mesh-iface", default="bat0")
+    ap.add_argument("--compare", nargs=2, metavar=("BATCTL_TXT", "GENL_BIN"),
+                    help="compare a recorded `batctl o` output with a recorded GET_ORIGINATORS dump")
+    args = ap.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            text_nodes = parse_batctl_originators(f.read())
+        with open(args.compare[1], "rb") as f:
+            genl_nodes = parse_originator_messages(f.read())
+        diff = 0
+        for m in sorted(set(text_nodes) | set(genl_nodes)):
+            a = text_nodes[m].as_dict() if m in text_nodes else None
+            b = genl_nodes[m].as_dict() if m in genl_nodes else None
+            diff += a != b
+            print(f"{'ok  ' if a == b else 'DIFF'} {m} text={a} genl={b}")
+        raise SystemExit(1 if diff else 0)
+
+    nodes = BatadvReader(args.mesh_iface).originators()
+    print(json.dumps({m: o.as_dict() for m, o in nodes.items()}, indent=2))
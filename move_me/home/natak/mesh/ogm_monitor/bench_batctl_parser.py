@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark: BatctlOriginatorTable vs. the old per-line regex cascade
+------------------------------------------------------------------------
+Generates `batctl o` output for N originators with replay.SyntheticMesh
+(best route plus one alternative route per originator, as on meshes with
+several interfaces), checks that both parsers agree and times
+
+- legacy:  the former get_batman_nodes loop (regexes compiled on the fly,
+           fresh dict per node)
+- table:   BatctlOriginatorTable.update() on a persistent table, i.e. the
+           steady state in the monitor where records are updated in place
+
+Reports time per call and per input line. The per-line cost must stay
+roughly constant across sizes (linear scaling) and below --target-us,
+otherwise the exit code is 1.
+
+    python3 bench_batctl_parser.py
+    python3 bench_batctl_parser.py --originators 100 1000 5000 --target-us 2
+"""
+
+import argparse
+import re
+import sys
+import timeit
+from typing import Any, Dict
+
+from batadv import BatctlOriginatorTable
+from replay import SyntheticMesh
+
+
+def legacy_parse(out: str, local_mac: str) -> Dict[str, Dict[str, Any]]:
+    """The pre-batadv.py loop from get_batman_nodes (with the throughput padding fix)."""
+    nodes: Dict[str, Dict[str, Any]] = {}
+    for raw in out.splitlines():
+        line = raw.rstrip()
+        if " * " not in line:
+            continue
+        m_mac = re.search(r"([0-9A-Fa-f:]{17})", line)
+        if not m_mac:
+            continue
+        mac = m_mac.group(1).lower()
+        if local_mac and mac == local_mac.lower():
+            continue
+        m_seen = re.search(r"(\d+(?:\.\d+)?)s", line)
+        last_seen = float(m_seen.group(1)) if m_seen else 0.0
+        m_thr = re.search(r"\((\s*\d+(?:\.\d+)?)", line)
+        throughput = float(m_thr.group(1)) if m_thr else 0.0
+        after = line.split(")")[-1] if ")" in line else ""
+        m_nh = re.search(r"([0-9A-Fa-f:]{17})", after)
+        nexthop = m_nh.group(1).lower() if m_nh else ""
+        m_if = re.search(r"\[\s*([^\]\s]+)\s*\]", after)
+        nodes[mac] = {"last_seen": last_seen, "throughput": throughput, "nexthop": nexthop}
+        if m_if:
+            nodes[mac]["iface"] = m_if.group(1)
+    return nodes
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--originators", type=int, nargs="+", default=[1000, 5000])
+    ap.add_argument("--ifaces", nargs="+", default=["wlan0", "wlan1"])
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--target-us", type=float, default=3.0, help="max. table cost per line")
+    ap.add_argument("--max-skew", type=float, default=1.5,
+                    help="max. ratio of per-line cost between the largest and smallest size")
+    args = ap.parse_args()
+
+    print(f"{'origs':>6} {'lines':>7} {'regex ms':>9} {'table ms':>9} {'regex us/l':>10} "
+          f"{'table us/l':>10} {'speedup':>8}")
+    per_line = []
+    for n in args.originators:
+        mesh = SyntheticMesh(originators=n, ifaces=tuple(args.ifaces), seed=n)
+        text = mesh.batctl_o()
+        lines = text.count("\n")
+        table = BatctlOriginatorTable(mesh.local_mac)
+        if legacy_parse(text, mesh.local_mac) != table.update(text):
+            raise SystemExit(f"parser mismatch at {n} originators")
+
+        t_old = min(timeit.repeat(lambda: legacy_parse(text, mesh.local_mac), number=args.repeat, repeat=3))
+        t_new = min(timeit.repeat(lambda: table.update(text), number=args.repeat, repeat=3))
+        ms_old = t_old / args.repeat * 1000
+        ms_new = t_new / args.repeat * 1000
+        us_new = ms_new * 1000 / lines
+        per_line.append(us_new)
+        print(f"{n:>6} {lines:>7} {ms_old:>9.2f} {ms_new:>9.2f} {ms_old * 1000 / lines:>10.2f} "
+              f"{us_new:>10.2f} {ms_old / ms_new:>7.1f}x")
+
+    skew = max(per_line) / min(per_line)
+    ok = max(per_line) <= args.target_us and skew <= args.max_skew
+    print(f"per-line cost {min(per_line):.2f}..{max(per_line):.2f} us (target {args.target_us} us), "
+          f"skew {skew:.2f} (max {args.max_skew}) -> {'ok' if ok else 'FAIL'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark: station_parser vs. the old regex cascade
+---------------------------------------------------------
+Uses the recorded dump in samples/iw_station_dump.txt (or any dump given via
+--dump), replicates its Station blocks to N peers with distinct MACs and
+times both parsers. Both must produce identical metrics, otherwise the
+benchmark aborts.
+
+    python3 bench_station_parser.py
+    python3 bench_station_parser.py --peers 5 20 50 --repeat 200
+"""
+
+import argparse
+import os
+import re
+import timeit
+from typing import Any, Dict, List
+
+from station_parser import StationInfo, parse_station_dump
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DUMP = os.path.join(HERE, "samples", "iw_station_dump.txt")
+
+
+def _parse_bitrate_to_mbps(text: str):
+    m = re.search(r'(\d+(?:\.\d+)?)\s*MBit/s', text, re.IGNORECASE) or \
+        re.search(r'(\d+(?:\.\d+)?)\s*Mb/s', text, re.IGNORECASE)
+    return float(m.group(1)) if m else None
+
+
+def legacy_parse(out: str) -> Dict[str, Dict[str, Any]]:
+    """The pre-station_parser cascade from get_wifi_stations (logging removed)."""
+    stations: Dict[str, Dict[str, Any]] = {}
+    current_mac = None
+    block: Dict[str, Any] = {}
+    for raw in out.splitlines():
+        line = raw.strip()
+        m_station = re.search(r"\bStation\s+([0-9A-Fa-f:]{17})\b", line)
+        if m_station:
+            if current_mac is not None and block:
+                stations[current_mac] = block
+            current_mac = m_station.group(1).lower()
+            block = {}
+            continue
+        if current_mac is None:
+            continue
+        m = re.search(r"\bsignal:\s*(-?\d+(?:\.\d+)?)\s*(?:\[[^\]]+\])?\s*dBm\b", line, re.IGNORECASE)
+        if m:
+            block["signal_dbm"] = float(m.group(1))
+        m = re.search(r"\bsignal\s+avg:\s*(-?\d+(?:\.\d+)?)\s*(?:\[[^\]]+\])?\s*dBm\b", line, re.IGNORECASE)
+        if m and "signal_dbm" not in block:
+            block["signal_dbm"] = float(m.group(1))
+        m = re.search(r"\brx\s+packets:\s*(\d+)\b", line, re.IGNORECASE)
+        if m: block["rx_packets"] = int(m.group(1))
+        m = re.search(r"\brx\s+drop\s+misc:\s*(\d+)\b", line, re.IGNORECASE)
+        if m: block["rx_drop_misc"] = int(m.group(1))
+        m = re.search(r"\btx\s+packets:\s*(\d+)\b", line, re.IGNORECASE)
+        if m: block["tx_packets"] = int(m.group(1))
+        m = re.search(r"\btx\s+retries:\s*(\d+)\b", line, re.IGNORECASE)
+        if m: block["tx_retries"] = int(m.group(1))
+        m = re.search(r"\btx\s+failed:\s*(\d+)\b", line, re.IGNORECASE)
+        if m: block["tx_failed"] = int(m.group(1))
+        m = re.search(r"\btx\s+bitrate:\s*(.+)$", line, re.IGNORECASE)
+        if m:
+            v = _parse_bitrate_to_mbps(m.group(1))
+            if v is not None:
+                block["tx_bitrate_mbps"] = v
+        m = re.search(r"\brx\s+bitrate:\s*(.+)$", line, re.IGNORECASE)
+        if m:
+            v = _parse_bitrate_to_mbps(m.group(1))
+            if v is not None:
+                block["rx_bitrate_mbps"] = v
+    if current_mac is not None and block:
+        stations[current_mac] = block
+    return stations
+
+
+def new_parse(out: str) -> Dict[str, Dict[str, Any]]:
+    stations: Dict[str, Dict[str, Any]] = {}
+    for st in parse_station_dump(out):
+        block = st.as_dict()
+        if block:
+            stations[st.mac] = block
+    return stations
+
+
+def replicate(dump: str, peers: int) -> str:
+    """Repeat the recorded Station blocks until there are `peers` of them."""
+    blocks: List[str] = []
+    cur: List[str] = []
+    for line in dump.splitlines():
+        if line.startswith("Station ") and cur:
+            blocks.append("\n".join(cur))
+            cur = []
+        cur.append(line)
+    if cur:
+        blocks.append("\n".join(cur))
+    if not blocks:
+        raise SystemExit("dump contains no Station blocks")
+
+    out = []
+    for i in range(peers):
+        b = blocks[i % len(blocks)]
+        mac = "02:%02x:%02x:00:%02x:%02x" % ((i >> 24) & 0xff, (i >> 16) & 0xff, (i >> 8) & 0xff, i & 0xff)
+        out.append("Station " + mac + b[25:])
+    return "\n".join(out) + "\n"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--dump", default=DEFAULT_DUMP, help="recorded `iw station dump` output")
+    ap.add_argument("--peers", type=int, nargs="+", default=[3, 20, 50])
+    ap.add_argument("--repeat", type=int, default=100)
+    args = ap.parse_args()
+
+    with open(args.dump) as f:
+        dump = f.read()
+
+    print(f"{'peers':>6} {'lines':>6} {'regex ms':>10} {'parser ms':>10} {'speedup':>8}")
+    for n in args.peers:
+        text = replicate(dump, n)
+        old, new = legacy_parse(text), new_parse(text)
+        legacy_view = {mac: {k: v for k, v in d.items() if k in StationInfo.METRIC_KEYS}
+                       for mac, d in new.items()}
+        if old != legacy_view:
+            raise SystemExit(f"parser mismatch at {n} peers")
+
+        t_old = min(timeit.repeat(lambda: legacy_parse(text), number=args.repeat, repeat=3))
+        t_new = min(timeit.repeat(lambda: new_parse(text), number=args.repeat, repeat=3))
+        ms_old = t_old / args.repeat * 1000
+        ms_new = t_new / args.repeat * 1000
+        print(f"{n:>6} {text.count(chr(10)):>6} {ms_old:>10.3f} {ms_new:>10.3f} {ms_old / ms_new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
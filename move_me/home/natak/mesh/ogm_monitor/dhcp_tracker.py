@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DHCP client tracker
+-------------------
+Active DHCP clients for /api/dhcp-leases without re-reading the lease file
+or spawning `ip neigh` / `iw station dump` on every request:
+
+- dnsmasq.leases: inotify on its directory, re-parsed only when the file
+  changed (inode, mtime, size); without inotify it is stat'ed every
+  LEASE_POLL_SEC instead
+- neighbor table of the LAN bridge: one RTM_GETNEIGH dump, then
+  RTMGRP_NEIGH events (REACHABLE -> STALE etc. are notified by the kernel)
+- AP associations: one nl80211 station dump, then NEW/DEL_STATION events
+  of the "mlme" multicast group
+
+One thread select()s on the three sockets and rebuilds the result after
+each batch of changes and when the next lease expires. snapshot() returns
+the current (version, payload) without any work; `version` only changes
+when the payload does. Every RESYNC_SEC both dumps are repeated, in case
+events were lost (ENOBUFS under load).
+
+A client is active if it has a valid lease (expiry in the future, 0 =
+infinite) and is associated with the AP or has a REACHABLE / DELAY / PROBE
+neighbor entry on the bridge (same rule as the old per-request code).
+
+    python3 dhcp_tracker.py      # print the active clients on every change
+"""
+
+import ctypes
+import os
+import select
+import socket
+import struct
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import genl
+import nl80211
+from events import (NL80211_MCGRP_MLME, NUD_DELAY, NUD_PROBE, NUD_REACHABLE, RTMGRP_NEIGH,
+                    dump_neigh, parse_neigh, parse_nl80211_events)
+
+LEASE_FILE = "/var/lib/misc/dnsmasq.leases"
+NEIGH_ACTIVE = NUD_REACHABLE | NUD_DELAY | NUD_PROBE
+
+# inotify(7)
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+_IN_EVENT = struct.Struct("iIII")          # wd, mask, cookie, len
+
+
+def parse_leases(text: str) -> List[Dict[str, str]]:
+    """dnsmasq.leases -> [{expires, mac, ip, hostname}] (as read_dhcp_leases in app.py)."""
+    leases = []
+    for line in text.splitlines():
+        parts = line.split()
+        # ts, mac, ip, hostname, clientid?
+        if len(parts) >= 4:
+            leases.append({"expires": parts[0], "mac": parts[1], "ip": parts[2],
+                           "hostname": parts[3] if parts[3] != "*" else ""})
+    return leases
+
+
+class FileWatch:
+    """inotify on the parent directory (dnsmasq rewrites in place, others replace the file)."""
+
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self, path: str) -> None:
+        libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1: {os.strerror(err)}")
+        if libc.inotify_add_watch(self.fd, os.fsencode(os.path.dirname(path) or "."), self.MASK) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, f"inotify_add_watch {path}: {os.strerror(err)}")
+        self.name = os.fsencode(os.path.basename(path))
+
+    def fileno(self) -> int:
+        return self.fd
+
+    def read(self) -> bool:
+        """Drain pending events; True if one of them concerns the file."""
+        hit = False
+        while True:
+            try:
+                data = os.read(self.fd, 4096)
+            except BlockingIOError:
+                return hit
+            off = 0
+            while off + _IN_EVENT.size <= len(data):
+                _wd, mask, _cookie, nlen = _IN_EVENT.unpack_from(data, off)
+                name = data[off + _IN_EVENT.size:off + _IN_EVENT.size + nlen].rstrip(b"\0")
+                off += _IN_EVENT.size + nlen
+                if mask & IN_Q_OVERFLOW or name == self.name:
+                    hit = True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class LeaseTracker:
+    """Background thread; snapshot() is safe to call from any thread."""
+
+    RESYNC_SEC = 60.0
+    RETRY_SEC = 5.0
+    LEASE_POLL_SEC = 2.0
+
+    def __init__(self, lease_file: str = LEASE_FILE, lan_iface: str = "br0", ap_iface: str = "wlan0",
+                 log: Callable[[str], None] = print) -> None:
+        self.lease_file = lease_file
+        self.lan_iface = lan_iface
+        self.ap_iface = ap_iface
+        self.log = log
+        self.counters = {"lease_reads": 0, "neigh_events": 0, "station_events": 0,
+                         "resyncs": 0, "updates": 0, "errors": 0}
+        self._snapshot: Tuple[int, Dict[str, Any]] = (0, {"leases": [], "active_leases": [],
+                                                         "active_clients": 0})
+        self._leases: List[Dict[str, str]] = []
+        self._lease_key = None
+        self._neigh: Dict[str, Tuple[str, int]] = {}     # IP -> (mac, NUD-State)
+        self._wifi: Set[str] = set()
+        self._lan_index = 0
+        self._next_expiry = float("inf")
+        self._running = False
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    # ---------- öffentliche API ----------
+    def start(self, wait: float = 2.0) -> "LeaseTracker":
+        """Start once (further calls are no-ops); the first call waits up to `wait` s for a result."""
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, daemon=True, name="dhcp-tracker")
+                    self._thread.start()
+                    self._ready.wait(wait)
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def running(self) -> bool:
+        """True while the sockets are open and the snapshot is current."""
+        return self._running
+
+    def snapshot(self) -> Tuple[int, Dict[str, Any]]:
+        """(version, {leases, active_leases, active_clients}); the payload must not be modified."""
+        return self._snapshot
+
+    # ---------- Quellen ----------
+    def _read_leases(self) -> bool:
+        try:
+            st = os.stat(self.lease_file)
+            key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        except OSError:
+            key = None
+        if key == self._lease_key:
+            return False
+        self._lease_key = key
+        try:
+            with open(self.lease_file) as f:
+                self._leases = parse_leases(f.read())
+        except OSError:
+            self._leases = []
+        self.counters["lease_reads"] += 1
+        return True
+
+    def _apply_neigh(self, entries) -> bool:
+        changed = False
+        for n in entries:
+            if n.ifindex != self._lan_index:
+                continue
+            if n.deleted:
+                changed |= self._neigh.pop(n.addr, None) is not None
+            elif self._neigh.get(n.addr) != (n.mac, n.state):
+                self._neigh[n.addr] = (n.mac, n.state)
+                changed = True
+        return changed
+
+    def _resync(self, collector: nl80211.Nl80211StationCollector) -> None:
+        self.counters["resyncs"] += 1
+        self._read_leases()
+        try:
+            self._lan_index = socket.if_nametoindex(self.lan_iface)
+        except OSError:
+            self._lan_index = 0
+        self._neigh = {}
+        if self._lan_index:
+            rsock = genl.NetlinkSocket(genl.NETLINK_ROUTE)
+            try:
+                self._apply_neigh(dump_neigh(rsock))
+            finally:
+                rsock.close()
+        try:
+            self._wifi = {st.mac.lower() for st in collector.stations(self.ap_iface)}
+        except OSError:
+            self._wifi = set()          # kein AP-Interface / kein nl80211
+
+    def _open(self):
+        rsock = genl.NetlinkSocket(genl.NETLINK_ROUTE, timeout=None, groups=RTMGRP_NEIGH)
+        gsock, fam_id = None, 0
+        try:
+            gsock = genl.GenlSocket(timeout=None)
+            gsock.subscribe(nl80211.NL80211_GENL_NAME, NL80211_MCGRP_MLME)
+            fam_id = gsock.family(nl80211.NL80211_GENL_NAME).id
+        except OSError as e:
+            if gsock is not None:
+                gsock.close()
+            gsock = None
+            self.log(f"dhcp-tracker: nl80211 events unavailable ({e}), stations only on resync")
+        try:
+            watch = FileWatch(self.lease_file)
+        except OSError as e:
+            watch = None
+            self.log(f"dhcp-tracker: {e}; polling the lease file every {self.LEASE_POLL_SEC}s")
+        return rsock, gsock, fam_id, watch
+
+    # ---------- Ergebnis ----------
+    def _publish(self) -> None:
+        now = time.time()
+        neigh_active = {mac for mac, state in self._neigh.values() if mac and state & NEIGH_ACTIVE}
+        leases, active, next_expiry = [], [], float("inf")
+        for lease in self._leases:
+            lease = dict(lease)
+            leases.append(lease)
+            exp = int(lease["expires"]) if lease["expires"].isdigit() else -1
+            if exp > now:
+                next_expiry = min(next_expiry, exp)
+            elif exp != 0:
+                continue
+            mac = lease["mac"].lower()
+            if mac in self._wifi:
+                lease["adapter"] = "wlan"
+            elif mac in neigh_active:
+                lease["adapter"] = "ethernet"
+            else:
+                continue
+            active.append(lease)
+        self._next_expiry = next_expiry
+        payload = {"leases": leases, "active_leases": active,
+                   "active_clients": len({l["mac"].lower() for l in active})}
+        version, current = self._snapshot
+        if payload != current:
+            self._snapshot = (version + 1, payload)
+            self.counters["updates"] += 1
+        self._ready.set()
+
+    def _loop(self) -> None:
+        collector = nl80211.Nl80211StationCollector()
+        while not self._stop.is_set():
+            try:
+                rsock, gsock, fam_id, watch = self._open()
+            except Exception as e:
+                self.counters["errors"] += 1
+                self.log(f"dhcp-tracker: netlink unavailable: {e}; retry in {self.RETRY_SEC}s")
+                self._stop.wait(self.RETRY_SEC)
+                continue
+            fds = [s for s in (rsock.sock, gsock.sock if gsock else None, watch) if s is not None]
+            try:
+                # Events erst abonnieren, dann dumpen: nichts geht zwischen Dump und Events verloren
+                self._resync(collector)
+                next_resync = time.monotonic() + self.RESYNC_SEC
+                self._publish()
+                self._running = True
+                while not self._stop.is_set():
+                    timeout = min(next_resync - time.monotonic(), self._next_expiry - time.time() + 0.5)
+                    if watch is None:
+                        timeout = min(timeout, self.LEASE_POLL_SEC)
+                    ready, _, _ = select.select(fds, [], [], max(0.0, timeout))
+                    changed = False
+                    for s in ready:
+                        if s is watch:
+                            changed |= watch.read() and self._read_leases()
+                        elif s is rsock.sock:
+                            entries = parse_neigh(genl.parse_messages(s.recv(genl.NetlinkSocket.RCVBUF)))
+                            self.counters["neigh_events"] += len(entries)
+                            changed |= self._apply_neigh(entries)
+                        else:
+                            for ev in parse_nl80211_events(s.recv(genl.NetlinkSocket.RCVBUF), fam_id):
+                                if ev.iface != self.ap_iface:
+                                    continue
+                                self.counters["station_events"] += 1
+                                if ev.kind == "station_new":
+                                    self._wifi.add(ev.mac.lower())
+                                else:
+                                    self._wifi.discard(ev.mac.lower())
+                                changed = True
+                    if watch is None:
+                        changed |= self._read_leases()
+                    if time.monotonic() >= next_resync:
+                        self._resync(collector)
+                        next_resync = time.monotonic() + self.RESYNC_SEC
+                        changed = True
+                    if changed or time.time() >= self._next_expiry:
+                        self._publish()
+            except Exception as e:
+                # z. B. ENOBUFS bei Event-Stürmen -> neu abonnieren und dumpen
+                self.counters["errors"] += 1
+                self.log(f"dhcp-tracker: {e}; resubscribing")
+                time.sleep(0.2)
+            finally:
+                self._running = False
+                rsock.close()
+                if gsock is not None:
+                    gsock.close()
+                if watch is not None:
+                    watch.close()
+        collector.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Print the active DHCP clients on every change.")
+    ap.add_argument("--leases", default=LEASE_FILE)
+    ap.add_argument("--lan", default="br0")
+    ap.add_argument("--ap", default="wlan0")
+    args = ap.parse_args()
+
+    tracker = LeaseTracker(args.leases, args.lan, args.ap).start()
+    seen = -1
+    try:
+        while True:
+            version, payload = tracker.snapshot()
+            if version != seen:
+                seen = version
+                print(f"{time.strftime('%H:%M:%S')} v{version} active {payload['active_clients']}/"
+                      f"{len(payload['leases'])}: " +
+                      ", ".join(f"{l['ip']} {l['mac']} ({l['adapter']})" for l in payload["active_leases"]),
+                      flush=True)
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
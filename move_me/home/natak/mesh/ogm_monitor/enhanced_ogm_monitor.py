@@ -3,59 +3,360 @@
 """
 Enhanced OGM Monitor (diagnostic & robust)
 ------------------------------------------
-- Reads B.A.T.M.A.N. advanced originators via `batctl o`
-- Reads Wi‑Fi peer metrics via `iw dev <iface> station dump`
-- Merges by Originator MAC or Next-Hop MAC
-- Writes JSON to /home/natak/mesh/ogm_monitor/node_status.json
-
-This version adds *extra tolerant regexes* and *detailed logging* so you can
-see exactly what was parsed for each Station block.
+- Reads B.A.T.M.A.N. advanced originators via batman-adv generic netlink
+  (see batadv.py), falling back to `batctl o`
+- Reads Wi‑Fi peer metrics of all radios concurrently (batman-adv hard
+  interfaces and other 802.11 interfaces, discovered via sysfs) via
+  `iw dev <iface> station dump` or directly via nl80211 netlink
+  (OGM_STATION_BACKEND=nl80211|auto, see nl80211.py)
+- Reads ALFRED hostnames (type 64) over the alfred unix socket
+  (alfred_client.py), falling back to alfred-json / `alfred -r 64`
+- Optionally follows nl80211 station join/leave and rtnetlink link/neighbor
+  events (OGM_EVENT_MODE, see events.py): membership changes are applied
+  within milliseconds, counters are refreshed on a relaxed timer
+- Merges by Next-Hop MAC on the originator's outgoing interface (falling
+  back to Originator / Next-Hop MAC on any radio)
+- Keeps a bounded in-memory history per neighbor and adds retry/failure
+  ratios and rx drop rates (see history.py)
+- Ticks on a drift-free time.monotonic deadline grid (OGM_POLL_INTERVAL,
+  sub-second allowed); overrunning ticks skip missed slots instead of
+  queueing, period/jitter/overruns go to the stats (see scheduler.py)
+- Keeps latency histograms per collector/phase and subprocess/byte counters
+  in /run/ogm_monitor/stats.json; `kill -USR1` writes a sampling profile to
+  /run/ogm_monitor/profile.txt (see profiling.py)
+- Records signal/throughput/retry ratio per neighbor into persistent,
+  downsampled ring files for up to 30 days (see tsdb.py)
+- Maintains a mesh topology graph from the neighbor/originator tables and
+  batadv-vis data (ALFRED type 1), written to /run/ogm_monitor/topology.json
+  (see topology.py)
+- Publishes every written payload as a versioned snapshot in shared memory
+  (/dev/shm/ogm_status, see snapshot.py) for the web app
+- Writes compact JSON to /run/ogm_monitor/node_status.json (tmpfs) only when
+  something changed, with periodic checkpoints to
+  /home/natak/mesh/ogm_monitor/node_status.json (see status_writer.py)
+
+Station blocks are parsed in a single pass (see station_parser.py). Set
+OGM_DEBUG=1 to log exactly what was parsed for each Station block.
 
 Run as root (recommended):
     sudo python3 enhanced_ogm_monitor.py
 
-Or grant capability to iw to avoid sudo prompts:
-    sudo setcap cap_net_admin+ep /usr/sbin/iw
+Without root, iw / batctl / alfred run through the privileged helper
+(mesh-privhelper.service, see privhelper.py) over one persistent socket.
+There is no sudo fallback (the sudoers file no longer allows these tools):
+if the helper is not running, those collectors fail and keep their last
+good result until it is back.
 """
 
 import json
 import os
+import queue
 import re
+import signal
 import subprocess
 import time
 import glob
-import fcntl, sys
-import tempfile
-from typing import Dict, Any, List, Optional
+import fcntl, sys, threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+
+from station_parser import StationInfo, parse_station_dump
+from nl80211 import Nl80211StationCollector
+from events import Event, EventListener
+from scheduler import DeadlineScheduler
+from privhelper import HELPER_SOCK, HelperUnavailable, PrivHelperClient
+from batadv import BatadvReader, BatctlOriginatorTable, Originator
+from alfred_client import ALFRED_SOCK_PATH, AlfredClient
+from status_writer import StatusWriter, atomic_write
+from history import HistoryServer, HistoryStore
+from snapshot import SHM_PATH, SnapshotPublisher
+from profiling import PROFILE_FILE, STATS_FILE, SamplingProfiler, Stats
+from topology import ALFRED_VIS_TYPE, ALFRED_VIS_VERSION, TOPOLOGY_FILE, Topology, parse_vis
+from tsdb import (DEFAULT_METRICS as TSDB_DEFAULT_METRICS, FLUSH_INTERVAL_SEC as TSDB_FLUSH_INTERVAL_SEC,
+                  TSDB_DIR, TSDB_RUNTIME_DIR, TimeSeriesStore)
+
+
+class CollectorSpec(NamedTuple):
+    method: str        # Name der Collector-Methode
+    interval: float    # wie oft neu abfragen (s)
+    ttl: float         # wie lange ein Ergebnis ohne Refresh gültig bleibt (s)
+    deadline: float    # max. Wartezeit im Tick (s)
 
 
 class EnhancedOGMMonitor:
     # --- Configuration ---
     STATUS_FILE = "/home/natak/mesh/ogm_monitor/node_status.json"
-    WIFI_IFACES: List[str] = ["wlan1", "mesh0", "wlan0"]
-    POLL_INTERVAL_SEC = 1
+    # tmpfs-Ziel für die sekündlichen Writes; STATUS_FILE bekommt nur Checkpoints.
+    # Leer -> direkt nach STATUS_FILE schreiben (mit fsync).
+    RUNTIME_STATUS_FILE = os.environ.get("OGM_RUNTIME_STATUS_FILE", "/run/ogm_monitor/node_status.json")
+    CHECKPOINT_INTERVAL_SEC = 300
+    STATUS_MAX_QUIET_SEC = 10        # spätestens dann neu schreiben (frischer timestamp)
+    STATUS_DEADBANDS: Optional[Dict[str, float]] = None   # None -> status_writer.DEFAULT_DEADBANDS
+    # jede geschriebene Payload zusätzlich als Snapshot in Shared Memory (Web-App);
+    # leer -> aus
+    SNAPSHOT_PATH = os.environ.get("OGM_SNAPSHOT_PATH", SHM_PATH)
+    # Verlauf pro Nachbar im RAM (Ringpuffer), Abfrage über Unix-Socket
+    HISTORY_WINDOW_SEC = 600
+    HISTORY_MAX_NEIGHBORS = 128
+    HISTORY_RATE_WINDOW_SEC = 10
+    HISTORY_SOCK = "/run/ogm_monitor/history.sock"
+    # Langzeitverlauf auf Platte (mmap-Ringdateien, 1s/1h, 10s/24h, 1min/30d).
+    # Leer -> aus. Die 1s-Stufe liegt im tmpfs (TSDB_RUNTIME_DIR, leer -> auch
+    # auf Platte), die gröberen werden nur alle TSDB_FLUSH_INTERVAL_SEC geschrieben.
+    TSDB_DIR = os.environ.get("OGM_TSDB_DIR", TSDB_DIR)
+    TSDB_RUNTIME_DIR = os.environ.get("OGM_TSDB_RUNTIME_DIR", TSDB_RUNTIME_DIR)
+    TSDB_FLUSH_INTERVAL_SEC = TSDB_FLUSH_INTERVAL_SEC
+    TSDB_METRICS = TSDB_DEFAULT_METRICS
+    TSDB_PRUNE_INTERVAL_SEC = 3600
+    # Laufzeit-Statistik (Histogramme pro Phase/Collector) und SIGUSR1-Profiler
+    STATS_FILE = os.environ.get("OGM_STATS_FILE", STATS_FILE)
+    STATS_INTERVAL_SEC = 10
+    PROFILE_FILE = PROFILE_FILE
+    PROFILE_DURATION_SEC = float(os.environ.get("OGM_PROFILE_SEC", "10"))
+    # Funk-Interfaces für Station-Dumps. Leer -> automatisch: batman-adv
+    # Hard-Interfaces von MESH_IFACE (sysfs, sonst `batctl if`), dann alle
+    # übrigen 802.11-Interfaces (z. B. AP). OGM_WIFI_IFACES=wlan1,wlan2 erzwingt.
+    WIFI_IFACES: List[str] = [i for i in os.environ.get("OGM_WIFI_IFACES", "").split(",") if i]
+    WIFI_IFACES_FALLBACK: List[str] = ["wlan1", "mesh0", "wlan0"]
+    IFACE_DISCOVERY_SEC = 30
+    # Tick-Periode (Deadline-Raster auf time.monotonic, siehe scheduler.py);
+    # < 1 s für hochauflösende Fehlersuche, z. B. OGM_POLL_INTERVAL=0.2
+    POLL_INTERVAL_SEC = float(os.environ.get("OGM_POLL_INTERVAL", "1"))
+    MIN_POLL_INTERVAL_SEC = 0.05
+    # Netlink-Events (nl80211 NEW/DEL_STATION, rtnetlink link/neigh): "on", "off"
+    # oder "auto" (an, falls abonnierbar). Mit Events kommen Stationen sofort,
+    # die Zähler (Bitrate, Retries) nur noch alle EVENT_STATION_INTERVAL_SEC.
+    EVENT_MODE = os.environ.get("OGM_EVENT_MODE", "auto")
+    EVENT_STATION_INTERVAL_SEC = 5
+    # Zusatz-Ticks durch Events höchstens alle EVENT_MIN_GAP_SEC (Events dazwischen sammeln)
+    EVENT_MIN_GAP_SEC = float(os.environ.get("OGM_EVENT_MIN_GAP_SEC", "0.2"))
     LOG_PREFIX = "[ogm]"
+    DEBUG = os.environ.get("OGM_DEBUG", "") == "1"   # per-station Logging
+    # Station-Quelle: "iw" (Text, Subprozess), "nl80211" (Netlink direkt)
+    # oder "auto" (nl80211, bei Fehler Rückfall auf iw)
+    STATION_BACKEND = os.environ.get("OGM_STATION_BACKEND", "iw")
+    # Originator-Quelle: "genl" (batman-adv Netlink), "batctl" (Text) oder "auto"
+    BATMAN_BACKEND = os.environ.get("OGM_BATMAN_BACKEND", "auto")
+    MESH_IFACE = "bat0"
+    ALFRED_SOCK = ALFRED_SOCK_PATH
+    SUBPROCESS_TIMEOUT_SEC = 3
+    # privilegierter Helper (nur ohne root genutzt); leer -> ohne root keine iw/batctl/alfred-Aufrufe
+    PRIV_HELPER_SOCK = os.environ.get("OGM_PRIV_HELPER_SOCK", HELPER_SOCK)
+    # Refresh-Plan pro Quelle. Fällige Collector laufen parallel; zwischen den
+    # Refreshes (oder wenn einer scheitert/hängt) wird das letzte gute Ergebnis
+    # bis zu seiner TTL weiterverwendet.
+    COLLECTORS: Dict[str, CollectorSpec] = {
+        "nodes":    CollectorSpec("get_batman_nodes",       1,  10, 2.0),
+        "stations": CollectorSpec("get_wifi_stations",      1,  10, 2.0),
+        "hosts":    CollectorSpec("read_alfred_hostnames", 30, 600, 3.0),
+        "power":    CollectorSpec("read_power_info",       60, 600, 1.0),
+        "neighbors": CollectorSpec("get_batman_neighbors", 10,  60, 2.0),
+        "vis":      CollectorSpec("read_alfred_vis",       30, 120, 3.0),
+    }
+    # Mesh-Topologie (eigene Nachbarn/Originatoren + batadv-vis via ALFRED),
+    # nach Änderungen höchstens alle TOPOLOGY_WRITE_SEC nach TOPOLOGY_FILE
+    TOPOLOGY_FILE = TOPOLOGY_FILE
+    TOPOLOGY_WRITE_SEC = 5
+    TOPOLOGY_LINK_TTL_SEC = 120
+
+    LOCK_FILE = "/tmp/ogm_monitor.lock"            # leer -> keine Instanz-Sperre (replay.py)
+    POWER_SUPPLY_DIR = "/sys/class/power_supply"
 
     def __init__(self) -> None:
-        self._lockf = open("/tmp/ogm_monitor.lock", "w")
+        self._acquire_lock()
+        self.local_mac = self._get_local_mac()
+        self._nl80211: Dict[str, Nl80211StationCollector] = {}   # eigener Socket pro Interface
+        self._iface_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ogm-if")
+        self._ifaces: List[str] = []
+        self._ifaces_at = -1e9                      # monotonic
+        self._batadv: Optional[BatadvReader] = None
+        self._batadv_neigh: Optional[BatadvReader] = None     # eigener Socket, läuft parallel
+        self._batctl_table = BatctlOriginatorTable(self.local_mac)
+        self._batman_metric = "tput"                # "tq" unter BATMAN_IV (Originator-"throughput" = TQ)
+        self._helper: Optional[PrivHelperClient] = None
+        if self.PRIV_HELPER_SOCK and os.geteuid() != 0:
+            self._helper = PrivHelperClient(self.PRIV_HELPER_SOCK, timeout=self.SUBPROCESS_TIMEOUT_SEC + 1)
+        self._topology = Topology(self.TOPOLOGY_LINK_TTL_SEC)
+        self._topology_written = (-1, 0.0)                    # (version, monotonic)
+        self._topology_vis_at: Optional[float] = None
+        self._pool = ThreadPoolExecutor(max_workers=len(self.COLLECTORS), thread_name_prefix="ogm")
+        self._inflight: Dict[str, Future] = {}
+        self._last_good: Dict[str, Any] = {}
+        self._last_ok: Dict[str, float] = {}        # wall clock of last good result
+        self._last_error: Dict[str, str] = {}
+        self._next_due: Dict[str, float] = {}       # monotonic
+        self._alfred_backend: Optional[str] = None  # "socket" | "json" | "text", zuletzt erfolgreich
+        self._alfred = AlfredClient(self.ALFRED_SOCK)
+        self._stats = Stats()
+        self._stats_written = 0.0                   # monotonic
+        self._profiler = SamplingProfiler(self.PROFILE_FILE, self.PROFILE_DURATION_SEC)
+        runtime = self.RUNTIME_STATUS_FILE or None
+        if runtime:
+            try:
+                os.makedirs(os.path.dirname(runtime), exist_ok=True)
+            except OSError as e:
+                print(f"{self.LOG_PREFIX} no runtime dir for {runtime} ({e}); writing {self.STATUS_FILE} directly")
+                runtime = None
+        self._snapshot: Optional[SnapshotPublisher] = None
+        if self.SNAPSHOT_PATH:
+            try:
+                self._snapshot = SnapshotPublisher(self.SNAPSHOT_PATH)
+            except OSError as e:
+                print(f"{self.LOG_PREFIX} snapshot {self.SNAPSHOT_PATH} disabled: {e}")
+        self._writer = StatusWriter(self.STATUS_FILE, runtime,
+                                    checkpoint_interval=self.CHECKPOINT_INTERVAL_SEC,
+                                    max_quiet=self.STATUS_MAX_QUIET_SEC,
+                                    deadbands=self.STATUS_DEADBANDS,
+                                    stats=self._stats,
+                                    publish=self._snapshot.publish if self._snapshot else None)
+        self.POLL_INTERVAL_SEC = max(self.MIN_POLL_INTERVAL_SEC, self.POLL_INTERVAL_SEC)
+        if self.POLL_INTERVAL_SEC < 1:
+            # Sekunden-Collector laufen im schnelleren Takt mit
+            self.COLLECTORS = {n: spec._replace(interval=self.POLL_INTERVAL_SEC) if 0 < spec.interval <= 1 else spec
+                               for n, spec in self.COLLECTORS.items()}
+        self._scheduler = DeadlineScheduler(self.POLL_INTERVAL_SEC, stats=self._stats)
+        # Sample-Anzahl wie bei 1 s; im Sub-Sekunden-Takt wird das Fenster entsprechend kürzer
+        self._history = HistoryStore(self.HISTORY_WINDOW_SEC, max(1.0, self.POLL_INTERVAL_SEC),
+                                     max_neighbors=self.HISTORY_MAX_NEIGHBORS,
+                                     rate_window=self.HISTORY_RATE_WINDOW_SEC)
+        self._history_server: Optional[HistoryServer] = None
+        if self.HISTORY_SOCK:
+            try:
+                self._history_server = HistoryServer(self._history, self.HISTORY_SOCK).start()
+            except OSError as e:
+                print(f"{self.LOG_PREFIX} history socket disabled: {e}")
+        self._tsdb: Optional[TimeSeriesStore] = None
+        self._tsdb_pruned = 0.0
+        if self.TSDB_DIR:
+            self._tsdb = TimeSeriesStore(self.TSDB_DIR, metrics=self.TSDB_METRICS,
+                                         runtime_root=self.TSDB_RUNTIME_DIR,
+                                         flush_interval=self.TSDB_FLUSH_INTERVAL_SEC)
+        self._events: "queue.SimpleQueue[Event]" = queue.SimpleQueue()
+        self._wake = threading.Event()
+        self._listener: Optional[EventListener] = None
+        if self.EVENT_MODE in ("on", "auto"):
+            self._start_events()
+        print(f"{self.LOG_PREFIX} start | local_mac={self.local_mac} ifaces={self.wifi_ifaces()} "
+              f"events={'on' if self._listener else 'off'}")
+
+    def _start_events(self) -> None:
+        listener = EventListener(self._on_event, log=lambda m: print(f"{self.LOG_PREFIX} {m}"))
+        if self.EVENT_MODE == "auto":
+            try:
+                listener.check()
+            except Exception as e:
+                print(f"{self.LOG_PREFIX} netlink events unavailable ({e}); polling only")
+                return
+        self._listener = listener.start()
+        # Zugehörigkeit kommt per Event, Zähler reichen im gemächlichen Takt
+        self.COLLECTORS = dict(self.COLLECTORS)
+        self.COLLECTORS["stations"] = self.COLLECTORS["stations"]._replace(
+            interval=self.EVENT_STATION_INTERVAL_SEC)
+
+    def _event_relevant(self, ev: Event) -> bool:
+        """Only bat0 and the radio interfaces; br0 clients, ARP churn etc. do not wake the loop."""
+        if ev.iface == self.MESH_IFACE or ev.iface in (self.WIFI_IFACES or self._ifaces):
+            return True
+        # neues Funk-Interface -> Interface-Liste neu ermitteln
+        return ev.kind == "link" and os.path.isdir(f"/sys/class/net/{ev.iface}/phy80211")
+
+    def _on_event(self, ev: Event) -> None:
+        """Listener thread: only queue + wake the main loop."""
+        if not self._event_relevant(ev):
+            self._stats.count("events.ignored")
+            return
+        self._events.put(ev)
+        self._wake.set()
+
+    def apply_events(self) -> int:
+        """
+        Apply queued netlink events to the cached station table (main thread):
+        joins/leaves update it in place and make the originator table due
+        immediately; a radio going down drops its stations.
+        """
+        n = 0
+        while True:
+            try:
+                ev = self._events.get_nowait()
+            except queue.Empty:
+                return n
+            n += 1
+            self._stats.count(f"events.{ev.kind}")
+            if ev.kind in ("station_new", "station_del"):
+                table = dict(self._last_good.get("stations") or {})
+                key = (ev.iface, ev.mac)
+                if ev.kind == "station_new":
+                    block = ev.station.as_dict() if ev.station else {}
+                    block["iface"] = ev.iface
+                    if key not in table:
+                        print(f"{self.LOG_PREFIX} station joined {ev.iface} {ev.mac}")
+                    table[key] = {**table.get(key, {}), **block}
+                elif table.pop(key, None) is not None:
+                    print(f"{self.LOG_PREFIX} station left {ev.iface} {ev.mac}")
+                self._last_good["stations"] = table
+                self._next_due["nodes"] = 0.0
+            elif ev.kind in ("link", "link_del"):
+                if not ev.up:
+                    table = self._last_good.get("stations") or {}
+                    if any(k[0] == ev.iface for k in table):
+                        print(f"{self.LOG_PREFIX} {ev.iface} down, dropping its stations")
+                        self._last_good["stations"] = {k: v for k, v in table.items() if k[0] != ev.iface}
+                        self._next_due["nodes"] = 0.0
+                self._ifaces_at = -1e9      # Interfaces neu ermitteln
+            elif ev.iface == self.MESH_IFACE or ev.iface in self._ifaces:
+                self._next_due["nodes"] = 0.0
+
+    # ---------------------- helpers ----------------------
+    def _acquire_lock(self) -> None:
+        if not self.LOCK_FILE:
+            return
+        self._lockf = open(self.LOCK_FILE, "w")
         try:
             fcntl.flock(self._lockf, fcntl.LOCK_EX | fcntl.LOCK_NB)
         except BlockingIOError:
             print("[ogm] another instance is running; exiting")
             sys.exit(0)
-        self.local_mac = self._get_local_mac()
-        print(f"{self.LOG_PREFIX} start | local_mac={self.local_mac} ifaces={self.WIFI_IFACES}")
-
-    # ---------------------- helpers ----------------------
-    @staticmethod
-    def _run(cmd: List[str]) -> str:
-        return subprocess.check_output(cmd, universal_newlines=True, stderr=subprocess.STDOUT)
 
-    @staticmethod
-    def _parse_bitrate_to_mbps(text: str) -> Optional[float]:
-        m = re.search(r'(\d+(?:\.\d+)?)\s*MBit/s', text, re.IGNORECASE) or \
-            re.search(r'(\d+(?:\.\d+)?)\s*Mb/s', text, re.IGNORECASE)
-        return float(m.group(1)) if m else None
+    def _read_text(self, path: str) -> str:
+        """sysfs read (overridden by the record/replay harness)."""
+        with open(path) as f:
+            return f.read()
+
+    def _power_supplies(self) -> List[str]:
+        return glob.glob(os.path.join(self.POWER_SUPPLY_DIR, "*"))
+
+    def _debug(self, msg: str) -> None:
+        if self.DEBUG:
+            print(f"{self.LOG_PREFIX} {msg}")
+
+    def _run(self, cmd: List[str]) -> str:
+        tool = os.path.basename(next((c for c in cmd if c not in ("sudo", "-n")), cmd[0]))
+        self._stats.count("subprocess.spawned")
+        self._stats.count(f"subprocess.{tool}")
+        with self._stats.timer(f"subprocess.{tool}"):
+            out = subprocess.check_output(cmd, universal_newlines=True, stderr=subprocess.STDOUT,
+                                          timeout=self.SUBPROCESS_TIMEOUT_SEC)
+        self._stats.count(f"bytes.{tool}", len(out))
+        return out
+
+    def _run_privileged(self, op: str, cmd: List[str], **args) -> str:
+        """
+        Command that needs root: run directly as root, else as privhelper
+        op `op` (one socket round trip). Raises HelperUnavailable if the
+        helper is not running; sudoers has no entries for these tools.
+        """
+        if os.geteuid() == 0:
+            return self._run(cmd)
+        if self._helper is None:
+            raise HelperUnavailable(f"{op}: not root and no privileged helper configured")
+        try:
+            with self._stats.timer(f"helper.{op}"):
+                out = self._helper.check(op, timeout=self.SUBPROCESS_TIMEOUT_SEC + 1, **args)
+        except HelperUnavailable:
+            self._stats.count("helper.unavailable")
+            raise
+        self._stats.count(f"bytes.{cmd[0]}", len(out))
+        return out
 
     def _get_local_mac(self) -> Optional[str]:
     # bevorzugt bat0, dann mesh/wlan
@@ -79,181 +380,311 @@ class EnhancedOGMMonitor:
         return None
 
     def _iw_cmd(self, iface: str) -> List[str]:
-        if os.geteuid() == 0:
-            return ["iw", "dev", iface, "station", "dump"]
-        else:
-            return ["sudo", "-n", "iw", "dev", iface, "station", "dump"]
+        return ["iw", "dev", iface, "station", "dump"]
 
     def _batctl_cmd(self) -> List[str]:
-        if os.geteuid() == 0:
-            return ["batctl", "o"]
-        else:
-            return ["sudo", "-n", "batctl", "o"]
+        return ["batctl", "o"]
+
+    def _batman_hardifs(self) -> List[str]:
+        """Hard interfaces enslaved to MESH_IFACE: sysfs, else `batctl if`."""
+        found = []
+        for p in sorted(glob.glob("/sys/class/net/*/batman_adv/mesh_iface")):
+            try:
+                with open(p) as f:
+                    if f.read().strip() == self.MESH_IFACE:
+                        found.append(p.split("/")[4])
+            except OSError:
+                pass
+        if found:
+            return found
+        try:
+            out = self._run_privileged("batctl_if", ["batctl", "if"])
+        except Exception as e:
+            self._debug(f"batctl if failed: {e}")
+            return []
+        # "wlan1: active"
+        return [line.split(":", 1)[0].strip() for line in out.splitlines() if ":" in line]
+
+    def wifi_ifaces(self) -> List[str]:
+        """Interfaces get_wifi_stations reads (see WIFI_IFACES), rediscovered every IFACE_DISCOVERY_SEC."""
+        if self.WIFI_IFACES:
+            return list(self.WIFI_IFACES)
+        now = time.monotonic()
+        if now - self._ifaces_at < self.IFACE_DISCOVERY_SEC:
+            return self._ifaces
+        wireless = {p.split("/")[4] for p in glob.glob("/sys/class/net/*/phy80211")}
+        ifaces = [i for i in self._batman_hardifs() if i in wireless]
+        ifaces += sorted(wireless - set(ifaces))
+        if not ifaces:
+            ifaces = list(self.WIFI_IFACES_FALLBACK)
+        if ifaces != self._ifaces:
+            print(f"{self.LOG_PREFIX} wifi interfaces: {ifaces}")
+        self._ifaces, self._ifaces_at = ifaces, now
+        return ifaces
 
     # ---------------------- collectors ----------------------
-    def get_wifi_stations(self) -> Dict[str, Dict[str, Any]]:
+    def _read_stations(self, iface: str) -> List[StationInfo]:
+        """Station records of one interface from the configured backend."""
+        if self.STATION_BACKEND in ("nl80211", "auto"):
+            nl = self._nl80211.get(iface)
+            if nl is None:
+                nl = self._nl80211[iface] = Nl80211StationCollector()
+            try:
+                with self._stats.timer("netlink.nl80211"):
+                    return nl.stations(iface)
+            except Exception as e:
+                if self.STATION_BACKEND == "nl80211":
+                    raise
+                self._debug(f"nl80211 error on {iface}: {e}; falling back to iw")
+        out = self._run_privileged("iw_station_dump", self._iw_cmd(iface), iface=iface)
+        with self._stats.timer("parse.iw"):
+            return parse_station_dump(out, iface)
+
+    def get_wifi_stations(self) -> Dict[Tuple[str, str], Dict[str, Any]]:
         """
-        Parse `iw dev <iface> station dump` into:
-            { mac: {signal_dbm, rx_packets, rx_drop_misc, tx_packets, tx_retries, tx_failed,
-                    tx_bitrate_mbps, rx_bitrate_mbps} }
-        Tolerant regexes (no ^$ anchors) + detailed per-station logging.
+        Station dumps of all wifi_ifaces(), read concurrently and merged into:
+            { (iface, mac): {iface, signal_dbm, rx_packets, rx_drop_misc, tx_packets,
+                             tx_retries, tx_failed, tx_bitrate_mbps, rx_bitrate_mbps} }
+        in interface order (batman hard interfaces first).
+        Source is STATION_BACKEND (`iw` text via station_parser or nl80211);
+        per-station details are only logged with OGM_DEBUG=1.
+        Raises if no interface could be read at all.
         """
-        stations: Dict[str, Dict[str, Any]] = {}
+        ifaces = self.wifi_ifaces()
+        futures = [(iface, self._iface_pool.submit(self._read_stations, iface)) for iface in ifaces]
+        stations: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        errors: List[str] = []
+        counts: List[str] = []
 
-        for iface in self.WIFI_IFACES:
+        for iface, fut in futures:
             try:
-                out = self._run(self._iw_cmd(iface))
+                records = fut.result()
             except Exception as e:
                 print(f"{self.LOG_PREFIX} iw error on {iface}: {e}")
+                errors.append(f"{iface}: {e}")
                 continue
 
-            current_mac: Optional[str] = None
-            block: Dict[str, Any] = {}
-            saw_any = False
-
-            for raw in out.splitlines():
-                line = raw.strip()
-
-                m_station = re.search(r"\bStation\s+([0-9A-Fa-f:]{17})\b", line)
-                if m_station:
-                    if current_mac is not None:
-                        # log previous
-                        print(f"{self.LOG_PREFIX} iw {iface} station {current_mac} parsed -> {block}")
-                        if block:
-                            stations[current_mac] = block
-                    current_mac = m_station.group(1).lower()
-                    block = {}
-                    saw_any = True
-                    continue
-
-                if current_mac is None:
-                    continue
-
-                # Signal (prefer 'signal', fallback 'signal avg') – erlaube optionales [..]
-                m = re.search(r"\bsignal:\s*(-?\d+(?:\.\d+)?)\s*(?:\[[^\]]+\])?\s*dBm\b", line, re.IGNORECASE)
-                if m:
-                    block["signal_dbm"] = float(m.group(1))
-                m = re.search(r"\bsignal\s+avg:\s*(-?\d+(?:\.\d+)?)\s*(?:\[[^\]]+\])?\s*dBm\b", line, re.IGNORECASE)
-                if m and "signal_dbm" not in block:
-                    block["signal_dbm"] = float(m.group(1))
-
-
-                # Counters
-                m = re.search(r"\brx\s+packets:\s*(\d+)\b", line, re.IGNORECASE)
-                if m: block["rx_packets"] = int(m.group(1))
-                m = re.search(r"\brx\s+drop\s+misc:\s*(\d+)\b", line, re.IGNORECASE)
-                if m: block["rx_drop_misc"] = int(m.group(1))
-                m = re.search(r"\btx\s+packets:\s*(\d+)\b", line, re.IGNORECASE)
-                if m: block["tx_packets"] = int(m.group(1))
-                m = re.search(r"\btx\s+retries:\s*(\d+)\b", line, re.IGNORECASE)
-                if m: block["tx_retries"] = int(m.group(1))
-                m = re.search(r"\btx\s+failed:\s*(\d+)\b", line, re.IGNORECASE)
-                if m: block["tx_failed"] = int(m.group(1))
-
-                # Bitrates (use regex instead of startswith)
-                m = re.search(r"\btx\s+bitrate:\s*(.+)$", line, re.IGNORECASE)
-                if m:
-                    v = self._parse_bitrate_to_mbps(m.group(1))
-                    if v is not None:
-                        block["tx_bitrate_mbps"] = v
-                m = re.search(r"\brx\s+bitrate:\s*(.+)$", line, re.IGNORECASE)
-                if m:
-                    v = self._parse_bitrate_to_mbps(m.group(1))
-                    if v is not None:
-                        block["rx_bitrate_mbps"] = v
-
-            if current_mac is not None:
-                print(f"{self.LOG_PREFIX} iw {iface} station {current_mac} parsed -> {block}")
+            for st in records:
+                block = st.as_dict()
+                self._debug(f"iw {iface} station {st.mac} parsed -> {block}")
                 if block:
-                    stations[current_mac] = block
-
-            if saw_any:
-                print(f"{self.LOG_PREFIX} iw {iface}: parsed {len(stations)} station(s).")
-                if stations:
-                    break
-            else:
-                print(f"{self.LOG_PREFIX} iw {iface}: no stations.")
-
+                    block["iface"] = iface
+                    stations[(iface, st.mac)] = block
+            counts.append(f"{iface}={len(records)}")
+
+        if counts:
+            print(f"{self.LOG_PREFIX} stations: {' '.join(counts)}")
+        if len(errors) == len(ifaces):
+            raise RuntimeError("; ".join(errors))
         return stations
 
     def get_batman_nodes(self) -> Dict[str, Dict[str, Any]]:
-        nodes: Dict[str, Dict[str, Any]] = {}
-        try:
-            out = self._run(self._batctl_cmd())
-        except Exception as e:
-            print(f"{self.LOG_PREFIX} batctl error: {e}")
-            return nodes
-
-        for raw in out.splitlines():
-            line = raw.rstrip()
-            if " * " not in line:
-                continue
-
-            m_mac = re.search(r"([0-9A-Fa-f:]{17})", line)
-            if not m_mac:
-                continue
-            mac = m_mac.group(1).lower()
-
-            if self.local_mac and mac == self.local_mac.lower():
+        """
+        Originator table as { mac: {last_seen, throughput, nexthop, iface} }.
+        BATMAN_BACKEND "genl" asks batman-adv via netlink, "batctl" parses
+        `batctl o`; "auto" uses genl and falls back to batctl.
+        Raises if the table could not be read.
+        """
+        nodes: Dict[str, Originator] = {}
+        if self.BATMAN_BACKEND in ("genl", "auto"):
+            if self._batadv is None:
+                self._batadv = BatadvReader(self.MESH_IFACE)
+            try:
+                with self._stats.timer("netlink.batadv"):
+                    nodes = self._batadv.originators(self.local_mac)
+                self._batman_metric = "tq" if any(o.tq is not None for o in nodes.values()) else "tput"
+                return {mac: o.as_dict() for mac, o in nodes.items()}
+            except Exception as e:
+                if self.BATMAN_BACKEND == "genl":
+                    raise
+                self._debug(f"batadv genl error: {e}; falling back to batctl")
+
+        out = self._run_privileged("batctl_o", self._batctl_cmd())
+        with self._stats.timer("parse.batctl"):
+            # Records werden in place aktualisiert; build_status kopiert sie ohnehin
+            table = dict(self._batctl_table.update(out))
+        self._batman_metric = "tq" if self._batctl_table.algo == "BATMAN_IV" else "tput"
+        return table
+    
+    def get_batman_neighbors(self) -> List[Dict[str, Any]]:
+        """
+        batman-adv neighbor table [{mac, iface, last_seen, throughput}] via
+        genl. Without it (BATMAN_BACKEND=batctl) the topology derives the
+        direct neighbors from the originator table.
+        """
+        if self.BATMAN_BACKEND == "batctl":
+            raise RuntimeError("neighbor table needs the batadv genl backend")
+        if self._batadv_neigh is None:
+            self._batadv_neigh = BatadvReader(self.MESH_IFACE)
+        with self._stats.timer("netlink.batadv_neigh"):
+            return self._batadv_neigh.neighbors()
+
+    def read_alfred_vis(self) -> List[Tuple[str, List[Tuple[str, int]]]]:
+        """batadv-vis records of all nodes (ALFRED type 1); empty if batadv-vis is not running."""
+        out = []
+        with self._stats.timer("socket.alfred_vis"):
+            records = self._alfred.request(ALFRED_VIS_TYPE)
+        for rec in records:
+            if rec.version != ALFRED_VIS_VERSION:
                 continue
+            try:
+                out.append(parse_vis(rec.data))
+            except Exception as e:
+                self._debug(f"bad vis record from {rec.mac}: {e}")
+        return out
 
-            m_seen = re.search(r"(\d+(?:\.\d+)?)s", line)
-            last_seen = float(m_seen.group(1)) if m_seen else 0.0
-
-            m_thr = re.search(r"\((\d+(?:\.\d+)?)", line)
-            throughput = float(m_thr.group(1)) if m_thr else 0.0
+    def _alfred_socket(self) -> Dict[str, str]:
+        """alfred unix socket direkt (kein Prozess)"""
+        with self._stats.timer("socket.alfred"):
+            return self._alfred.hostnames()
 
-            after = line.split(")")[-1] if ")" in line else ""
-            m_nh = re.search(r"([0-9A-Fa-f:]{17})", after)
-            nexthop = m_nh.group(1).lower() if m_nh else ""
+    def _alfred_json(self) -> Dict[str, str]:
+        """alfred-json (JSON-Ausgabe)"""
+        mapping = {}
+        out = self._run(["alfred-json", "-r", "64"])
+        for item in json.loads(out):
+            mac = str(item.get("mac","")).lower()
+            val = str(item.get("value","")).strip()
+            if mac and val:
+                mapping[mac] = val
+        return mapping
 
-            nodes[mac] = {"last_seen": last_seen, "throughput": throughput, "nexthop": nexthop}
+    def _alfred_text(self) -> Dict[str, str]:
+        """Textausgabe von "alfred -r 64" """
+        mapping = {}
+        out = self._run_privileged("alfred_read", ["alfred", "-r", "64"], type=64)
+        for line in out.splitlines():
+            m = re.search(r'\{\s*"([0-9a-f:]{17})",\s*"([^"]*)"', line, re.I)
+            if not m:
+                continue
+            mac = m.group(1).lower()
+            raw = m.group(2)
+            name = bytes(raw, "utf-8").decode("unicode_escape").rstrip("\x00\x0a\r")
+            if name:
+                mapping[mac] = name
+        return mapping
 
-        return nodes
-    
     def read_alfred_hostnames(self):
         """
         Liefert { mac_lower: hostname } aus ALFRED Typ 64.
-        Nur, wenn wirklich Daten ankommen.
+        Nur, wenn wirklich Daten ankommen. Wirft, wenn alle Wege scheitern.
+        Der zuletzt funktionierende Weg wird gemerkt und zuerst probiert,
+        damit nicht bei jedem Refresh ein fehlschlagendes Kommando startet.
         """
-        mapping = {}
-
-        # 1) Wenn verfügbar: alfred-json (JSON-Ausgabe)
-        try:
-            out = self._run(["alfred-json", "-r", "64"])
-            import json as _json
-            for item in _json.loads(out):
-                mac = str(item.get("mac","")).lower()
-                val = str(item.get("value","")).strip()
-                if mac and val:
-                    mapping[mac] = val
-        except Exception:
-            # 2) Fallback: Textausgabe von "alfred -r 64"
+        backends = {"socket": self._alfred_socket, "json": self._alfred_json, "text": self._alfred_text}
+        order = list(backends)
+        if self._alfred_backend in backends:
+            order.remove(self._alfred_backend)
+            order.insert(0, self._alfred_backend)
+
+        errors = []
+        for name in order:
             try:
-                cmd = ["alfred", "-r", "64"] if os.geteuid()==0 else ["sudo","-n","alfred","-r","64"]
-                out = self._run(cmd)
-                for line in out.splitlines():
-                    m = re.search(r'\{\s*"([0-9a-f:]{17})",\s*"([^"]*)"', line, re.I)
-                    if not m:
-                        continue
-                    mac = m.group(1).lower()
-                    raw = m.group(2)
-                    name = bytes(raw, "utf-8").decode("unicode_escape").rstrip("\x00\x0a\r")
-                    if name:
-                        mapping[mac] = name
+                mapping = backends[name]()
             except Exception as e:
-                print(f"{self.LOG_PREFIX} alfred read error: {e}")
+                errors.append(f"{name}: {e}")
+                continue
+            if name != self._alfred_backend:
+                print(f"{self.LOG_PREFIX} alfred backend: {name}")
+                self._alfred_backend = name
+            print(f"{self.LOG_PREFIX} alfred hostnames: {len(mapping)} item(s)")
+            return mapping
 
-        print(f"{self.LOG_PREFIX} alfred hostnames: {len(mapping)} item(s)")
-        return mapping
+        self._alfred_backend = None
+        raise RuntimeError("alfred read error: " + "; ".join(errors))
 
 
     # ---------------------- main logic ----------------------
+    def collect_all(self) -> Dict[str, Any]:
+        """
+        Start every collector that is due according to COLLECTORS and wait
+        for the ones started in this tick up to their deadline. Collectors
+        still running from an earlier tick are only harvested if done, so a
+        hanging tool never stalls the tick. Returns the cached result per
+        source, or None once it is older than its TTL.
+        """
+        start = time.monotonic()
+        # halber Tick Toleranz: Tick-Starts streuen um das Raster des Schedulers
+        slack = self.POLL_INTERVAL_SEC / 2
+        started: List[str] = []
+        for name, spec in self.COLLECTORS.items():
+            due = self._next_due.get(name, 0.0)
+            if name in self._inflight or start < due - slack:
+                continue
+            self._inflight[name] = self._pool.submit(self._timed, name, getattr(self, spec.method))
+            # auf dem eigenen Raster bleiben, nach Aussetzern neu ansetzen
+            nxt = due + spec.interval
+            self._next_due[name] = nxt if nxt > start else start + spec.interval
+            started.append(name)
+
+        for name, fut in list(self._inflight.items()):
+            spec = self.COLLECTORS[name]
+            wait = max(0.0, start + spec.deadline - time.monotonic()) if name in started else 0.0
+            try:
+                value = fut.result(timeout=wait)
+            except FutureTimeout:
+                if name in started:
+                    self._source_failed(name, f"timeout after {spec.deadline}s")
+                continue
+            except Exception as e:
+                self._source_failed(name, str(e))
+            else:
+                self._last_good[name] = value
+                self._last_ok[name] = time.time()
+                self._last_error.pop(name, None)
+            del self._inflight[name]
+
+        now = time.time()
+        results: Dict[str, Any] = {}
+        for name, spec in self.COLLECTORS.items():
+            ok_at = self._last_ok.get(name)
+            fresh = ok_at is not None and now - ok_at <= spec.ttl
+            results[name] = self._last_good.get(name) if fresh else None
+        return results
+
+    def _timed(self, name: str, fn):
+        """Runs in the pool: collector wall time incl. failures -> collector.<name>."""
+        with self._stats.timer(f"collector.{name}"):
+            return fn()
+
+    def _source_failed(self, name: str, err: str) -> None:
+        self._stats.count(f"failed.{name}")
+        self._last_error[name] = err
+        print(f"{self.LOG_PREFIX} {name} collector failed: {err}")
+
+    def sources_status(self) -> Dict[str, Dict[str, Any]]:
+        """Per source: age of the cached result and whether it is overdue/expired."""
+        now = time.time()
+        out: Dict[str, Dict[str, Any]] = {}
+        for name, spec in self.COLLECTORS.items():
+            ok_at = self._last_ok.get(name)
+            age = round(now - ok_at, 1) if ok_at is not None else None
+            st: Dict[str, Any] = {
+                "ok": name not in self._last_error and ok_at is not None,
+                "updated": ok_at,
+                "age": age,
+                "interval": spec.interval,
+                "stale": age is None or age > spec.interval + spec.deadline,
+                "expired": age is None or age > spec.ttl,
+            }
+            if name in self._last_error:
+                st["error"] = self._last_error[name]
+            out[name] = st
+        return out
+
     def build_status(self) -> Dict[str, Any]:
-        nodes  = self.get_batman_nodes()
-        hosts  = self.read_alfred_hostnames()  # <- ALFRED
-        stats  = self.get_wifi_stations()
+        self.apply_events()
+        with self._stats.timer("collect"):
+            res = self.collect_all()
+        t_merge = time.perf_counter()
+        # Kopien, damit das Mergen die gecachten Ergebnisse nicht verändert
+        nodes  = {mac: dict(info) for mac, info in (res["nodes"] or {}).items()}
+        hosts  = res["hosts"] or {}   # <- ALFRED
+        stats  = res["stations"] or {}
         me     = (self.local_mac or "").lower()
+        by_mac: Dict[str, Dict[str, Any]] = {}
+        for (_, smac), st in stats.items():
+            by_mac.setdefault(smac, st)     # batman Hard-Interfaces zuerst
 
         for mac, info in nodes.items():
             if mac in hosts and mac != me:
@@ -261,18 +692,69 @@ class EnhancedOGMMonitor:
             elif info.get("nexthop") in hosts and info["nexthop"] != me:
                 info["hostname"] = hosts[info["nexthop"]]
 
-            peer = stats.get(mac) or stats.get(info.get("nexthop",""))
+            # Station des Next-Hops auf dem Funk-Interface, über das batman ihn erreicht
+            nh, oif = info.get("nexthop", ""), info.get("iface")
+            peer = stats.get((oif, nh)) or stats.get((oif, mac)) or by_mac.get(mac) or by_mac.get(nh)
             if peer:
                 for k in ("signal_dbm","rx_packets","rx_drop_misc","tx_packets",
                         "tx_retries","tx_failed","tx_bitrate_mbps","rx_bitrate_mbps"):
                     if k in peer: info[k] = peer[k]
-
-        local = self.build_local_obj(hosts)
-        return {"timestamp": int(time.time()), "local": local, "nodes": nodes}
-
-        print(f"{self.LOG_PREFIX} alfred hostnames: {len(mapping)} item(s)")
-
-    def build_local_obj(self, hosts_map):
+                info["station_iface"] = peer["iface"]
+
+        # Ringpuffer nur für direkte Nachbarn (Next-Hop = Originator oder eigene Station)
+        # füttern, Raten (retry/fail ratio, rx drops/s) übernehmen
+        now = time.time()
+        direct = {mac: info for mac, info in nodes.items()
+                  if info.get("nexthop") == mac or mac in by_mac}
+        for mac, rates in self._history.update(now, direct).items():
+            nodes[mac].update(rates)
+        self._stats.observe("merge", (time.perf_counter() - t_merge) * 1000.0)
+        with self._stats.timer("tsdb"):
+            self._record_tsdb(now, nodes)
+        with self._stats.timer("topology"):
+            self._update_topology(now, res)
+
+        local = self.build_local_obj(hosts, res["power"] or {})
+        return {"timestamp": int(time.time()), "local": local, "nodes": nodes,
+                "sources": self.sources_status()}
+
+    def _update_topology(self, now: float, res: Dict[str, Any]) -> None:
+        topo = self._topology
+        if self.local_mac:
+            topo.update_local(self.local_mac, res["nodes"] or {}, res.get("neighbors"), res["hosts"], now,
+                              metric_kind=self._batman_metric)
+        vis_at = self._last_ok.get("vis")
+        if res.get("vis") is not None and vis_at != self._topology_vis_at:
+            self._topology_vis_at = vis_at
+            topo.update_vis(res["vis"], now)
+        topo.expire(now)
+
+        version, written = self._topology_written
+        mono = time.monotonic()
+        if self.TOPOLOGY_FILE and topo.version != version and mono - written >= self.TOPOLOGY_WRITE_SEC:
+            try:
+                atomic_write(self.TOPOLOGY_FILE, topo.to_json(), fsync=False)
+                self._topology_written = (topo.version, mono)
+            except OSError as e:
+                print(f"{self.LOG_PREFIX} topology write error: {e}")
+                self._topology_written = (version, mono)
+
+    def _record_tsdb(self, now: float, nodes: Dict[str, Dict[str, Any]]) -> None:
+        if self._tsdb is None:
+            return
+        try:
+            self._tsdb.append_snapshot(now, nodes)
+            if now - self._tsdb_pruned >= self.TSDB_PRUNE_INTERVAL_SEC:
+                self._tsdb_pruned = now
+                removed = self._tsdb.prune(now)
+                if removed:
+                    print(f"{self.LOG_PREFIX} tsdb: pruned {removed} stale series")
+        except (OSError, ValueError) as e:
+            print(f"{self.LOG_PREFIX} tsdb disabled: {e}")
+            self._tsdb.close()
+            self._tsdb = None
+
+    def build_local_obj(self, hosts_map, pinfo=None):
         me = (self.local_mac or "").lower()
         local = {"mac": me, "alfred_ok": False}
 
@@ -282,7 +764,8 @@ class EnhancedOGMMonitor:
             local["alfred_ok"] = True
 
         # (optional) Power-Infos, falls implementiert:
-        pinfo = self.read_power_info()
+        if pinfo is None:
+            pinfo = self.read_power_info()
         local["battery_present"] = pinfo.get("battery_present", False)
         if pinfo.get("battery_pct") is not None:
             local["battery_pct"] = pinfo["battery_pct"]
@@ -305,17 +788,17 @@ class EnhancedOGMMonitor:
         has_batt = False
         has_ext  = False
 
-        for base in glob.glob('/sys/class/power_supply/*'):
+        for base in self._power_supplies():
             # type
             try:
-                typ = open(os.path.join(base, 'type')).read().strip()
+                typ = self._read_text(os.path.join(base, 'type')).strip()
             except Exception:
                 typ = ''
             t = typ.lower()
 
             # status (optional)
             try:
-                st = open(os.path.join(base, 'status')).read().strip()
+                st = self._read_text(os.path.join(base, 'status')).strip()
                 if st:
                     info['status'] = st
             except Exception:
@@ -325,20 +808,17 @@ class EnhancedOGMMonitor:
                 has_batt = True
                 # capacity (optional)
                 try:
-                    cap = int(open(os.path.join(base, 'capacity')).read().strip())
+                    cap = int(self._read_text(os.path.join(base, 'capacity')).strip())
                     if 0 <= cap <= 100:
                         info['battery_pct'] = cap
                 except Exception:
                     pass
             elif t in ('mains', 'usb', 'ac'):
                 # "online" optional
-                online = '1'
-                p_online = os.path.join(base, 'online')
-                if os.path.exists(p_online):
-                    try:
-                        online = open(p_online).read().strip()
-                    except Exception:
-                        online = '1'
+                try:
+                    online = self._read_text(os.path.join(base, 'online')).strip()
+                except Exception:
+                    online = '1'
                 if online == '1':
                     has_ext = True
 
@@ -370,39 +850,67 @@ class EnhancedOGMMonitor:
             pass
         return None
 
-    def write_status(self, payload):
+    def write_status(self, payload, force: bool = False):
+        """Write via StatusWriter (skips unchanged payloads, tmpfs + checkpoint)."""
         try:
-            dirpath = os.path.dirname(self.STATUS_FILE)
-            os.makedirs(dirpath, exist_ok=True)
-
-            # eindeutige Temp-Datei im selben Verzeichnis (wichtig fürs atomare replace)
-            fd, tmppath = tempfile.mkstemp(prefix=".node_status.", suffix=".tmp", dir=dirpath)
-            try:
-                with os.fdopen(fd, "w") as f:
-                    json.dump(payload, f, indent=2)
-                    f.flush()
-                    os.fsync(f.fileno())
-                os.replace(tmppath, self.STATUS_FILE)   # atomar
-            finally:
-                # falls ein Fehler auftrat und tmppath noch existiert: aufräumen
-                try:
-                    if os.path.exists(tmppath):
-                        os.unlink(tmppath)
-                except:
-                    pass
-
-            print(f"[ogm] wrote {self.STATUS_FILE} ({len(payload.get('nodes', {}))} nodes)")
+            checkpoints = self._writer.counters["checkpoints"]
+            if self._writer.write(payload, force=force):
+                self._debug(f"wrote {self._writer.target} ({len(payload.get('nodes', {}))} nodes)")
+            if self._writer.counters["checkpoints"] != checkpoints:
+                print(f"{self.LOG_PREFIX} checkpoint {self.STATUS_FILE} | writer {self._writer.stats()}")
         except Exception as e:
             print(f"[ogm] write error: {e}")
 
+    def write_stats(self, force: bool = False) -> None:
+        """Dump the timing histograms + counters to STATS_FILE every STATS_INTERVAL_SEC."""
+        now = time.monotonic()
+        if not self.STATS_FILE or (not force and now - self._stats_written < self.STATS_INTERVAL_SEC):
+            return
+        self._stats_written = now
+        try:
+            self._stats.write_json(self.STATS_FILE, {"writer": self._writer.stats(),
+                                                     "sources": self.sources_status(),
+                                                     "scheduler": self._scheduler.snapshot()})
+        except OSError as e:
+            print(f"{self.LOG_PREFIX} stats write error: {e}")
+
+    def _on_sigusr1(self, *_):
+        if self._profiler.start():
+            print(f"{self.LOG_PREFIX} profiling for {self.PROFILE_DURATION_SEC}s -> {self.PROFILE_FILE}")
+
     def run(self) -> None:
+        # systemd stop -> SIGTERM -> SystemExit, damit finally noch sichert
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        # kill -USR1 <pid> -> Sampling-Profiler (Bericht in PROFILE_FILE)
+        signal.signal(signal.SIGUSR1, self._on_sigusr1)
         try:
             while True:
-                payload = self.build_status()
-                self.write_status(payload)
-                time.sleep(self.POLL_INTERVAL_SEC)
+                # Events wecken sofort (Zusatz-Tick), sonst nächste Deadline
+                scheduled = self._scheduler.wait(self._wake, self.EVENT_MIN_GAP_SEC)
+                self._wake.clear()
+                with self._stats.timer("tick"):
+                    payload = self.build_status()
+                    self.write_status(payload)
+                self._stats.count("ticks")
+                if scheduled:
+                    skipped = self._scheduler.done()
+                    if skipped:
+                        self._debug(f"tick overran, skipped {skipped}")
+                self.write_stats()
         except KeyboardInterrupt:
             print(f"{self.LOG_PREFIX} exit")
+        finally:
+            if self._listener is not None:
+                self._listener.stop()
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._iface_pool.shutdown(wait=False, cancel_futures=True)
+            self.write_stats(force=True)
+            if self._tsdb is not None:
+                self._tsdb.close()
+            try:
+                self._writer.checkpoint()
+            except Exception as e:
+                print(f"{self.LOG_PREFIX} final checkpoint failed: {e}")
 
 
 if __name__ == "__main__":
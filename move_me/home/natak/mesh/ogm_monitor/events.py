@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Netlink event listener
+----------------------
+Subscribes to the multicast groups that announce link-level changes, so
+the OGM monitor learns about them within milliseconds instead of at the
+next poll:
+
+- nl80211 "mlme": NEW_STATION / DEL_STATION (peer joined / left a radio)
+- rtnetlink RTMGRP_LINK: interface added / removed / up / down
+- rtnetlink RTMGRP_NEIGH: neighbor table entries added / removed
+
+EventListener runs one thread that select()s on both sockets and hands
+each decoded Event to a callback (which should only queue it). The parse
+functions work on raw receive buffers, like nl80211.py / batadv.py.
+
+    python3 events.py        # print events as they arrive
+"""
+
+import select
+import socket
+import struct
+import threading
+import time
+from typing import Callable, Iterable, List, NamedTuple, Optional
+
+import genl
+import nl80211
+from station_parser import StationInfo
+
+# rtnetlink
+RTMGRP_LINK = 0x1
+RTMGRP_NEIGH = 0x4
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_NEWNEIGH = 28
+RTM_DELNEIGH = 29
+RTM_GETNEIGH = 30
+IFLA_IFNAME = 3
+NDA_DST = 1
+NDA_LLADDR = 2
+NUD_INCOMPLETE = 0x01
+NUD_REACHABLE = 0x02
+NUD_STALE = 0x04
+NUD_DELAY = 0x08
+NUD_PROBE = 0x10
+NUD_FAILED = 0x20
+IFF_UP = 0x1
+IFF_LOWER_UP = 0x10000
+
+_IFINFOMSG = struct.Struct("=BxHiII")     # family, type, index, flags, change
+_NDMSG = struct.Struct("=BxxxiHBB")       # family, ifindex, state, flags, type
+
+NL80211_MCGRP_MLME = "mlme"
+
+
+class Event(NamedTuple):
+    kind: str                 # station_new | station_del | link | link_del | neigh_new | neigh_del
+    iface: str
+    mac: str = ""
+    up: bool = True           # link: IFF_UP und Carrier
+    station: Optional[StationInfo] = None
+
+
+class Neigh(NamedTuple):
+    """One neighbor table entry (RTM_NEWNEIGH / RTM_DELNEIGH, event or dump reply)."""
+    deleted: bool
+    ifindex: int
+    addr: str                 # IPv4/IPv6
+    mac: str                  # "" ohne lladdr (INCOMPLETE, FAILED)
+    state: int                # NUD_*
+
+
+def _ifname(index: int) -> str:
+    try:
+        return socket.if_indextoname(index)
+    except OSError:
+        return f"if{index}"
+
+
+def parse_nl80211_events(data: bytes, family_id: int) -> List[Event]:
+    out: List[Event] = []
+    for m in genl.parse_messages(data):
+        if m.type != family_id:
+            continue
+        cmd = genl.genl_cmd(m.payload)
+        if cmd not in (nl80211.NL80211_CMD_NEW_STATION, nl80211.NL80211_CMD_DEL_STATION):
+            continue
+        st = nl80211.parse_station(genl.genl_attrs(m.payload))
+        if st is None:
+            continue
+        if cmd == nl80211.NL80211_CMD_NEW_STATION:
+            out.append(Event("station_new", st.iface, st.mac, station=st))
+        else:
+            out.append(Event("station_del", st.iface, st.mac))
+    return out
+
+
+def parse_rtnl_events(data: bytes) -> List[Event]:
+    out: List[Event] = []
+    for m in genl.parse_messages(data):
+        if m.type in (RTM_NEWLINK, RTM_DELLINK) and len(m.payload) >= _IFINFOMSG.size:
+            _fam, _type, index, flags, _change = _IFINFOMSG.unpack_from(m.payload)
+            attrs = genl.parse_attrs(m.payload, _IFINFOMSG.size)
+            name = genl.cstr(attrs[IFLA_IFNAME]) if IFLA_IFNAME in attrs else _ifname(index)
+            if m.type == RTM_DELLINK:
+                out.append(Event("link_del", name, up=False))
+            else:
+                out.append(Event("link", name, up=bool(flags & IFF_UP and flags & IFF_LOWER_UP)))
+        elif m.type in (RTM_NEWNEIGH, RTM_DELNEIGH) and len(m.payload) >= _NDMSG.size:
+            _fam, index, _state, _flags, _type = _NDMSG.unpack_from(m.payload)
+            attrs = genl.parse_attrs(m.payload, _NDMSG.size)
+            lladdr = attrs.get(NDA_LLADDR, b"")
+            if len(lladdr) != 6:
+                continue
+            kind = "neigh_new" if m.type == RTM_NEWNEIGH else "neigh_del"
+            out.append(Event(kind, _ifname(index), genl.mac(lladdr)))
+    return out
+
+
+def parse_neigh(msgs: Iterable[genl.NlMsg]) -> List[Neigh]:
+    """Neighbor entries incl. state and those without lladdr (parse_rtnl_events skips them)."""
+    out: List[Neigh] = []
+    for m in msgs:
+        if m.type not in (RTM_NEWNEIGH, RTM_DELNEIGH) or len(m.payload) < _NDMSG.size:
+            continue
+        fam, index, state, _flags, _type = _NDMSG.unpack_from(m.payload)
+        attrs = genl.parse_attrs(m.payload, _NDMSG.size)
+        dst = attrs.get(NDA_DST, b"")
+        if fam not in (socket.AF_INET, socket.AF_INET6) or len(dst) not in (4, 16):
+            continue
+        lladdr = attrs.get(NDA_LLADDR, b"")
+        out.append(Neigh(m.type == RTM_DELNEIGH, index, socket.inet_ntop(fam, dst),
+                         genl.mac(lladdr) if len(lladdr) == 6 else "", state))
+    return out
+
+
+def dump_neigh(sock: genl.NetlinkSocket) -> List[Neigh]:
+    """Whole neighbor table (`ip neigh show`) over an rtnetlink socket."""
+    seq = sock.next_seq()
+    msg = genl.pack_msg(RTM_GETNEIGH, genl.NLM_F_REQUEST | genl.NLM_F_DUMP, seq,
+                        _NDMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0))
+    return parse_neigh(sock.transact(msg, seq, dump=True))
+
+
+class EventListener:
+    """Background thread; `callback(Event)` is called from that thread."""
+
+    RETRY_SEC = 5.0
+
+    def __init__(self, callback: Callable[[Event], None],
+                 log: Callable[[str], None] = print) -> None:
+        self.callback = callback
+        self.log = log
+        self.counters = {"events": 0, "errors": 0}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _open(self):
+        gsock = genl.GenlSocket(timeout=None)
+        try:
+            gsock.subscribe(nl80211.NL80211_GENL_NAME, NL80211_MCGRP_MLME)
+            fam_id = gsock.family(nl80211.NL80211_GENL_NAME).id
+        except Exception:
+            gsock.close()
+            raise
+        rsock = genl.NetlinkSocket(genl.NETLINK_ROUTE, timeout=None, groups=RTMGRP_LINK | RTMGRP_NEIGH)
+        return gsock, fam_id, rsock
+
+    def check(self) -> None:
+        """Open and close the subscriptions once; raises if events are unavailable."""
+        gsock, _, rsock = self._open()
+        gsock.close()
+        rsock.close()
+
+    def start(self) -> "EventListener":
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="ogm-events")
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                gsock, fam_id, rsock = self._open()
+            except Exception as e:
+                self.counters["errors"] += 1
+                self.log(f"netlink events unavailable: {e}; retry in {self.RETRY_SEC}s")
+                self._stop.wait(self.RETRY_SEC)
+                continue
+            try:
+                while not self._stop.is_set():
+                    ready, _, _ = select.select([gsock.sock, rsock.sock], [], [], 1.0)
+                    for s in ready:
+                        data = s.recv(genl.NetlinkSocket.RCVBUF)
+                        events = parse_nl80211_events(data, fam_id) if s is gsock.sock \
+                            else parse_rtnl_events(data)
+                        for ev in events:
+                            self.counters["events"] += 1
+                            self.callback(ev)
+            except Exception as e:
+                # z. B. ENOBUFS bei Event-Stürmen -> neu abonnieren
+                self.counters["errors"] += 1
+                self.log(f"netlink event error: {e}; resubscribing")
+                time.sleep(0.2)
+            finally:
+                gsock.close()
+                rsock.close()
+
+
+if __name__ == "__main__":
+    ev = threading.Event()
+    EventListener(lambda e: print(f"{time.strftime('%H:%M:%S')} {e.kind:12s} {e.iface:10s} {e.mac} "
+                                  f"{'' if e.kind != 'link' else ('up' if e.up else 'down')}")).start()
+    try:
+        ev.wait()
+    except KeyboardInterrupt:
+        pass
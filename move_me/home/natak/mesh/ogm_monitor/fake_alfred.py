@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fake ALFRED daemon
+------------------
+Serves the ALFRED unix socket protocol (request + push) from an in-memory
+store, so alfred_client, the OGM monitor and the web app can be run and
+checked on a machine without batman-adv/alfred.
+
+    python3 fake_alfred.py --socket /tmp/alfred.sock \
+        --record 02:c5:4e:1a:00:11=node-11 --record 02:c5:4e:1a:00:22=node-22
+
+In Python:
+    srv = FakeAlfredServer("/tmp/alfred.sock", {64: {"02:..:11": b"node-11"}})
+    srv.start(); ...; srv.stop()
+"""
+
+import os
+import socket
+import struct
+import threading
+from typing import Dict, Optional
+
+import alfred_client as ac
+
+LOCAL_MAC = "fe:00:00:00:00:01"   # Quelle für Pushes mit leerer Source
+
+
+class FakeAlfredServer:
+    def __init__(self, path: str, store: Optional[Dict[int, Dict[str, bytes]]] = None,
+                 error_types: Optional[set] = None) -> None:
+        self.path = path
+        self.store: Dict[int, Dict[str, bytes]] = store or {}
+        self.error_types = error_types or set()   # Typen, auf die mit STATUS_ERROR geantwortet wird
+        self.requests = 0
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> "FakeAlfredServer":
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(self.path)
+        self._sock.listen(8)
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
+            self._sock = None
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def _serve(self) -> None:
+        while self._sock is not None:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            with conn:
+                try:
+                    self._handle(conn)
+                except OSError:
+                    pass
+
+    def _handle(self, conn: socket.socket) -> None:
+        hdr = ac._recv_exact(conn, 4)
+        if len(hdr) < 4:
+            return
+        ptype, _ver, length = struct.unpack("!BBH", hdr)
+        body = ac._recv_exact(conn, length)
+
+        if ptype == ac.ALFRED_REQUEST:
+            dtype, tx_id = struct.unpack("!BH", body[:3])
+            with self._lock:
+                self.requests += 1
+                items = list(self.store.get(dtype, {}).items())
+            if dtype in self.error_types:
+                conn.sendall(struct.pack("!BBHHH", ac.ALFRED_STATUS_ERROR, 0, 4, tx_id, 0))
+                return
+            for seq, (mac, data) in enumerate(items):
+                src = bytes(int(x, 16) for x in mac.split(":"))
+                conn.sendall(ac.pack_push(dtype, data, tx_id, source=src, seqno=seq))
+            # der echte Daemon schließt die Verbindung nach dem letzten Datensatz
+
+        elif ptype == ac.ALFRED_PUSH_DATA:
+            for rec in ac.parse_push_body(body):
+                mac = LOCAL_MAC if rec.mac == "00:00:00:00:00:00" else rec.mac
+                with self._lock:
+                    self.store.setdefault(rec.type, {})[mac] = rec.data
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    ap = argparse.ArgumentParser(description="Fake ALFRED daemon for local testing.")
+    ap.add_argument("--socket", default="/tmp/alfred.sock")
+    ap.add_argument("--type", type=int, default=ac.ALFRED_HOSTNAME_TYPE)
+    ap.add_argument("--record", action="append", default=[], metavar="MAC=VALUE")
+    args = ap.parse_args()
+
+    store = {args.type: {}}
+    for r in args.record:
+        mac, _, val = r.partition("=")
+        store[args.type][mac.lower()] = val.encode()
+    srv = FakeAlfredServer(args.socket, store).start()
+    print(f"fake alfred listening on {args.socket}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        srv.stop()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Minimal netlink / generic netlink helpers
+-----------------------------------------
+Just enough of the netlink wire format to talk to nl80211 and batman-adv
+from Python without spawning `iw` or `batctl`:
+
+- pack/parse netlink attributes (TLV, 4-byte aligned)
+- split a receive buffer into netlink messages
+- NetlinkSocket: request/dump with sequence numbers and error handling
+- GenlSocket: generic netlink family + multicast group resolution
+
+The parse functions work on plain bytes, so canned messages can be fed in
+without any socket.
+"""
+
+import os
+import socket
+import struct
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# --- netlink ---
+NETLINK_ROUTE = 0
+NETLINK_GENERIC = 16
+SOL_NETLINK = 270
+NETLINK_ADD_MEMBERSHIP = 1
+
+NLM_F_REQUEST = 0x01
+NLM_F_MULTI = 0x02
+NLM_F_ACK = 0x04
+NLM_F_DUMP = 0x300
+
+NLMSG_NOOP = 1
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+
+NLA_F_NESTED = 0x8000
+NLA_TYPE_MASK = 0x3FFF
+
+_NLMSGHDR = struct.Struct("=IHHII")
+_GENLMSGHDR = struct.Struct("=BBH")
+_NLATTR = struct.Struct("=HH")
+
+# --- generic netlink controller ---
+GENL_ID_CTRL = 0x10
+CTRL_CMD_GETFAMILY = 3
+CTRL_ATTR_FAMILY_ID = 1
+CTRL_ATTR_FAMILY_NAME = 2
+CTRL_ATTR_MCAST_GROUPS = 7
+CTRL_ATTR_MCAST_GRP_NAME = 1
+CTRL_ATTR_MCAST_GRP_ID = 2
+
+
+class NlMsg(NamedTuple):
+    type: int
+    flags: int
+    seq: int
+    payload: bytes
+
+
+class Family(NamedTuple):
+    id: int
+    groups: Dict[str, int]
+
+
+# ---------------------- attributes ----------------------
+def _align(n: int) -> int:
+    return (n + 3) & ~3
+
+
+def pack_attr(atype: int, payload: bytes) -> bytes:
+    hdr = _NLATTR.pack(_NLATTR.size + len(payload), atype)
+    return hdr + payload + b"\0" * (_align(len(payload)) - len(payload))
+
+
+def pack_nested(atype: int, *attrs: bytes) -> bytes:
+    return pack_attr(atype | NLA_F_NESTED, b"".join(attrs))
+
+
+def pack_u8(atype: int, v: int) -> bytes:
+    return pack_attr(atype, struct.pack("=B", v))
+
+
+def pack_u16(atype: int, v: int) -> bytes:
+    return pack_attr(atype, struct.pack("=H", v))
+
+
+def pack_u32(atype: int, v: int) -> bytes:
+    return pack_attr(atype, struct.pack("=I", v))
+
+
+def pack_u64(atype: int, v: int) -> bytes:
+    return pack_attr(atype, struct.pack("=Q", v))
+
+
+def pack_str(atype: int, s: str) -> bytes:
+    return pack_attr(atype, s.encode() + b"\0")
+
+
+def iter_attrs(data: bytes, offset: int = 0) -> Iterator[Tuple[int, bytes]]:
+    """Yield (type, payload) for every attribute in `data[offset:]`."""
+    end = len(data)
+    while offset + _NLATTR.size <= end:
+        alen, atype = _NLATTR.unpack_from(data, offset)
+        if alen < _NLATTR.size or offset + alen > end:
+            break
+        yield atype & NLA_TYPE_MASK, data[offset + _NLATTR.size:offset + alen]
+        offset += _align(alen)
+
+
+def parse_attrs(data: bytes, offset: int = 0) -> Dict[int, bytes]:
+    """Attributes as {type: payload}; duplicates: last one wins."""
+    return dict(iter_attrs(data, offset))
+
+
+def u8(b: bytes) -> int:
+    return b[0]
+
+
+def s8(b: bytes) -> int:
+    return struct.unpack_from("=b", b)[0]
+
+
+def u16(b: bytes) -> int:
+    return struct.unpack_from("=H", b)[0]
+
+
+def u32(b: bytes) -> int:
+    return struct.unpack_from("=I", b)[0]
+
+
+def u64(b: bytes) -> int:
+    return struct.unpack_from("=Q", b)[0]
+
+
+def s64(b: bytes) -> int:
+    return struct.unpack_from("=q", b)[0]
+
+
+def cstr(b: bytes) -> str:
+    return b.split(b"\0", 1)[0].decode(errors="replace")
+
+
+def mac(b: bytes) -> str:
+    return ":".join(f"{x:02x}" for x in b[:6])
+
+
+def unpack_uint(b: bytes) -> int:
+    """Unsigned integer of whatever width the kernel sent (1/2/4/8 bytes)."""
+    n = len(b)
+    if n >= 8:
+        return u64(b)
+    if n >= 4:
+        return u32(b)
+    if n >= 2:
+        return u16(b)
+    return b[0] if n else 0
+
+
+# ---------------------- messages ----------------------
+def pack_msg(mtype: int, flags: int, seq: int, payload: bytes, pid: int = 0) -> bytes:
+    return _NLMSGHDR.pack(_NLMSGHDR.size + len(payload), mtype, flags, seq, pid) + payload
+
+
+def pack_genl_msg(family_id: int, cmd: int, attrs: bytes = b"", flags: int = NLM_F_REQUEST,
+                  seq: int = 0, version: int = 1) -> bytes:
+    return pack_msg(family_id, flags, seq, _GENLMSGHDR.pack(cmd, version, 0) + attrs)
+
+
+def parse_messages(data: bytes) -> List[NlMsg]:
+    """Split a receive buffer into netlink messages."""
+    msgs: List[NlMsg] = []
+    offset, end = 0, len(data)
+    while offset + _NLMSGHDR.size <= end:
+        mlen, mtype, flags, seq, _pid = _NLMSGHDR.unpack_from(data, offset)
+        if mlen < _NLMSGHDR.size or offset + mlen > end:
+            break
+        msgs.append(NlMsg(mtype, flags, seq, data[offset + _NLMSGHDR.size:offset + mlen]))
+        offset += _align(mlen)
+    return msgs
+
+
+def genl_cmd(payload: bytes) -> int:
+    return payload[0] if payload else 0
+
+
+def genl_attrs(payload: bytes) -> Dict[int, bytes]:
+    """Attributes of a generic netlink message payload (after genlmsghdr)."""
+    return parse_attrs(payload, _GENLMSGHDR.size)
+
+
+def error_code(payload: bytes) -> int:
+    """errno of an NLMSG_ERROR payload (0 = ACK)."""
+    return -struct.unpack_from("=i", payload)[0] if len(payload) >= 4 else 0
+
+
+# ---------------------- sockets ----------------------
+class NetlinkSocket:
+    RCVBUF = 64 * 1024
+
+    def __init__(self, protocol: int, timeout: Optional[float] = 2.0, groups: int = 0) -> None:
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, protocol)
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1024 * 1024)
+        except OSError:
+            pass
+        self.sock.bind((0, groups))
+        self.sock.settimeout(timeout)
+        self._seq = int.from_bytes(os.urandom(2), "little")
+
+    def fileno(self) -> int:
+        return self.sock.fileno()
+
+    def close(self) -> None:
+        try:
+            self.sock.close()
+        except Exception:
+            pass
+
+    def next_seq(self) -> int:
+        self._seq = (self._seq + 1) & 0xFFFFFFFF
+        return self._seq
+
+    def add_membership(self, group: int) -> None:
+        self.sock.setsockopt(SOL_NETLINK, NETLINK_ADD_MEMBERSHIP, group)
+
+    def recv_messages(self) -> List[NlMsg]:
+        return parse_messages(self.sock.recv(self.RCVBUF))
+
+    def transact(self, msg: bytes, seq: int, dump: bool) -> List[NlMsg]:
+        """
+        Send `msg` and collect the replies with sequence number `seq`.
+        Raises OSError on NLMSG_ERROR with a non-zero errno.
+        """
+        self.sock.send(msg)
+        replies: List[NlMsg] = []
+        while True:
+            for m in self.recv_messages():
+                if m.seq != seq:
+                    continue          # z. B. Multicast-Events auf demselben Socket
+                if m.type == NLMSG_DONE:
+                    return replies
+                if m.type == NLMSG_ERROR:
+                    err = error_code(m.payload)
+                    if err:
+                        raise OSError(err, os.strerror(err))
+                    return replies
+                if m.type == NLMSG_NOOP:
+                    continue
+                replies.append(m)
+                if not dump and not (m.flags & NLM_F_MULTI):
+                    return replies
+
+
+class GenlSocket(NetlinkSocket):
+    def __init__(self, timeout: Optional[float] = 2.0) -> None:
+        super().__init__(NETLINK_GENERIC, timeout)
+        self._families: Dict[str, Family] = {}
+
+    def family(self, name: str) -> Family:
+        """Resolve a generic netlink family (cached per socket)."""
+        fam = self._families.get(name)
+        if fam is not None:
+            return fam
+        seq = self.next_seq()
+        msg = pack_genl_msg(GENL_ID_CTRL, CTRL_CMD_GETFAMILY, pack_str(CTRL_ATTR_FAMILY_NAME, name),
+                            flags=NLM_F_REQUEST, seq=seq)
+        replies = self.transact(msg, seq, dump=False)
+        if not replies:
+            raise OSError(f"genl family {name!r} not available")
+        fam = parse_family(replies[0].payload)
+        self._families[name] = fam
+        return fam
+
+    def dump(self, family: str, cmd: int, attrs: bytes = b"", version: int = 1) -> List[NlMsg]:
+        fam = self.family(family)
+        seq = self.next_seq()
+        msg = pack_genl_msg(fam.id, cmd, attrs, flags=NLM_F_REQUEST | NLM_F_DUMP, seq=seq, version=version)
+        return self.transact(msg, seq, dump=True)
+
+    def subscribe(self, family: str, group: str) -> None:
+        fam = self.family(family)
+        if group not in fam.groups:
+            raise OSError(f"genl family {family!r} has no multicast group {group!r}")
+        self.add_membership(fam.groups[group])
+
+
+def parse_family(payload: bytes) -> Family:
+    attrs = genl_attrs(payload)
+    groups: Dict[str, int] = {}
+    for _idx, grp in iter_attrs(attrs.get(CTRL_ATTR_MCAST_GROUPS, b"")):
+        g = parse_attrs(grp)
+        if CTRL_ATTR_MCAST_GRP_NAME in g and CTRL_ATTR_MCAST_GRP_ID in g:
+            groups[cstr(g[CTRL_ATTR_MCAST_GRP_NAME])] = u32(g[CTRL_ATTR_MCAST_GRP_ID])
+    return Family(u16(attrs[CTRL_ATTR_FAMILY_ID]), groups)
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Per-neighbor metric history
+---------------------------
+Keeps the last N minutes of samples per neighbor MAC in fixed-size,
+array-backed ring buffers (one array('d') per metric), so memory per
+neighbor has a hard upper bound. From the counters it derives per-second
+rates over a short window:
+
+- tx_retry_ratio  = d(tx_retries) / d(tx_packets)
+- tx_fail_ratio   = d(tx_failed)  / d(tx_packets)
+- rx_drop_rate    = d(rx_drop_misc) / dt   (1/s)
+
+Buffers of neighbors that left the originator table are evicted.
+HistoryServer answers history queries over a unix socket, so the web app
+can fetch a neighbor's buffer on demand.
+"""
+
+import json
+import math
+import os
+import socketserver
+import threading
+from array import array
+from typing import Any, Dict, Iterable, List, Optional
+
+HISTORY_SOCK = "/run/ogm_monitor/history.sock"
+
+METRICS = ("signal_dbm", "throughput", "tx_bitrate_mbps", "rx_bitrate_mbps",
+           "rx_packets", "tx_packets", "tx_retries", "tx_failed", "rx_drop_misc")
+
+_NAN = float("nan")
+
+
+class NeighborHistory:
+    """Ring buffer of (timestamp, metrics...) with fixed capacity."""
+
+    __slots__ = ("capacity", "ts", "cols", "head", "count", "last_update")
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.ts = array("d", [_NAN]) * capacity
+        self.cols = {m: array("d", [_NAN]) * capacity for m in METRICS}
+        self.head = 0          # nächster Schreibplatz
+        self.count = 0
+        self.last_update = 0.0
+
+    def nbytes(self) -> int:
+        return self.ts.itemsize * self.capacity * (1 + len(self.cols))
+
+    def append(self, ts: float, sample: Dict[str, Any]) -> None:
+        i = self.head
+        self.ts[i] = ts
+        for m, col in self.cols.items():
+            v = sample.get(m)
+            col[i] = float(v) if isinstance(v, (int, float)) else _NAN
+        self.head = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+        self.last_update = ts
+
+    def _indices(self) -> Iterable[int]:
+        start = (self.head - self.count) % self.capacity
+        for k in range(self.count):
+            yield (start + k) % self.capacity
+
+    def samples(self, since: float = 0.0) -> Dict[str, List[Optional[float]]]:
+        """Column-wise samples (oldest first) newer than `since`."""
+        out: Dict[str, List[Optional[float]]] = {"ts": []}
+        for m in METRICS:
+            out[m] = []
+        for i in self._indices():
+            if self.ts[i] <= since:
+                continue
+            out["ts"].append(self.ts[i])
+            for m, col in self.cols.items():
+                v = col[i]
+                out[m].append(None if math.isnan(v) else v)
+        return out
+
+    def _delta(self, metric: str, window: float) -> Optional[tuple]:
+        """(d_value, d_t) between the oldest and newest valid sample within `window`."""
+        if self.count < 2:
+            return None
+        col = self.cols[metric]
+        newest = (self.head - 1) % self.capacity
+        t_new = self.ts[newest]
+        v_new = col[newest]
+        if math.isnan(v_new):
+            return None
+        best = None
+        for k in range(1, self.count):
+            i = (newest - k) % self.capacity
+            if t_new - self.ts[i] > window:
+                break
+            v = col[i]
+            if math.isnan(v):
+                continue
+            if v > v_new:
+                break          # Zähler-Reset (z. B. Re-Association): nur danach auswerten
+            best = (v_new - v, t_new - self.ts[i])
+        return best
+
+    def rates(self, window: float) -> Dict[str, float]:
+        out: Dict[str, float] = {}
+        d_tx = self._delta("tx_packets", window)
+        if d_tx and d_tx[0] > 0:
+            d_retry = self._delta("tx_retries", window)
+            d_fail = self._delta("tx_failed", window)
+            if d_retry:
+                out["tx_retry_ratio"] = round(d_retry[0] / d_tx[0], 4)
+            if d_fail:
+                out["tx_fail_ratio"] = round(d_fail[0] / d_tx[0], 4)
+        d_drop = self._delta("rx_drop_misc", window)
+        if d_drop and d_drop[1] > 0:
+            out["rx_drop_rate"] = round(d_drop[0] / d_drop[1], 3)
+        return out
+
+
+class HistoryStore:
+    """
+    NeighborHistory per MAC. Capacity = window / sample interval; at most
+    `max_neighbors` buffers. Fed with the direct neighbors only; when full,
+    the least recently updated buffer is dropped, but never one updated in
+    the current tick (new MACs are then not tracked until space frees up).
+    """
+
+    def __init__(self, window_sec: float = 600, sample_interval: float = 1.0,
+                 max_neighbors: int = 128, evict_after: float = 30.0,
+                 rate_window: float = 10.0) -> None:
+        self.capacity = max(2, int(window_sec / sample_interval))
+        self.window_sec = window_sec
+        self.max_neighbors = max_neighbors
+        self.evict_after = evict_after
+        self.rate_window = rate_window
+        self._buffers: Dict[str, NeighborHistory] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+    def update(self, ts: float, nodes: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+        """Append one sample per node, evict aged-out MACs, return rates per MAC."""
+        rates: Dict[str, Dict[str, float]] = {}
+        no_room = False
+        with self._lock:
+            for mac, info in nodes.items():
+                buf = self._buffers.get(mac)
+                if buf is None:
+                    if no_room:
+                        continue
+                    if len(self._buffers) >= self.max_neighbors:
+                        oldest = min(self._buffers, key=lambda m: self._buffers[m].last_update)
+                        if self._buffers[oldest].last_update >= ts:
+                            no_room = True  # alle in diesem Tick aktualisiert: nicht verdrängen
+                            continue
+                        del self._buffers[oldest]
+                    buf = self._buffers[mac] = NeighborHistory(self.capacity)
+                buf.append(ts, info)
+                rates[mac] = buf.rates(self.rate_window)
+
+            for mac in [m for m, b in self._buffers.items()
+                        if m not in nodes and ts - b.last_update > self.evict_after]:
+                del self._buffers[mac]
+        return rates
+
+    def query(self, mac: Optional[str] = None, since: float = 0.0) -> Dict[str, Any]:
+        with self._lock:
+            if mac:
+                buf = self._buffers.get(mac.lower())
+                if buf is None:
+                    return {"error": "unknown mac", "mac": mac}
+                return {"mac": mac.lower(), "window_sec": self.window_sec,
+                        "rates": buf.rates(self.rate_window), "samples": buf.samples(since)}
+            return {"window_sec": self.window_sec, "capacity": self.capacity,
+                    "bytes_per_neighbor": NeighborHistory(1).nbytes() * self.capacity,
+                    "neighbors": {m: {"count": b.count, "last_update": b.last_update,
+                                      "rates": b.rates(self.rate_window)}
+                                  for m, b in self._buffers.items()}}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        try:
+            req = json.loads(self.rfile.readline(4096) or b"{}")
+            resp = self.server.store.query(req.get("mac"), float(req.get("since") or 0))
+        except Exception as e:
+            resp = {"error": str(e)}
+        self.wfile.write(json.dumps(resp, separators=(",", ":")).encode() + b"\n")
+
+
+class HistoryServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """One JSON line in ({"mac": ..., "since": ...}), one JSON line out."""
+    daemon_threads = True
+
+    def __init__(self, store: HistoryStore, path: str = HISTORY_SOCK) -> None:
+        if os.path.exists(path):
+            os.unlink(path)
+        self.store = store
+        super().__init__(path, _Handler)
+        os.chmod(path, 0o666)
+
+    def start(self) -> "HistoryServer":
+        threading.Thread(target=self.serve_forever, daemon=True, name="ogm-history").start()
+        return self
+
+
+def query_history(mac: Optional[str] = None, since: float = 0.0, path: str = HISTORY_SOCK,
+                  timeout: float = 2.0) -> Dict[str, Any]:
+    """Client side of HistoryServer (used by the web app)."""
+    import socket
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(timeout)
+        s.connect(path)
+        s.sendall(json.dumps({"mac": mac, "since": since}).encode() + b"\n")
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = s.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    return json.loads(data or b"{}")
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+nl80211 station collector
+-------------------------
+Reads station info (NL80211_CMD_GET_STATION dump) directly over a generic
+netlink socket, i.e. the same data `iw dev <iface> station dump` prints, but
+without fork/exec/sudo. The socket is kept open between polls.
+
+`parse_station_messages()` works on raw receive buffers, so the decoder can
+be exercised with canned netlink messages on machines without Wi-Fi.
+samples/iw_station_dump.txt and samples/nl80211_station_dump.bin hold the
+same stations in both formats:
+
+    python3 nl80211.py --compare samples/iw_station_dump.txt samples/nl80211_station_dump.bin
+"""
+
+import socket
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import genl
+from station_parser import StationInfo
+
+NL80211_GENL_NAME = "nl80211"
+
+# commands
+NL80211_CMD_GET_STATION = 17
+NL80211_CMD_NEW_STATION = 19
+NL80211_CMD_DEL_STATION = 20
+
+# top level attributes
+NL80211_ATTR_IFINDEX = 3
+NL80211_ATTR_IFNAME = 4
+NL80211_ATTR_MAC = 6
+NL80211_ATTR_STA_INFO = 21
+
+# nested NL80211_ATTR_STA_INFO
+NL80211_STA_INFO_INACTIVE_TIME = 1
+NL80211_STA_INFO_RX_BYTES = 2
+NL80211_STA_INFO_TX_BYTES = 3
+NL80211_STA_INFO_LLID = 4
+NL80211_STA_INFO_PLID = 5
+NL80211_STA_INFO_PLINK_STATE = 6
+NL80211_STA_INFO_SIGNAL = 7
+NL80211_STA_INFO_TX_BITRATE = 8
+NL80211_STA_INFO_RX_PACKETS = 9
+NL80211_STA_INFO_TX_PACKETS = 10
+NL80211_STA_INFO_TX_RETRIES = 11
+NL80211_STA_INFO_TX_FAILED = 12
+NL80211_STA_INFO_SIGNAL_AVG = 13
+NL80211_STA_INFO_RX_BITRATE = 14
+NL80211_STA_INFO_CONNECTED_TIME = 16
+NL80211_STA_INFO_BEACON_LOSS = 18
+NL80211_STA_INFO_T_OFFSET = 19
+NL80211_STA_INFO_LOCAL_PM = 20
+NL80211_STA_INFO_PEER_PM = 21
+NL80211_STA_INFO_NONPEER_PM = 22
+NL80211_STA_INFO_RX_BYTES64 = 23
+NL80211_STA_INFO_TX_BYTES64 = 24
+NL80211_STA_INFO_EXPECTED_THROUGHPUT = 27
+NL80211_STA_INFO_RX_DROP_MISC = 28
+NL80211_STA_INFO_BEACON_RX = 29
+NL80211_STA_INFO_BEACON_SIGNAL_AVG = 30
+NL80211_STA_INFO_RX_DURATION = 32
+NL80211_STA_INFO_ACK_SIGNAL = 34
+NL80211_STA_INFO_ACK_SIGNAL_AVG = 35
+NL80211_STA_INFO_RX_MPDUS = 36
+NL80211_STA_INFO_FCS_ERROR_COUNT = 37
+NL80211_STA_INFO_CONNECTED_TO_GATE = 38
+NL80211_STA_INFO_TX_DURATION = 39
+NL80211_STA_INFO_AIRTIME_LINK_METRIC = 41
+
+# nested rate info
+NL80211_RATE_INFO_BITRATE = 1      # u16, 100 kbit/s
+NL80211_RATE_INFO_MCS = 2
+NL80211_RATE_INFO_BITRATE32 = 5    # u32, 100 kbit/s
+
+PLINK_STATES = ("LISTEN", "OPN_SNT", "OPN_RCVD", "CNF_RCVD", "ESTAB", "HOLDING", "BLOCKED")
+
+
+def _bitrate_mbps(b: bytes) -> Optional[float]:
+    rate = genl.parse_attrs(b)
+    if NL80211_RATE_INFO_BITRATE32 in rate:
+        return genl.u32(rate[NL80211_RATE_INFO_BITRATE32]) / 10.0
+    if NL80211_RATE_INFO_BITRATE in rate:
+        return genl.u16(rate[NL80211_RATE_INFO_BITRATE]) / 10.0
+    return None
+
+
+def _plink(b: bytes) -> str:
+    v = genl.u8(b)
+    return PLINK_STATES[v] if v < len(PLINK_STATES) else str(v)
+
+
+# STA_INFO attr -> (StationInfo-Feld, Decoder); gleiche Namen wie station_parser
+_FIELDS: Dict[int, Tuple[str, Callable[[bytes], Any]]] = {
+    NL80211_STA_INFO_SIGNAL: ("signal_dbm", lambda b: float(genl.s8(b))),
+    NL80211_STA_INFO_SIGNAL_AVG: ("signal_avg_dbm", lambda b: float(genl.s8(b))),
+    NL80211_STA_INFO_RX_PACKETS: ("rx_packets", genl.u32),
+    NL80211_STA_INFO_RX_DROP_MISC: ("rx_drop_misc", genl.unpack_uint),
+    NL80211_STA_INFO_TX_PACKETS: ("tx_packets", genl.u32),
+    NL80211_STA_INFO_TX_RETRIES: ("tx_retries", genl.u32),
+    NL80211_STA_INFO_TX_FAILED: ("tx_failed", genl.u32),
+    NL80211_STA_INFO_TX_BITRATE: ("tx_bitrate_mbps", _bitrate_mbps),
+    NL80211_STA_INFO_RX_BITRATE: ("rx_bitrate_mbps", _bitrate_mbps),
+    NL80211_STA_INFO_INACTIVE_TIME: ("inactive_time_ms", genl.u32),
+    NL80211_STA_INFO_EXPECTED_THROUGHPUT: ("expected_throughput_mbps", lambda b: genl.u32(b) / 1000.0),
+}
+
+# weitere STA_INFO-Attribute -> StationInfo.extra
+_EXTRA: Dict[int, Tuple[str, Callable[[bytes], Any]]] = {
+    NL80211_STA_INFO_RX_BYTES64: ("rx_bytes", genl.u64),
+    NL80211_STA_INFO_TX_BYTES64: ("tx_bytes", genl.u64),
+    NL80211_STA_INFO_LLID: ("mesh_llid", genl.u16),
+    NL80211_STA_INFO_PLID: ("mesh_plid", genl.u16),
+    NL80211_STA_INFO_PLINK_STATE: ("mesh_plink", _plink),
+    NL80211_STA_INFO_CONNECTED_TIME: ("connected_time_s", genl.u32),
+    NL80211_STA_INFO_BEACON_LOSS: ("beacon_loss", genl.u32),
+    NL80211_STA_INFO_BEACON_RX: ("beacon_rx", genl.u64),
+    NL80211_STA_INFO_BEACON_SIGNAL_AVG: ("beacon_signal_avg_dbm", lambda b: float(genl.s8(b))),
+    NL80211_STA_INFO_T_OFFSET: ("t_offset_us", genl.s64),
+    NL80211_STA_INFO_LOCAL_PM: ("mesh_local_pm", genl.u32),
+    NL80211_STA_INFO_PEER_PM: ("mesh_peer_pm", genl.u32),
+    NL80211_STA_INFO_NONPEER_PM: ("mesh_nonpeer_pm", genl.u32),
+    NL80211_STA_INFO_RX_DURATION: ("rx_duration_us", genl.u64),
+    NL80211_STA_INFO_TX_DURATION: ("tx_duration_us", genl.u64),
+    NL80211_STA_INFO_ACK_SIGNAL: ("ack_signal_dbm", lambda b: float(genl.s8(b))),
+    NL80211_STA_INFO_ACK_SIGNAL_AVG: ("ack_signal_avg_dbm", lambda b: float(genl.s8(b))),
+    NL80211_STA_INFO_RX_MPDUS: ("rx_mpdus", genl.u32),
+    NL80211_STA_INFO_FCS_ERROR_COUNT: ("fcs_error_count", genl.u32),
+    NL80211_STA_INFO_CONNECTED_TO_GATE: ("mesh_connected_to_gate", lambda b: bool(genl.u8(b))),
+    NL80211_STA_INFO_AIRTIME_LINK_METRIC: ("mesh_airtime_link_metric", genl.u32),
+}
+
+
+def parse_station(attrs: Dict[int, bytes], iface: str = "") -> Optional[StationInfo]:
+    """One NL80211_CMD_NEW_STATION message (top level attrs) -> StationInfo."""
+    if NL80211_ATTR_MAC not in attrs:
+        return None
+    st = StationInfo(mac=genl.mac(attrs[NL80211_ATTR_MAC]), iface=iface)
+    if not iface and NL80211_ATTR_IFINDEX in attrs:
+        try:
+            st.iface = socket.if_indextoname(genl.u32(attrs[NL80211_ATTR_IFINDEX]))
+        except OSError:
+            pass
+
+    for atype, payload in genl.iter_attrs(attrs.get(NL80211_ATTR_STA_INFO, b"")):
+        entry = _FIELDS.get(atype)
+        if entry is not None:
+            name, dec = entry
+            try:
+                v = dec(payload)
+            except Exception:
+                continue
+            if v is not None:
+                setattr(st, name, v)
+            continue
+        entry = _EXTRA.get(atype)
+        if entry is not None:
+            name, dec = entry
+            try:
+                st.extra[name] = dec(payload)
+            except Exception:
+                pass
+    return st
+
+
+def parse_station_messages(data: bytes, iface: str = "") -> List[StationInfo]:
+    """Decode a raw receive buffer (one or more netlink messages)."""
+    out: List[StationInfo] = []
+    for m in genl.parse_messages(data):
+        if m.type < 0x10 or genl.genl_cmd(m.payload) != NL80211_CMD_NEW_STATION:
+            continue
+        st = parse_station(genl.genl_attrs(m.payload), iface)
+        if st is not None:
+            out.append(st)
+    return out
+
+
+class Nl80211StationCollector:
+    """Persistent nl80211 socket; `stations(iface)` == `iw dev <iface> station dump`."""
+
+    def __init__(self, timeout: float = 2.0) -> None:
+        self.timeout = timeout
+        self._sock: Optional[genl.GenlSocket] = None
+
+    def _socket(self) -> genl.GenlSocket:
+        if self._sock is None:
+            self._sock = genl.GenlSocket(self.timeout)
+        return self._sock
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def stations(self, iface: str) -> List[StationInfo]:
+        ifindex = socket.if_nametoindex(iface)
+        try:
+            replies = self._socket().dump(NL80211_GENL_NAME, NL80211_CMD_GET_STATION,
+                                          genl.pack_u32(NL80211_ATTR_IFINDEX, ifindex), version=0)
+        except Exception:
+            # Socket nach Fehlern (Timeout, ENODEV, ...) neu aufbauen
+            self.close()
+            raise
+        out: List[StationInfo] = []
+        for m in replies:
+            st = parse_station(genl.genl_attrs(m.payload), iface)
+            if st is not None:
+                out.append(st)
+        return out
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from station_parser import parse_station_dump
+
+    ap = argparse.ArgumentParser(description="Show the station table via nl80211.")
+    ap.add_argument("--iface", default="wlan1")
+    ap.add_argument("--compare", nargs=2, metavar=("IW_TXT", "NL80211_BIN"),
+                    help="compare a recorded `iw station dump` output with a recorded GET_STATION dump")
+    args = ap.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            text_st = {st.mac: st for st in parse_station_dump(f.read())}
+        with open(args.compare[1], "rb") as f:
+            nl_st = {st.mac: st for st in parse_station_messages(f.read(), args.iface)}
+        diff = 0
+        for m in sorted(set(text_st) | set(nl_st)):
+            # nur die Felder, die beide Backends liefern (extra kommt nur aus nl80211)
+            a = {k: v for k, v in text_st[m].as_dict().items() if k not in text_st[m].extra} if m in text_st else None
+            b = {k: v for k, v in nl_st[m].as_dict().items() if k not in nl_st[m].extra} if m in nl_st else None
+            diff += a != b
+            print(f"{'ok  ' if a == b else 'DIFF'} {m} text={a} nl80211={b}")
+        raise SystemExit(1 if diff else 0)
+
+    stations = Nl80211StationCollector().stations(args.iface)
+    print(json.dumps({st.mac: st.as_dict() for st in stations}, indent=2))
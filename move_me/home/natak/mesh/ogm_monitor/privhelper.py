@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Privileged helper
+-----------------
+Small root service (mesh-privhelper.service) that runs a fixed allow-list
+of privileged operations for the OGM monitor and the web app, so neither
+has to pay fork + sudo + PAM for every call.
+
+Protocol: unix stream socket /run/mesh-privhelper/helper.sock, one JSON
+line per request and per response, any number of requests per connection:
+
+    -> {"op": "iw_station_dump", "args": {"iface": "wlan1"}}
+    <- {"ok": true, "rc": 0, "out": "...", "err": ""}
+    <- {"ok": false, "error": "unknown op"}                  (rejected)
+
+Only the operations in OPS exist; their argv is fixed and every argument
+is validated (interface name pattern, service allow-list, zoneinfo file,
+hostname syntax) before anything runs. Peers are checked via SO_PEERCRED
+(root and ALLOWED_USERS only).
+
+PrivHelperClient keeps a small pool of persistent connections (threads
+calling concurrently each get their own) and reconnects once if the
+helper was restarted in between.
+
+    python3 privhelper.py                           # serve (as root)
+    python3 privhelper.py --call batctl_o           # one request, print output
+    python3 privhelper.py --call iw_station_dump iface=wlan1
+"""
+
+import json
+import os
+import pwd
+import re
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+HELPER_SOCK = "/run/mesh-privhelper/helper.sock"
+ALLOWED_USERS = ("natak",)
+# gleiche Liste wie ALLOWED_SERVICES in app.py (+ systemd-networkd aus dem alten sudoers)
+SERVICES = ("dnsmasq", "reticulum", "networking", "systemd-networkd")
+ZONEINFO_DIR = "/usr/share/zoneinfo"
+LOG_PREFIX = "[privhelper]"
+
+_RE_IFACE = re.compile(r"[A-Za-z0-9_.-]{1,15}\Z")
+_RE_HOSTNAME = re.compile(r"[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\Z")
+_RE_TZ = re.compile(r"[A-Za-z0-9_+-]+(?:/[A-Za-z0-9_+-]+)*\Z")
+_PEERCRED = struct.Struct("3i")        # pid, uid, gid
+
+
+class HelperError(Exception):
+    """The helper rejected the request or the command failed."""
+
+
+class HelperUnavailable(HelperError):
+    """No connection to the helper (not running / socket missing)."""
+
+
+class HelperResult(NamedTuple):
+    rc: int
+    out: str
+    err: str
+
+
+def _iface(v: Any) -> str:
+    if not isinstance(v, str) or not _RE_IFACE.match(v):
+        raise ValueError(f"bad interface name {v!r}")
+    return v
+
+
+def _alfred_type(v: Any) -> str:
+    if not isinstance(v, int) or isinstance(v, bool) or not 0 <= v <= 255:
+        raise ValueError(f"bad alfred type {v!r}")
+    return str(v)
+
+
+def _service(v: Any) -> str:
+    if v not in SERVICES:
+        raise ValueError(f"service {v!r} not allowed")
+    return v
+
+
+def _timezone(v: Any) -> str:
+    if not isinstance(v, str) or not _RE_TZ.match(v) or ".." in v \
+            or not os.path.isfile(os.path.join(ZONEINFO_DIR, v)):
+        raise ValueError(f"unknown timezone {v!r}")
+    return v
+
+
+def _hostname(v: Any) -> str:
+    if not isinstance(v, str) or not _RE_HOSTNAME.match(v):
+        raise ValueError(f"bad hostname {v!r}")
+    return v
+
+
+class Op(NamedTuple):
+    argv: Tuple[str, ...]              # "{name}" wird durch das geprüfte Argument ersetzt
+    params: Dict[str, Callable[[Any], str]]
+    timeout: float
+    action: bool                       # ändert das System -> serialisiert + geloggt
+
+
+OPS: Dict[str, Op] = {
+    # lesend
+    "iw_station_dump": Op(("iw", "dev", "{iface}", "station", "dump"), {"iface": _iface}, 3, False),
+    "batctl_o":        Op(("batctl", "o"), {}, 3, False),
+    "batctl_if":       Op(("batctl", "if"), {}, 3, False),
+    "alfred_read":     Op(("alfred", "-r", "{type}"), {"type": _alfred_type}, 3, False),
+    # Aktionen
+    "restart_service": Op(("systemctl", "restart", "{service}"), {"service": _service}, 60, True),
+    "set_timezone":    Op(("timedatectl", "set-timezone", "{tz}"), {"tz": _timezone}, 10, True),
+    "set_hostname":    Op(("hostnamectl", "set-hostname", "{hostname}"), {"hostname": _hostname}, 10, True),
+    "reboot":          Op(("systemctl", "reboot"), {}, 10, True),
+}
+
+
+def build_argv(op: str, args: Dict[str, Any]) -> Tuple[Op, List[str]]:
+    """Validate a request against OPS; raises ValueError if it is not allowed."""
+    spec = OPS.get(op) if isinstance(op, str) else None
+    if spec is None:
+        raise ValueError(f"unknown op {op!r}")
+    if not isinstance(args, dict):
+        raise ValueError(f"args must be an object, got {type(args).__name__}")
+    extra = set(args) - set(spec.params)
+    if extra:
+        raise ValueError(f"unexpected arguments {sorted(extra)}")
+    values = {}
+    for name, check in spec.params.items():
+        if name not in args:
+            raise ValueError(f"missing argument {name!r}")
+        values[name] = check(args[name])
+    return spec, [values[a[1:-1]] if a.startswith("{") else a for a in spec.argv]
+
+
+# ---------------------- server ----------------------
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        if not self.server.peer_allowed(self.request):
+            self._reply({"ok": False, "error": "peer not allowed"})
+            return
+        for line in self.rfile:
+            try:
+                req = json.loads(line)
+                if not isinstance(req, dict):
+                    raise ValueError(f"request must be an object, got {type(req).__name__}")
+                args = req.get("args")
+                spec, argv = build_argv(req.get("op"), {} if args is None else args)
+            except ValueError as e:
+                self._reply({"ok": False, "error": str(e)})
+                continue
+            self._reply(self.server.execute(spec, argv))
+
+    def _reply(self, resp: Dict[str, Any]) -> None:
+        self.wfile.write(json.dumps(resp).encode() + b"\n")
+        self.wfile.flush()
+
+
+class PrivHelperServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str = HELPER_SOCK, allowed_users=ALLOWED_USERS) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            os.unlink(path)
+        self.allowed_uids = {0}
+        for name in allowed_users:
+            try:
+                self.allowed_uids.add(pwd.getpwnam(name).pw_uid)
+            except KeyError:
+                pass
+        self._action_lock = threading.Lock()
+        self._env = {"PATH": "/usr/sbin:/usr/bin:/sbin:/bin", "LANG": "C"}
+        super().__init__(path, _Handler)
+        os.chmod(path, 0o666)           # Zugriff regelt SO_PEERCRED
+
+    def peer_allowed(self, sock: socket.socket) -> bool:
+        _pid, uid, _gid = _PEERCRED.unpack(sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED,
+                                                           _PEERCRED.size))
+        return uid in self.allowed_uids
+
+    def execute(self, spec: Op, argv: List[str]) -> Dict[str, Any]:
+        if spec.action:
+            with self._action_lock:
+                print(f"{LOG_PREFIX} {' '.join(argv)}", flush=True)
+                return self._exec(spec, argv)
+        return self._exec(spec, argv)
+
+    def _exec(self, spec: Op, argv: List[str]) -> Dict[str, Any]:
+        try:
+            p = subprocess.run(argv, capture_output=True, text=True, errors="replace",
+                               timeout=spec.timeout, env=self._env)
+        except subprocess.TimeoutExpired:
+            return {"ok": True, "rc": -1, "out": "", "err": f"timeout after {spec.timeout}s"}
+        except OSError as e:
+            return {"ok": True, "rc": 127, "out": "", "err": str(e)}
+        return {"ok": True, "rc": p.returncode, "out": p.stdout, "err": p.stderr}
+
+
+# ---------------------- client ----------------------
+class _Conn:
+    def __init__(self, path: str, timeout: float) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.settimeout(timeout)
+            self.sock.connect(path)
+        except OSError:
+            self.sock.close()
+            raise
+        self.rfile = self.sock.makefile("rb")
+
+    def close(self) -> None:
+        self.rfile.close()
+        self.sock.close()
+
+
+class PrivHelperClient:
+    """Thread-safe; keeps up to `max_idle` connections open between calls."""
+
+    def __init__(self, path: str = HELPER_SOCK, timeout: float = 65.0, max_idle: int = 4) -> None:
+        self.path = path
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._idle: List[_Conn] = []
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        return os.path.exists(self.path)
+
+    def _get(self) -> Tuple[_Conn, bool]:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        try:
+            return _Conn(self.path, self.timeout), False
+        except OSError as e:
+            raise HelperUnavailable(f"{self.path}: {e}") from e
+
+    def _put(self, conn: _Conn) -> None:
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def call(self, op: str, timeout: Optional[float] = None, **args: Any) -> HelperResult:
+        """Run `op`; rc/out/err of the command. Raises HelperError if rejected."""
+        req = json.dumps({"op": op, "args": args}).encode() + b"\n"
+        while True:
+            conn, reused = self._get()
+            try:
+                conn.sock.settimeout(timeout or self.timeout)
+                conn.sock.sendall(req)
+                line = conn.rfile.readline()
+                if not line:
+                    raise ConnectionError("helper closed the connection")
+            except socket.timeout as e:
+                conn.close()
+                raise HelperError(f"{op}: no answer from helper: {e}") from e
+            except OSError as e:
+                conn.close()
+                if reused:
+                    continue        # Verbindung von vor einem Helper-Neustart
+                raise HelperUnavailable(f"{self.path}: {e}") from e
+            self._put(conn)
+            resp = json.loads(line)
+            if not resp.get("ok"):
+                raise HelperError(f"{op}: {resp.get('error', 'rejected')}")
+            return HelperResult(resp["rc"], resp["out"], resp["err"])
+
+    def check(self, op: str, timeout: Optional[float] = None, **args: Any) -> str:
+        """Like call(), but returns stdout and raises HelperError on a non-zero exit."""
+        r = self.call(op, timeout, **args)
+        if r.rc != 0:
+            raise HelperError(f"{op} exited {r.rc}: {(r.err or r.out).strip()}")
+        return r.out
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Privileged helper for the mesh monitor.")
+    ap.add_argument("--socket", default=HELPER_SOCK)
+    ap.add_argument("--call", nargs="+", metavar=("OP", "ARG=VALUE"),
+                    help="send one request to a running helper and print the output")
+    args = ap.parse_args()
+
+    if args.call:
+        op, kv = args.call[0], dict(a.split("=", 1) for a in args.call[1:])
+        kv = {k: int(v) if v.isdigit() else v for k, v in kv.items()}
+        r = PrivHelperClient(args.socket).call(op, **kv)
+        print(r.out, end="")
+        print(r.err, end="", file=sys.stderr)
+        raise SystemExit(r.rc)
+
+    server = PrivHelperServer(args.socket)
+    print(f"{LOG_PREFIX} listening on {args.socket} | ops: {' '.join(OPS)}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
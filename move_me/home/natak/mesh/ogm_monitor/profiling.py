@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tick instrumentation
+--------------------
+In-process timing for the OGM monitor, cheap enough to stay on:
+
+- Stats: latency histograms per phase (collector.<name>, subprocess.<tool>,
+  parse.<what>, merge, serialize, write, fsync, tick) plus counters
+  (subprocesses spawned, bytes parsed, ...). snapshot() gives count /
+  sum / max / avg and the bucket counts, write_json() dumps it to a stats
+  file (tmpfs) that the web app serves under /api/ogm-stats.
+- SamplingProfiler: on demand (SIGUSR1) samples the stacks of all threads
+  via sys._current_frames() for a few seconds and writes the hottest
+  functions (self and inclusive) to a text report, without restarting.
+
+    stats = Stats()
+    with stats.timer("merge"):
+        ...
+    stats.count("bytes.iw", len(out))
+"""
+
+import collections
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+STATS_FILE = "/run/ogm_monitor/stats.json"
+PROFILE_FILE = "/run/ogm_monitor/profile.txt"
+
+# obere Bucket-Grenzen in ms; alles darüber landet in "+inf"
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class Histogram:
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms: float) -> None:
+        self.buckets[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def as_dict(self) -> Dict[str, Any]:
+        labels = [f"le_{b}" for b in BUCKETS_MS] + ["inf"]
+        return {"count": self.count, "sum_ms": round(self.total, 1), "max_ms": round(self.max, 1),
+                "avg_ms": round(self.total / self.count, 2) if self.count else None,
+                "buckets": {k: n for k, n in zip(labels, self.buckets) if n}}
+
+
+class Stats:
+    """Thread-safe histograms + counters (collectors run in a thread pool)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hist: Dict[str, Histogram] = {}
+        self._counters: Dict[str, int] = collections.Counter()
+        self.started = time.time()
+
+    def observe(self, name: str, ms: float) -> None:
+        with self._lock:
+            h = self._hist.get(name)
+            if h is None:
+                h = self._hist[name] = Histogram()
+            h.add(ms)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - t0) * 1000.0)
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += n
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"started": self.started, "uptime": round(time.time() - self.started, 1),
+                    "bucket_bounds_ms": list(BUCKETS_MS),
+                    "phases": {k: h.as_dict() for k, h in sorted(self._hist.items())},
+                    "counters": dict(sorted(self._counters.items()))}
+
+    def write_json(self, path: str = STATS_FILE, extra: Optional[Dict[str, Any]] = None) -> None:
+        from status_writer import atomic_write
+        snap = self.snapshot()
+        if extra:
+            snap.update(extra)
+        atomic_write(path, json.dumps(snap, separators=(",", ":")).encode(), fsync=False)
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler over all threads. start() returns immediately;
+    after `duration` seconds the report is written to `path`.
+    """
+
+    def __init__(self, path: str = PROFILE_FILE, duration: float = 10.0,
+                 interval: float = 0.005, top: int = 30) -> None:
+        self.path = path
+        self.duration = duration
+        self.interval = interval
+        self.top = top
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        if self.running:
+            return False
+        self._thread = threading.Thread(target=self._run, daemon=True, name="ogm-profiler")
+        self._thread.start()
+        return True
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        own: collections.Counter = collections.Counter()
+        incl: collections.Counter = collections.Counter()
+        samples = 0
+        end = time.monotonic() + self.duration
+        while time.monotonic() < end:
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                seen = set()
+                leaf = True
+                while frame is not None:
+                    code = frame.f_code
+                    key = (names.get(tid, str(tid)) if leaf else "", code.co_filename,
+                           code.co_firstlineno, code.co_name)
+                    if leaf:
+                        own[key] += 1
+                        leaf = False
+                    fkey = key[1:]
+                    if fkey not in seen:
+                        incl[fkey] += 1
+                        seen.add(fkey)
+                    frame = frame.f_back
+            samples += 1
+            time.sleep(self.interval)
+        self._report(own, incl, samples)
+
+    def _report(self, own: collections.Counter, incl: collections.Counter, samples: int) -> None:
+        def fmt(rows: List[Tuple[Any, int]], with_thread: bool) -> List[str]:
+            out = []
+            for key, n in rows:
+                thread, (fn, line, name) = (key[0], key[1:]) if with_thread else ("", key)
+                where = f"{os.path.basename(fn)}:{line} {name}"
+                out.append(f"{n:7d} {100.0 * n / max(samples, 1):6.1f}%  {where}"
+                           + (f"  [{thread}]" if thread else ""))
+            return out
+
+        lines = [f"# {samples} samples over {self.duration:.1f}s, every {self.interval * 1000:.0f}ms, "
+                 f"{time.strftime('%Y-%m-%d %H:%M:%S')}",
+                 "", "## self (innermost frame)"] + fmt(own.most_common(self.top), True) + \
+                ["", "## inclusive"] + fmt(incl.most_common(self.top), False)
+        try:
+            from status_writer import atomic_write
+            atomic_write(self.path, ("\n".join(lines) + "\n").encode(), fsync=False)
+            print(f"[ogm] profile written to {self.path}")
+        except OSError as e:
+            print(f"[ogm] profile write failed: {e}")
+            print("\n".join(lines))
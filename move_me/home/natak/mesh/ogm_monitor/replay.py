@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Record / replay harness for the OGM monitor
+-------------------------------------------
+Drives EnhancedOGMMonitor without a radio mesh:
+
+- record: runs the real monitor (text backends, so the raw data is kept)
+  and logs every `batctl o` / `iw ... station dump` / `alfred -r` output,
+  every ALFRED socket answer and every power_supply read, one frame per tick
+- play:   feeds a recording back into the monitor, at real speed, faster
+  (--speed 10) or as fast as possible (--speed 0); nothing is read from the
+  system and nothing is written outside the output directory
+- synth:  generates a recording of a synthetic mesh with N originators and
+  M stations, churn and growing counters
+- bench:  build_status / write_status per tick at 10, 100, 1000 nodes;
+  --json saves the result, --compare shows the change against an earlier run
+
+Recording format (JSON lines): a header
+    {"format": "ogm-replay/1", "local_mac": ..., "ifaces": [...]}
+then one frame per tick
+    {"t": unix ts, "run": {"batctl o": out, ...}, "files": {path: content},
+     "alfred": {"64": [[mac, type, version, hexdata], ...]}}
+Values are only present when read in that tick; replay carries the last
+value forward. Failed reads are stored as {"error": msg} and fail again.
+Replay runs every collector in every tick; rates derived from wall time
+(rx_drop_rate etc.) are only meaningful at --speed 1.
+
+    sudo python3 replay.py record -o /tmp/session.jsonl --duration 600
+    python3 replay.py play /tmp/session.jsonl --speed 10
+    python3 replay.py synth -n 100 -m 20 --ticks 600 -o /tmp/synth.jsonl
+    python3 replay.py bench --nodes 10 100 1000 --json bench.json
+"""
+
+import contextlib
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from alfred_client import AlfredClient, AlfredError, AlfredRecord
+from enhanced_ogm_monitor import EnhancedOGMMonitor
+
+FORMAT = "ogm-replay/1"
+
+
+def _cmd_key(cmd: List[str]) -> str:
+    while cmd and cmd[0] in ("sudo", "-n"):
+        cmd = cmd[1:]
+    return " ".join(cmd)
+
+
+def _empty_frame() -> Dict[str, Any]:
+    return {"run": {}, "files": {}, "alfred": {}}
+
+
+def load(path: str) -> Tuple[Dict[str, Any], Iterator[Dict[str, Any]]]:
+    """(header, frame iterator) of a recording."""
+    f = open(path)
+    header = json.loads(f.readline())
+    if header.get("format") != FORMAT:
+        f.close()
+        raise ValueError(f"{path}: not an {FORMAT} recording")
+
+    def frames() -> Iterator[Dict[str, Any]]:
+        with f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    return header, frames()
+
+
+# ---------------------- record ----------------------
+class _RecordingAlfred(AlfredClient):
+    def __init__(self, path: str, rec: "RecordingMonitor") -> None:
+        super().__init__(path)
+        self._rec = rec
+
+    def request(self, data_type: int) -> List[AlfredRecord]:
+        try:
+            records = super().request(data_type)
+        except Exception as e:
+            self._rec._record("alfred", str(data_type), {"error": str(e)})
+            raise
+        self._rec._record("alfred", str(data_type),
+                          [[r.mac, r.type, r.version, r.data.hex()] for r in records])
+        return records
+
+
+class RecordingMonitor(EnhancedOGMMonitor):
+    # Textquellen, damit die Rohdaten aufgezeichnet werden können
+    STATION_BACKEND = "iw"
+    BATMAN_BACKEND = "batctl"
+    EVENT_MODE = "off"
+    PRIV_HELPER_SOCK = ""           # alles über _run, damit es aufgezeichnet wird
+
+    def __init__(self, path: str) -> None:
+        self._rec_lock = threading.Lock()
+        self._frame = _empty_frame()
+        self._rec_out = open(path, "w")
+        super().__init__()
+        self._alfred = _RecordingAlfred(self.ALFRED_SOCK, self)
+        self._rec_out.write(json.dumps({"format": FORMAT, "local_mac": self.local_mac,
+                                        "ifaces": self.wifi_ifaces(), "mesh_iface": self.MESH_IFACE,
+                                        "started": time.time()}) + "\n")
+
+    def _record(self, section: str, key: str, value: Any) -> None:
+        with self._rec_lock:
+            self._frame[section][key] = value
+
+    def _run(self, cmd: List[str]) -> str:
+        try:
+            out = super()._run(cmd)
+        except Exception as e:
+            self._record("run", _cmd_key(cmd), {"error": str(e)})
+            raise
+        self._record("run", _cmd_key(cmd), out)
+        return out
+
+    def _run_privileged(self, op: str, cmd: List[str], **args) -> str:
+        # ohne root läuft der Befehl über den Helper statt über _run
+        if os.geteuid() == 0:
+            return super()._run_privileged(op, cmd, **args)
+        try:
+            out = super()._run_privileged(op, cmd, **args)
+        except Exception as e:
+            self._record("run", _cmd_key(cmd), {"error": str(e)})
+            raise
+        self._record("run", _cmd_key(cmd), out)
+        return out
+
+    def _read_text(self, path: str) -> str:
+        try:
+            data = super()._read_text(path)
+        except OSError as e:
+            self._record("files", path, {"error": str(e)})
+            raise
+        self._record("files", path, data)
+        return data
+
+    def build_status(self) -> Dict[str, Any]:
+        payload = super().build_status()
+        with self._rec_lock:
+            frame, self._frame = self._frame, _empty_frame()
+        frame["t"] = time.time()
+        self._rec_out.write(json.dumps(frame, separators=(",", ":")) + "\n")
+        self._rec_out.flush()
+        return payload
+
+
+# ---------------------- replay ----------------------
+class _ReplayAlfred:
+    def __init__(self, mon: "ReplayMonitor") -> None:
+        self._mon = mon
+
+    def request(self, data_type: int) -> List[AlfredRecord]:
+        v = self._mon._state["alfred"].get(str(data_type))
+        if v is None:
+            raise OSError(f"alfred type {data_type} not recorded")
+        if isinstance(v, dict):
+            raise AlfredError(v.get("error", "recorded error"))
+        return [AlfredRecord(mac, typ, ver, bytes.fromhex(data)) for mac, typ, ver, data in v]
+
+    def hostnames(self, data_type: int = 64) -> Dict[str, str]:
+        return AlfredClient.hostnames(self, data_type)   # gleiche Dekodierung wie live
+
+
+class ReplayMonitor(EnhancedOGMMonitor):
+    """Monitor fed from recorded frames; outputs only go to `out_dir`."""
+
+    LOCK_FILE = ""
+    EVENT_MODE = "off"
+    STATION_BACKEND = "iw"
+    BATMAN_BACKEND = "batctl"
+    STATS_FILE = ""
+    PRIV_HELPER_SOCK = ""
+
+    def __init__(self, header: Dict[str, Any], out_dir: str) -> None:
+        self._header = header
+        self._state: Dict[str, Dict[str, Any]] = _empty_frame()
+        self.STATUS_FILE = os.path.join(out_dir, "node_status.json")
+        self.RUNTIME_STATUS_FILE = os.path.join(out_dir, "run", "node_status.json")
+        # alle Ausgaben eines echten Ticks (Snapshot, History, Topologie, tsdb),
+        # nur unter out_dir statt /dev/shm, /run und /var/lib
+        self.SNAPSHOT_PATH = os.path.join(out_dir, "status.shm")
+        self.HISTORY_SOCK = os.path.join(out_dir, "run", "history.sock")
+        self.TOPOLOGY_FILE = os.path.join(out_dir, "run", "topology.json")
+        self.TSDB_DIR = os.path.join(out_dir, "tsdb")
+        self.TSDB_RUNTIME_DIR = os.path.join(out_dir, "run", "tsdb")
+        # jede Quelle in jedem Tick (die Frames bestimmen, was neu ist);
+        # die Nachbartabelle gibt es nur per genl
+        self.COLLECTORS = {n: spec._replace(interval=0)
+                           for n, spec in EnhancedOGMMonitor.COLLECTORS.items() if n != "neighbors"}
+        super().__init__()
+        self._alfred = _ReplayAlfred(self)
+
+    def feed(self, frame: Dict[str, Any]) -> None:
+        for section in ("run", "files", "alfred"):
+            self._state[section].update(frame.get(section) or {})
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+        self._iface_pool.shutdown(wait=True)
+        if self._history_server is not None:
+            self._history_server.shutdown()
+            self._history_server.server_close()
+        if self._tsdb is not None:
+            self._tsdb.close()
+        if self._snapshot is not None:
+            self._snapshot.close()
+
+    def _get_local_mac(self) -> Optional[str]:
+        return self._header.get("local_mac")
+
+    def wifi_ifaces(self) -> List[str]:
+        return list(self._header.get("ifaces") or ["wlan1"])
+
+    def _run_privileged(self, op: str, cmd: List[str], **args) -> str:
+        return self._run(cmd)           # aufgezeichnete Ausgabe, nichts Privilegiertes
+
+    def _run(self, cmd: List[str]) -> str:
+        key = _cmd_key(cmd)
+        self._stats.count("subprocess.replayed")
+        v = self._state["run"].get(key)
+        if v is None:
+            raise FileNotFoundError(f"not recorded: {key}")
+        if isinstance(v, dict):
+            raise RuntimeError(v.get("error", "recorded error"))
+        return v
+
+    def _read_text(self, path: str) -> str:
+        v = self._state["files"].get(path)
+        if v is None or isinstance(v, dict):
+            raise FileNotFoundError(path)
+        return v
+
+    def _power_supplies(self) -> List[str]:
+        return sorted({os.path.dirname(p) for p in self._state["files"]})
+
+
+def replay(header: Dict[str, Any], frames: Iterable[Dict[str, Any]], speed: float = 1.0,
+           out_dir: Optional[str] = None, quiet: bool = False) -> List[Tuple[float, float, int]]:
+    """
+    Feed `frames` into a ReplayMonitor. speed 1 = recorded pace, 0 = no waiting.
+    Returns per tick (build_status ms, write_status ms, payload nodes).
+    """
+    tmp = None
+    if out_dir is None:
+        # tmpfs wie /run im Betrieb, sonst misst write_status das Dateisystem
+        tmp = tempfile.TemporaryDirectory(prefix="ogm-replay.",
+                                          dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+        out_dir = tmp.name
+    sink = open(os.devnull, "w") if quiet else None
+    timings: List[Tuple[float, float, int]] = []
+    try:
+        with contextlib.redirect_stdout(sink) if sink else contextlib.nullcontext():
+            mon = ReplayMonitor(header, out_dir)
+            try:
+                t_first = wall_first = None
+                for frame in frames:
+                    if speed > 0 and "t" in frame:
+                        if t_first is None:
+                            t_first, wall_first = frame["t"], time.monotonic()
+                        delay = wall_first + (frame["t"] - t_first) / speed - time.monotonic()
+                        if delay > 0:
+                            time.sleep(delay)
+                    mon.feed(frame)
+                    t0 = time.perf_counter()
+                    payload = mon.build_status()
+                    t1 = time.perf_counter()
+                    mon.write_status(payload)
+                    t2 = time.perf_counter()
+                    timings.append(((t1 - t0) * 1000.0, (t2 - t1) * 1000.0, len(payload["nodes"])))
+            finally:
+                mon.close()
+    finally:
+        if sink:
+            sink.close()
+        if tmp:
+            tmp.cleanup()
+    return timings
+
+
+# ---------------------- synthetic mesh ----------------------
+def _mac(i: int, prefix: int = 0x02) -> str:
+    return ":".join(f"{b:02x}" for b in (prefix, 0xc5, 0x4e, (i >> 16) & 0xff, (i >> 8) & 0xff, i & 0xff))
+
+
+class SyntheticMesh:
+    """
+    N originators, the first M of them direct neighbors (stations on the
+    radios), the rest reached via a random neighbor. Per tick, each node
+    leaves and is replaced by a new one with probability `churn`; station
+    counters grow like real traffic.
+    """
+
+    def __init__(self, originators: int = 100, stations: Optional[int] = None,
+                 ifaces: Tuple[str, ...] = ("wlan1",), churn: float = 0.01, seed: int = 1) -> None:
+        self.rng = random.Random(seed)
+        self.ifaces = list(ifaces)
+        self.churn = churn
+        self.local_mac = _mac(0)
+        self._next_id = 1
+        n_sta = min(originators, 20 if stations is None else stations)
+        self.neighbors: Dict[str, Dict[str, Any]] = {}
+        self.remote: Dict[str, str] = {}                  # originator -> nexthop
+        for _ in range(n_sta):
+            self._add_neighbor()
+        for _ in range(originators - n_sta):
+            self._add_remote()
+
+    def _new_mac(self) -> str:
+        mac = _mac(self._next_id)
+        self._next_id += 1
+        return mac
+
+    def _add_neighbor(self) -> None:
+        r = self.rng
+        self.neighbors[self._new_mac()] = {
+            "iface": r.choice(self.ifaces), "signal": r.uniform(-85, -40),
+            "tx_packets": r.randint(0, 10 ** 6), "tx_retries": 0, "tx_failed": 0,
+            "rx_packets": r.randint(0, 10 ** 6), "rx_drop_misc": 0, "rate": r.choice((6.5, 13.0, 39.0, 72.2)),
+        }
+
+    def _add_remote(self) -> None:
+        self.remote[self._new_mac()] = self.rng.choice(list(self.neighbors))
+
+    def header(self) -> Dict[str, Any]:
+        return {"format": FORMAT, "local_mac": self.local_mac, "ifaces": self.ifaces,
+                "mesh_iface": "bat0", "synthetic": True}
+
+    def step(self) -> None:
+        r = self.rng
+        for mac in list(self.remote):
+            if r.random() < self.churn:
+                del self.remote[mac]
+                self._add_remote()
+        for mac in list(self.neighbors):
+            if len(self.neighbors) > 1 and r.random() < self.churn:
+                del self.neighbors[mac]
+                self._add_neighbor()
+                for o, nh in self.remote.items():
+                    if nh == mac:
+                        self.remote[o] = r.choice(list(self.neighbors))
+        for st in self.neighbors.values():
+            tx = r.randint(20, 800)
+            st["tx_packets"] += tx
+            st["tx_retries"] += int(tx * r.uniform(0, 0.2))
+            st["tx_failed"] += int(tx * r.uniform(0, 0.01))
+            st["rx_packets"] += r.randint(20, 800)
+            st["rx_drop_misc"] += r.randint(0, 2)
+            st["signal"] = min(-30.0, max(-95.0, st["signal"] + r.uniform(-2, 2)))
+
+    def batctl_o(self) -> str:
+        r = self.rng
+        lines = [f"[B.A.T.M.A.N. adv 2022.0, MainIF/MAC: {self.ifaces[0]}/{self.local_mac} "
+                 f"(bat0/4e:9b:3c:11:22:01 BATMAN_V)]",
+                 "   Originator        last-seen ( throughput)  Nexthop           [outgoingIF]"]
+        routes = [(m, m, st["iface"], st["rate"] * 0.6) for m, st in self.neighbors.items()]
+        routes += [(o, nh, self.neighbors[nh]["iface"], r.uniform(1, 30)) for o, nh in self.remote.items()]
+        alt = list(self.neighbors)
+        for orig, nh, iface, thr in routes:
+            seen = r.uniform(0.0, 3.0)
+            lines.append(f" * {orig} {seen:8.3f}s ({thr:11.1f})  {nh} [{iface:>10s}]")
+            other = r.choice(alt)
+            if other != nh:
+                lines.append(f"   {orig} {seen:8.3f}s ({thr * 0.5:11.1f})  {other} [{iface:>10s}]")
+        return "\n".join(lines) + "\n"
+
+    def station_dump(self, iface: str) -> str:
+        out = []
+        for mac, st in self.neighbors.items():
+            if st["iface"] != iface:
+                continue
+            sig = int(st["signal"])
+            out.append(f"Station {mac} (on {iface})\n"
+                       f"\tinactive time:\t{self.rng.randint(0, 900)} ms\n"
+                       f"\trx bytes:\t{st['rx_packets'] * 900}\n"
+                       f"\trx packets:\t{st['rx_packets']}\n"
+                       f"\ttx bytes:\t{st['tx_packets'] * 900}\n"
+                       f"\ttx packets:\t{st['tx_packets']}\n"
+                       f"\ttx retries:\t{st['tx_retries']}\n"
+                       f"\ttx failed:\t{st['tx_failed']}\n"
+                       f"\trx drop misc:\t{st['rx_drop_misc']}\n"
+                       f"\tsignal:  \t{sig} [{sig - 2}, {sig - 3}] dBm\n"
+                       f"\tsignal avg:\t{sig - 1} [{sig - 3}, {sig - 4}] dBm\n"
+                       f"\ttx bitrate:\t{st['rate']} MBit/s MCS 7 short GI\n"
+                       f"\trx bitrate:\t{st['rate']} MBit/s MCS 7\n"
+                       f"\texpected throughput:\t{st['rate'] * 0.6:.1f}Mbps\n"
+                       f"\tmesh plink:\tESTAB\n"
+                       f"\tauthorized:\tyes\n")
+        return "".join(out)
+
+    def frame(self, t: float) -> Dict[str, Any]:
+        names = [[m, 64, 0, f"node-{m[-5:].replace(':', '')}".encode().hex()]
+                 for m in list(self.neighbors) + list(self.remote)]
+        run = {"batctl o": self.batctl_o()}
+        for iface in self.ifaces:
+            run[f"iw dev {iface} station dump"] = self.station_dump(iface)
+        return {"t": t, "run": run, "alfred": {"64": names, "1": []},
+                "files": {"/sys/class/power_supply/BAT0/type": "Battery\n",
+                          "/sys/class/power_supply/BAT0/status": "Discharging\n",
+                          "/sys/class/power_supply/BAT0/capacity": "87\n"}}
+
+    def frames(self, ticks: int, interval: float = 1.0, start: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        t = time.time() if start is None else start
+        for i in range(ticks):
+            if i:
+                self.step()
+            yield self.frame(t + i * interval)
+
+
+# ---------------------- benchmark ----------------------
+def _summary(values: List[float]) -> Dict[str, float]:
+    v = sorted(values)
+    return {"mean": round(statistics.fmean(v), 3), "p50": round(v[len(v) // 2], 3),
+            "p95": round(v[min(len(v) - 1, int(len(v) * 0.95))], 3), "max": round(v[-1], 3)}
+
+
+def bench(sizes: Iterable[int] = (10, 100, 1000), ticks: int = 30, churn: float = 0.01,
+          seed: int = 1) -> Dict[str, Any]:
+    """build_status / write_status cost per tick on synthetic meshes (first tick = warm-up)."""
+    import platform
+    out: Dict[str, Any] = {"ticks": ticks, "churn": churn, "python": platform.python_version(),
+                           "machine": platform.machine(), "date": time.strftime("%Y-%m-%d"),
+                           "sizes": {}}
+    for n in sizes:
+        mesh = SyntheticMesh(n, churn=churn, seed=seed)
+        frames = list(mesh.frames(ticks))
+        timings = replay(mesh.header(), frames, speed=0, quiet=True)[1:]
+        out["sizes"][str(n)] = {"nodes": timings[-1][2] if timings else 0,
+                                "build_ms": _summary([t[0] for t in timings]),
+                                "write_ms": _summary([t[1] for t in timings])}
+    return out
+
+
+def _print_bench(res: Dict[str, Any], base: Optional[Dict[str, Any]] = None) -> None:
+    print(f"{'nodes':>6} {'build mean':>11} {'p95':>8} {'max':>8} {'write mean':>11}"
+          + ("  vs. baseline" if base else ""))
+    for n, r in res["sizes"].items():
+        line = (f"{r['nodes']:>6} {r['build_ms']['mean']:>9.2f}ms {r['build_ms']['p95']:>6.2f}ms "
+                f"{r['build_ms']['max']:>6.2f}ms {r['write_ms']['mean']:>9.2f}ms")
+        old = (base or {}).get("sizes", {}).get(n)
+        if old:
+            ratio = r["build_ms"]["mean"] / max(old["build_ms"]["mean"], 1e-9)
+            line += f"  build x{ratio:.2f}"
+        print(line)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Record/replay harness for the OGM monitor.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("record", help="run the live monitor and record its raw inputs")
+    p.add_argument("-o", "--output", required=True)
+    p.add_argument("--duration", type=float, default=0, help="seconds (0 = until Ctrl-C)")
+    p = sub.add_parser("play", help="replay a recording into the monitor")
+    p.add_argument("recording")
+    p.add_argument("--speed", type=float, default=1.0, help="1 = real time, 0 = as fast as possible")
+    p.add_argument("--out", help="output directory (default: temporary)")
+    p = sub.add_parser("synth", help="write a synthetic recording")
+    p.add_argument("-n", "--originators", type=int, default=100)
+    p.add_argument("-m", "--stations", type=int, default=None)
+    p.add_argument("--ifaces", default="wlan1")
+    p.add_argument("--churn", type=float, default=0.01)
+    p.add_argument("--ticks", type=int, default=60)
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("-o", "--output", required=True)
+    p = sub.add_parser("bench", help="benchmark build_status on synthetic meshes")
+    p.add_argument("--nodes", type=int, nargs="+", default=[10, 100, 1000])
+    p.add_argument("--ticks", type=int, default=30)
+    p.add_argument("--churn", type=float, default=0.01)
+    p.add_argument("--json", help="save the result")
+    p.add_argument("--compare", help="earlier --json result to compare against")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "record":
+        mon = RecordingMonitor(args.output)
+        end = time.monotonic() + args.duration if args.duration else None
+        try:
+            while end is None or time.monotonic() < end:
+                mon._scheduler.wait()
+                mon.write_status(mon.build_status())
+                mon._scheduler.done()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            mon._pool.shutdown(wait=False, cancel_futures=True)
+            mon._rec_out.close()
+        return 0
+
+    if args.cmd == "play":
+        header, frames = load(args.recording)
+        timings = replay(header, frames, args.speed, args.out)
+        if timings:
+            print(f"{len(timings)} ticks | build_status {_summary([t[0] for t in timings])} ms"
+                  f" | write_status {_summary([t[1] for t in timings])} ms")
+        return 0
+
+    if args.cmd == "synth":
+        mesh = SyntheticMesh(args.originators, args.stations, tuple(args.ifaces.split(",")),
+                             args.churn, args.seed)
+        with open(args.output, "w") as f:
+            f.write(json.dumps(mesh.header()) + "\n")
+            for frame in mesh.frames(args.ticks):
+                f.write(json.dumps(frame, separators=(",", ":")) + "\n")
+        return 0
+
+    res = bench(args.nodes, args.ticks, args.churn)
+    base = None
+    if args.compare:
+        with open(args.compare) as f:
+            base = json.load(f)
+    _print_bench(res, base)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(res, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tick scheduler
+--------------
+Fixed-rate ticks for the OGM monitor loop on a time.monotonic() deadline
+grid (start, start + interval, start + 2 * interval, ...), so the work time
+of a tick does not add to the period and snapshots do not drift.
+
+A tick that overruns its slot is not caught up: the missed deadlines are
+skipped and the next tick starts at the next grid point in the future
+(coalescing instead of queueing). Early wakeups (netlink events) run an
+extra tick without moving the grid, at most one per `min_gap` seconds after
+the previous tick; events arriving in between are collected into that tick
+(or into the scheduled one, if it comes first).
+
+Observed period and jitter (tick start minus its deadline) go into the
+Stats histograms sched.period / sched.jitter, overruns and skipped ticks
+into counters; snapshot() summarizes them for stats.json.
+
+    sched = DeadlineScheduler(0.25, stats=stats)
+    while True:
+        scheduled = sched.wait(wake_event, min_gap=0.2)
+        work()
+        if scheduled:
+            sched.done()
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from profiling import Stats
+
+
+class DeadlineScheduler:
+    EWMA_ALPHA = 0.1
+
+    def __init__(self, interval: float, stats: Optional[Stats] = None,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        if interval <= 0:
+            raise ValueError(f"interval must be > 0, got {interval}")
+        self.interval = float(interval)
+        self.stats = stats
+        self.clock = clock
+        self.deadline = clock()             # erster Tick sofort
+        self.ticks = 0
+        self.early = 0                      # Zusatz-Ticks durch wake
+        self.coalesced = 0                  # davon durch min_gap verzögert
+        self.overruns = 0
+        self.skipped = 0
+        self.period = None                  # EWMA, Sekunden
+        self.jitter = None                  # EWMA, Sekunden
+        self.jitter_max = 0.0
+        self._last_start: Optional[float] = None
+        self._last_tick = float("-inf")     # Start des letzten Ticks (auch Zusatz-Ticks)
+
+    def wait(self, wake: Optional[threading.Event] = None, min_gap: float = 0.0) -> bool:
+        """
+        Sleep until the next deadline. Returns True for a scheduled tick,
+        False if `wake` was set first (extra tick, grid unchanged). Extra
+        ticks start no earlier than `min_gap` s after the previous tick.
+        """
+        while True:
+            now = self.clock()
+            remaining = self.deadline - now
+            if remaining <= 0:
+                break
+            if wake is None:
+                time.sleep(remaining)
+            elif wake.wait(remaining):
+                hold = self._last_tick + min_gap - self.clock()
+                if hold > 0:
+                    # wake bleibt gesetzt: weitere Events landen im selben Tick
+                    self.coalesced += 1
+                    time.sleep(min(hold, max(0.0, self.deadline - self.clock())))
+                    if self.clock() >= self.deadline:
+                        continue
+                self.early += 1
+                self._last_tick = self.clock()
+                return False
+        self._started(now)
+        return True
+
+    def _started(self, now: float) -> None:
+        jitter = now - self.deadline
+        self.ticks += 1
+        self.jitter_max = max(self.jitter_max, jitter)
+        self.jitter = jitter if self.jitter is None else self.jitter + self.EWMA_ALPHA * (jitter - self.jitter)
+        if self._last_start is not None:
+            period = now - self._last_start
+            self.period = period if self.period is None else self.period + self.EWMA_ALPHA * (period - self.period)
+            if self.stats is not None:
+                self.stats.observe("sched.period", period * 1000)
+        if self.stats is not None:
+            self.stats.observe("sched.jitter", jitter * 1000)
+        self._last_start = self._last_tick = now
+
+    def done(self) -> int:
+        """Advance to the next deadline after a scheduled tick; returns the number of skipped ticks."""
+        self.deadline += self.interval
+        late = self.clock() - self.deadline
+        if late < 0:
+            return 0
+        missed = int(late // self.interval) + 1
+        self.deadline += missed * self.interval
+        self.overruns += 1
+        self.skipped += missed
+        if self.stats is not None:
+            self.stats.count("sched.overruns")
+            self.stats.count("sched.skipped", missed)
+        return missed
+
+    def snapshot(self) -> Dict[str, Any]:
+        def ms(v: Optional[float]) -> Optional[float]:
+            return None if v is None else round(v * 1000, 3)
+        return {"interval_ms": ms(self.interval), "ticks": self.ticks, "early_ticks": self.early,
+                "coalesced": self.coalesced, "overruns": self.overruns, "skipped": self.skipped,
+                "period_ms": ms(self.period), "jitter_ms": ms(self.jitter),
+                "jitter_max_ms": ms(self.jitter_max)}
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    ap = argparse.ArgumentParser(description="Run empty ticks and print the scheduler statistics.")
+    ap.add_argument("--interval", type=float, default=0.1)
+    ap.add_argument("--ticks", type=int, default=50)
+    ap.add_argument("--work", type=float, default=0.0, help="simulated work per tick (s)")
+    args = ap.parse_args()
+
+    sched = DeadlineScheduler(args.interval)
+    while sched.ticks < args.ticks:
+        sched.wait()
+        time.sleep(args.work)
+        sched.done()
+    print(json.dumps(sched.snapshot(), indent=2))
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Status snapshot handoff
+-----------------------
+Shared-memory segment (/dev/shm, i.e. RAM) through which the OGM monitor
+publishes every status payload it writes, so the web app can read the
+latest one without touching the disk and without re-parsing JSON on
+every request.
+
+Layout: 64 byte header + payload (the same compact JSON as node_status.json)
+
+    magic[8] | seq u64 | version u64 | timestamp f64 | length u32
+
+Seqlock: the writer makes `seq` odd, copies the payload, updates the
+header and makes `seq` even again. A reader copies header + payload and
+retries if `seq` was odd or changed meanwhile. No locks, single writer.
+
+    pub = SnapshotPublisher(); pub.publish(data)          # monitor
+    rd = SnapshotReader(); rd.read() -> Snapshot(version, timestamp, data)
+    rd.latest()   -> parsed dict, parsed once per version
+    rd.wait(v, 25) -> next Snapshot with version > v (or None on timeout)
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+SHM_PATH = "/dev/shm/ogm_status"
+POLL_SEC = 0.05                 # Takt von SnapshotReader.wait()
+
+_MAGIC = b"OGMSNAP1"
+_HDR = struct.Struct("<8sQQdI")
+_HDR_SIZE = 64
+_SEQ_OFF = 8
+
+
+class Snapshot(NamedTuple):
+    version: int
+    timestamp: float
+    data: bytes
+
+
+class SnapshotPublisher:
+    def __init__(self, path: str = SHM_PATH, capacity: int = 256 * 1024) -> None:
+        self.path = path
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.fchmod(fd, 0o644)
+            size = max(os.fstat(fd).st_size, _HDR_SIZE + capacity)
+            os.ftruncate(fd, size)
+            self._mm = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        magic, seq, version, _, _ = _HDR.unpack_from(self._mm, 0)
+        # Version über Neustarts weiterzählen, damit wartende Leser nichts verpassen
+        self._seq = seq + (seq & 1) if magic == _MAGIC else 0
+        self.version = version if magic == _MAGIC else 0
+
+    def _grow(self, need: int) -> None:
+        size = len(self._mm)
+        while size < _HDR_SIZE + need:
+            size *= 2
+        self._mm.close()
+        fd = os.open(self.path, os.O_RDWR)
+        try:
+            os.ftruncate(fd, size)
+            self._mm = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+    def publish(self, data: bytes, timestamp: Optional[float] = None) -> int:
+        if _HDR_SIZE + len(data) > len(self._mm):
+            self._grow(len(data))
+        self.version += 1
+        mm = self._mm
+        struct.pack_into("<Q", mm, _SEQ_OFF, self._seq + 1)        # ungerade: Schreiben läuft
+        mm[_HDR_SIZE:_HDR_SIZE + len(data)] = data
+        self._seq += 2
+        _HDR.pack_into(mm, 0, _MAGIC, self._seq - 1, self.version,
+                       time.time() if timestamp is None else timestamp, len(data))
+        struct.pack_into("<Q", mm, _SEQ_OFF, self._seq)            # gerade: konsistent
+        return self.version
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+class SnapshotReader:
+    RETRIES = 50
+
+    def __init__(self, path: str = SHM_PATH) -> None:
+        self.path = path
+        self._mm: Optional[mmap.mmap] = None
+        self._ino = None
+        self._lock = threading.Lock()
+        self._parsed: Optional[Dict[str, Any]] = None
+        self._parsed_version = -1
+
+    def _map(self) -> Optional[mmap.mmap]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self._close()
+            return None
+        if self._mm is None or st.st_ino != self._ino or st.st_size != len(self._mm):
+            self._close()
+            with open(self.path, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._ino = st.st_ino
+        return self._mm
+
+    def _close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def version(self) -> int:
+        """Current version without copying the payload (0 = nothing published)."""
+        with self._lock:
+            mm = self._map()
+            if mm is None or mm[:8] != _MAGIC:
+                return 0
+            return _HDR.unpack_from(mm, 0)[2]
+
+    def read(self) -> Optional[Snapshot]:
+        with self._lock:
+            for _ in range(self.RETRIES):
+                mm = self._map()
+                if mm is None:
+                    return None
+                magic, seq, version, ts, length = _HDR.unpack_from(mm, 0)
+                if magic != _MAGIC:
+                    return None
+                if seq & 1 or _HDR_SIZE + length > len(mm):
+                    time.sleep(0.001)       # Schreiber mitten drin bzw. Segment gewachsen
+                    continue
+                data = mm[_HDR_SIZE:_HDR_SIZE + length]
+                if struct.unpack_from("<Q", mm, _SEQ_OFF)[0] == seq:
+                    return Snapshot(version, ts, data)
+            return None
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Parsed payload of the current version; JSON is decoded once per version."""
+        if self._parsed is not None and self.version() == self._parsed_version:
+            return self._parsed
+        snap = self.read()
+        if snap is None:
+            return None
+        if snap.version != self._parsed_version:
+            self._parsed = json.loads(snap.data)
+            self._parsed_version = snap.version
+        return self._parsed
+
+    def wait(self, after: int, timeout: float = 25.0, poll: float = POLL_SEC) -> Optional[Snapshot]:
+        """
+        Block until a version newer than `after` is published.
+
+        Polls the header every `poll` seconds: the writer is another process
+        and the seqlock has no wakeup channel (inotify does not report mmap
+        writes). A check is one 8-byte read from RAM, so the cost is the
+        wakeups (1/poll per waiting request) and up to `poll` extra latency
+        on top of the monitor tick (OGM_POLL_INTERVAL, default 1 s).
+        """
+        end = time.monotonic() + timeout
+        while True:
+            if self.version() > after:
+                snap = self.read()
+                if snap is not None and snap.version > after:
+                    return snap
+            left = end - time.monotonic()
+            if left <= 0:
+                return None
+            time.sleep(min(poll, left))
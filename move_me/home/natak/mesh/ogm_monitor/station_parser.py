@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Station dump parser
+-------------------
+Single-pass parser for the text output of `iw dev <iface> station dump`.
+
+Every line is split once at the first ':' and the key is looked up in a
+dispatch table, so the cost per line is one `partition` plus one dict lookup
+instead of a cascade of regex searches. The result is one `StationInfo`
+record per Station block.
+"""
+
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class StationInfo:
+    mac: str
+    iface: str = ""
+    signal_dbm: Optional[float] = None
+    signal_avg_dbm: Optional[float] = None
+    rx_packets: Optional[int] = None
+    rx_drop_misc: Optional[int] = None
+    tx_packets: Optional[int] = None
+    tx_retries: Optional[int] = None
+    tx_failed: Optional[int] = None
+    tx_bitrate_mbps: Optional[float] = None
+    rx_bitrate_mbps: Optional[float] = None
+    inactive_time_ms: Optional[int] = None
+    expected_throughput_mbps: Optional[float] = None
+    # zusätzliche Werte, die nur das nl80211-Backend liefert
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    # Felder, die in node_status.json landen (kompatibel zur alten Ausgabe)
+    METRIC_KEYS = ("signal_dbm", "rx_packets", "rx_drop_misc", "tx_packets",
+                   "tx_retries", "tx_failed", "tx_bitrate_mbps", "rx_bitrate_mbps")
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Only the fields that were actually present in the dump."""
+        out: Dict[str, Any] = {}
+        for f in fields(self):
+            if f.name in ("mac", "iface", "extra"):
+                continue
+            v = getattr(self, f.name)
+            if v is not None:
+                out[f.name] = v
+        # 'signal' fehlt bei manchen Treibern -> 'signal avg' als Ersatz
+        if "signal_dbm" not in out and self.signal_avg_dbm is not None:
+            out["signal_dbm"] = self.signal_avg_dbm
+        out.pop("signal_avg_dbm", None)
+        out.update(self.extra)
+        return out
+
+
+# ---------------------- value converters ----------------------
+def _first_number(value: str) -> Optional[float]:
+    tok = value.split(None, 1)
+    if not tok:
+        return None
+    try:
+        return float(tok[0])
+    except ValueError:
+        return None
+
+
+def _int(value: str) -> Optional[int]:
+    tok = value.split(None, 1)
+    if not tok:
+        return None
+    try:
+        return int(tok[0])
+    except ValueError:
+        return None
+
+
+def _dbm(value: str) -> Optional[float]:
+    # "-52 [-54, -55] dBm" / "-52 dBm"
+    if not value.endswith("dBm"):
+        return None
+    return _first_number(value)
+
+
+def _bitrate(value: str) -> Optional[float]:
+    # "72.2 MBit/s MCS 7 short GI" / "6.0 Mb/s"
+    parts = value.split(None, 2)
+    if len(parts) < 2 or parts[1].lower() not in ("mbit/s", "mb/s"):
+        return None
+    try:
+        return float(parts[0])
+    except ValueError:
+        return None
+
+
+def _throughput(value: str) -> Optional[float]:
+    # "45.5Mbps"
+    v = value.strip()
+    if v.lower().endswith("mbps"):
+        v = v[:-4]
+    try:
+        return float(v)
+    except ValueError:
+        return None
+
+
+# key (lowercase, ohne ':') -> (Feldname, Konverter)
+_DISPATCH: Dict[str, Tuple[str, Callable[[str], Any]]] = {
+    "signal": ("signal_dbm", _dbm),
+    "signal avg": ("signal_avg_dbm", _dbm),
+    "rx packets": ("rx_packets", _int),
+    "rx drop misc": ("rx_drop_misc", _int),
+    "tx packets": ("tx_packets", _int),
+    "tx retries": ("tx_retries", _int),
+    "tx failed": ("tx_failed", _int),
+    "tx bitrate": ("tx_bitrate_mbps", _bitrate),
+    "rx bitrate": ("rx_bitrate_mbps", _bitrate),
+    "inactive time": ("inactive_time_ms", _int),
+    "expected throughput": ("expected_throughput_mbps", _throughput),
+}
+
+
+def parse_station_dump(text: str, iface: str = "") -> List[StationInfo]:
+    """
+    Parse `iw dev <iface> station dump` output into StationInfo records,
+    in the order they appear. Unknown keys are ignored.
+    """
+    result: List[StationInfo] = []
+    current: Optional[StationInfo] = None
+    dispatch = _DISPATCH
+
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+
+        if line.startswith("Station "):
+            mac = line[8:25].lower()
+            if len(mac) == 17 and mac.count(":") == 5:
+                current = StationInfo(mac=mac, iface=iface)
+                result.append(current)
+            else:
+                current = None
+            continue
+
+        if current is None:
+            continue
+
+        key, sep, value = line.partition(":")
+        if not sep:
+            continue
+        entry = dispatch.get(key.rstrip().lower())
+        if entry is None:
+            continue
+        name, conv = entry
+        v = conv(value.strip())
+        if v is not None:
+            setattr(current, name, v)
+
+    return result
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Status write policy
+-------------------
+Decides when node_status.json is actually written, to save CPU and SD card
+wear:
+
+- skip the write if the payload is unchanged apart from ignored keys
+  (timestamp, ages) or numeric fields stay within their deadband
+  (compared against the last *written* payload, so changes cannot creep)
+- still write at least every `max_quiet` seconds, so readers see a fresh
+  timestamp
+- compact JSON instead of indent=2
+- optional tmpfs target (e.g. /run) written every time, plus a checkpoint
+  to persistent storage (with fsync) every `checkpoint_interval` seconds
+- counters for writes / skips / checkpoints / bytes; with a profiling.Stats
+  also serialize / write / fsync timings
+- optional `publish(data)` hook, called with every written payload (the
+  monitor hands it to the shared-memory snapshot, see snapshot.py)
+"""
+
+import json
+import os
+import tempfile
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, Iterable, Optional
+
+DEFAULT_DEADBANDS: Dict[str, float] = {
+    "last_seen": 2.0,
+    "signal_dbm": 2.0,
+    "throughput": 1.0,
+    "tx_bitrate_mbps": 1.0,
+    "rx_bitrate_mbps": 1.0,
+    "rx_packets": 500,
+    "tx_packets": 500,
+    "tx_retries": 50,
+    "tx_failed": 5,
+    "rx_drop_misc": 5,
+    "battery_pct": 1,
+    "tx_retry_ratio": 0.02,
+    "tx_fail_ratio": 0.01,
+    "rx_drop_rate": 0.5,
+}
+
+DEFAULT_IGNORE = ("timestamp", "updated", "age")
+
+
+def atomic_write(path: str, data: bytes, fsync: bool,
+                 observe: Optional[Callable[[str, float], None]] = None) -> None:
+    """Write via temp file + rename in the same directory (mode 0644).
+    `observe("fsync", ms)` is called with the fsync duration if given."""
+    dirpath = os.path.dirname(path)
+    os.makedirs(dirpath, exist_ok=True)
+    fd, tmppath = tempfile.mkstemp(prefix=".node_status.", suffix=".tmp", dir=dirpath)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                t0 = time.perf_counter()
+                os.fsync(f.fileno())
+                if observe is not None:
+                    observe("fsync", (time.perf_counter() - t0) * 1000.0)
+        os.chmod(tmppath, 0o644)
+        os.replace(tmppath, path)   # atomar
+    finally:
+        try:
+            if os.path.exists(tmppath):
+                os.unlink(tmppath)
+        except OSError:
+            pass
+
+
+def _similar(a: Any, b: Any, bands: Dict[str, float], ignore: frozenset, key: str = "") -> bool:
+    if isinstance(a, dict) and isinstance(b, dict):
+        keys = (a.keys() | b.keys()) - ignore
+        for k in keys:
+            if k not in a or k not in b:
+                return False
+            if not _similar(a[k], b[k], bands, ignore, k):
+                return False
+        return True
+    if key in bands and isinstance(a, (int, float)) and isinstance(b, (int, float)) \
+            and not isinstance(a, bool) and not isinstance(b, bool):
+        return abs(a - b) <= bands[key]
+    return a == b
+
+
+class StatusWriter:
+    def __init__(self, path: str, runtime_path: Optional[str] = None,
+                 checkpoint_interval: float = 300.0, max_quiet: float = 10.0,
+                 deadbands: Optional[Dict[str, float]] = None,
+                 ignore: Iterable[str] = DEFAULT_IGNORE, stats=None,
+                 publish: Optional[Callable[[bytes], Any]] = None) -> None:
+        self.path = path                      # persistent (SD card)
+        self.runtime_path = runtime_path      # tmpfs, or None = write `path` directly
+        self.checkpoint_interval = checkpoint_interval
+        self.max_quiet = max_quiet
+        self.deadbands = dict(DEFAULT_DEADBANDS if deadbands is None else deadbands)
+        self.ignore = frozenset(ignore)
+        self.stats_sink = stats               # profiling.Stats oder None
+        self.publish = publish
+
+        self._last_payload: Optional[Dict[str, Any]] = None
+        self._last_write = 0.0                # monotonic
+        self._last_checkpoint = 0.0
+        self._pending_checkpoint: Optional[bytes] = None
+        self.counters = {"writes": 0, "skipped": 0, "checkpoints": 0, "bytes": 0, "errors": 0}
+
+    def _timer(self, name: str):
+        return self.stats_sink.timer(name) if self.stats_sink is not None else nullcontext()
+
+    def _observe(self) -> Optional[Callable[[str, float], None]]:
+        return self.stats_sink.observe if self.stats_sink is not None else None
+
+    @property
+    def target(self) -> str:
+        return self.runtime_path or self.path
+
+    def unchanged(self, payload: Dict[str, Any]) -> bool:
+        return self._last_payload is not None and \
+            _similar(payload, self._last_payload, self.deadbands, self.ignore)
+
+    def write(self, payload: Dict[str, Any], force: bool = False) -> bool:
+        """Write `payload` if the policy says so. Returns True if written."""
+        now = time.monotonic()
+        if not force and now - self._last_write < self.max_quiet and self.unchanged(payload):
+            self.counters["skipped"] += 1
+            return False
+
+        with self._timer("serialize"):
+            data = json.dumps(payload, separators=(",", ":")).encode()
+        if self.publish is not None:
+            try:
+                self.publish(data)
+            except Exception:
+                self.counters["errors"] += 1
+        try:
+            with self._timer("write"):
+                atomic_write(self.target, data, fsync=self.runtime_path is None,
+                             observe=self._observe())
+        except Exception:
+            self.counters["errors"] += 1
+            raise
+        self._last_payload = payload
+        self._last_write = now
+        self.counters["writes"] += 1
+        self.counters["bytes"] += len(data)
+
+        if self.runtime_path:
+            self._pending_checkpoint = data
+            if force or now - self._last_checkpoint >= self.checkpoint_interval:
+                self.checkpoint()
+        return True
+
+    def checkpoint(self) -> bool:
+        """Copy the last runtime payload to persistent storage (fsync)."""
+        data, self._pending_checkpoint = self._pending_checkpoint, None
+        self._last_checkpoint = time.monotonic()
+        if data is None:
+            return False
+        with self._timer("checkpoint"):
+            atomic_write(self.path, data, fsync=True, observe=self._observe())
+        self.counters["checkpoints"] += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        c = dict(self.counters)
+        total = c["writes"] + c["skipped"]
+        c["skip_ratio"] = round(c["skipped"] / total, 3) if total else 0.0
+        c["target"] = self.target
+        return c
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Die Module liegen flach in ogm_monitor/ und importieren sich gegenseitig ohne Paket
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
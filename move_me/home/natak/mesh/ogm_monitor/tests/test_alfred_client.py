@@ -0,0 +1,59 @@
+import pytest
+
+import alfred_client as ac
+from fake_alfred import LOCAL_MAC, FakeAlfredServer
+
+
+@pytest.fixture
+def alfred(tmp_path):
+    srv = FakeAlfredServer(str(tmp_path / "alfred.sock"), {
+        64: {"02:c5:4e:1a:00:11": b"node-11\n", "02:c5:4e:1a:00:22": b"node-22\0", "02:c5:4e:1a:00:33": b"\n"},
+        65: {"02:c5:4e:1a:00:11": bytes(range(8))},
+    }, error_types={99}).start()
+    yield srv
+    srv.stop()
+
+
+def test_request_returns_all_records(alfred):
+    recs = ac.AlfredClient(alfred.path).request(65)
+    assert recs == [ac.AlfredRecord("02:c5:4e:1a:00:11", 65, 0, bytes(range(8)))]
+    assert alfred.requests == 1
+
+
+def test_request_unknown_type_is_empty(alfred):
+    assert ac.AlfredClient(alfred.path).request(70) == []
+
+
+def test_hostnames_strip_and_skip_empty(alfred):
+    assert ac.AlfredClient(alfred.path).hostnames() == {"02:c5:4e:1a:00:11": "node-11",
+                                                         "02:c5:4e:1a:00:22": "node-22"}
+
+
+def test_push_then_request(alfred):
+    client = ac.AlfredClient(alfred.path)
+    client.push(66, b"hello")
+    assert client.request(66) == [ac.AlfredRecord(LOCAL_MAC, 66, 0, b"hello")]
+
+
+def test_status_error_raises(alfred):
+    with pytest.raises(ac.AlfredError):
+        ac.AlfredClient(alfred.path).request(99)
+
+
+def test_missing_socket_raises_oserror(tmp_path):
+    with pytest.raises(OSError):
+        ac.AlfredClient(str(tmp_path / "nope.sock"), timeout=0.5).request(64)
+
+
+def test_cli_request_prints_alfred_format(alfred, capsys):
+    assert ac.main(["-u", alfred.path, "-r", "64"]) == 0
+    out = capsys.readouterr().out.splitlines()
+    assert '{ "02:c5:4e:1a:00:11", "node-11\\x0a" },' in out
+    assert len(out) == 3
+
+
+def test_parse_push_body_drops_truncated_item():
+    pkt = ac.pack_push(64, b"node-11", 7, source=bytes.fromhex("02c54e1a0011"))
+    body = pkt[4:]
+    assert ac.parse_push_body(body)[0].data == b"node-11"
+    assert ac.parse_push_body(body[:-1]) == []
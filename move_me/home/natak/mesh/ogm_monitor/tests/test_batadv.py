@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+
+from batadv import parse_batctl_originators, parse_originator_messages
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BATCTL_TXT = os.path.join(HERE, "samples", "batctl_o.txt")
+GENL_BIN = os.path.join(HERE, "samples", "batadv_originators.bin")
+
+
+def _compare(txt, binary):
+    return subprocess.run([sys.executable, os.path.join(HERE, "batadv.py"), "--compare", txt, binary],
+                          capture_output=True, text=True, cwd=HERE, timeout=30)
+
+
+def test_text_and_genl_parsers_agree_on_samples():
+    with open(BATCTL_TXT) as f:
+        text = parse_batctl_originators(f.read())
+    with open(GENL_BIN, "rb") as f:
+        genl_nodes = parse_originator_messages(f.read())
+    assert sorted(text) == ["02:c5:4e:1a:00:11", "02:c5:4e:1a:00:22",
+                            "02:c5:4e:1a:00:33", "02:c5:4e:1a:00:44"]
+    assert {m: o.as_dict() for m, o in text.items()} == {m: o.as_dict() for m, o in genl_nodes.items()}
+    # nur die beste Route ('*') zählt
+    assert text["02:c5:4e:1a:00:11"].nexthop == "02:c5:4e:1a:00:11"
+
+
+def test_local_mac_is_dropped():
+    with open(GENL_BIN, "rb") as f:
+        nodes = parse_originator_messages(f.read(), local_mac="02:c5:4e:1a:00:33")
+    assert "02:c5:4e:1a:00:33" not in nodes
+    assert len(nodes) == 3
+
+
+def test_compare_cli_ok():
+    r = _compare(BATCTL_TXT, GENL_BIN)
+    assert r.returncode == 0, r.stdout + r.stderr
+    assert "DIFF" not in r.stdout
+    assert r.stdout.count("ok  ") == 4
+
+
+def test_compare_cli_reports_diff(tmp_path):
+    with open(BATCTL_TXT) as f:
+        text = f.read().replace("(        6.5)", "(        7.5)")
+    txt = tmp_path / "batctl_o.txt"
+    txt.write_text(text)
+    r = _compare(str(txt), GENL_BIN)
+    assert r.returncode == 1
+    assert [line.split()[1] for line in r.stdout.splitlines() if line.startswith("DIFF")] == \
+        ["02:c5:4e:1a:00:33"]
@@ -0,0 +1,72 @@
+import pytest
+
+import dhcp_tracker
+from dhcp_tracker import NUD_REACHABLE, LeaseTracker, parse_leases
+from events import NUD_STALE
+
+NOW = 1_700_000_000
+
+LEASES = f"""\
+{NOW + 600} 02:00:00:00:00:01 10.20.1.101 phone 01:02:00:00:00:00:01
+{NOW + 60} 02:00:00:00:00:02 10.20.1.102 * *
+{NOW - 5} 02:00:00:00:00:03 10.20.1.103 expired *
+0 02:00:00:00:00:04 10.20.1.104 static *
+{NOW + 900} 02:00:00:00:00:05 10.20.1.105 idle *
+broken line
+"""
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    monkeypatch.setattr(dhcp_tracker.time, "time", lambda: NOW)
+    t = LeaseTracker("/nonexistent/dnsmasq.leases", log=lambda msg: None)
+    t._leases = parse_leases(LEASES)
+    return t
+
+
+def test_parse_leases():
+    leases = parse_leases(LEASES)
+    assert len(leases) == 5
+    assert leases[0] == {"expires": str(NOW + 600), "mac": "02:00:00:00:00:01",
+                         "ip": "10.20.1.101", "hostname": "phone"}
+    assert leases[1]["hostname"] == ""          # '*' -> kein Name
+    assert parse_leases("") == []
+
+
+def test_publish_active_clients(tracker):
+    tracker._wifi = {"02:00:00:00:00:01", "02:00:00:00:00:03"}
+    tracker._neigh = {"10.20.1.102": ("02:00:00:00:00:02", NUD_REACHABLE),
+                      "10.20.1.104": ("02:00:00:00:00:04", NUD_REACHABLE),
+                      "10.20.1.105": ("02:00:00:00:00:05", NUD_STALE)}
+    tracker._publish()
+    version, payload = tracker.snapshot()
+    assert version == 1
+    assert len(payload["leases"]) == 5
+    active = {l["mac"]: l["adapter"] for l in payload["active_leases"]}
+    # abgelaufen (03) trotz WLAN nicht, STALE (05) nicht, expiry 0 (04) = unbegrenzt
+    assert active == {"02:00:00:00:00:01": "wlan", "02:00:00:00:00:02": "ethernet",
+                      "02:00:00:00:00:04": "ethernet"}
+    assert payload["active_clients"] == 3
+    assert tracker._next_expiry == NOW + 60     # nächster Ablauf weckt die Schleife
+
+
+def test_publish_version_only_changes_with_payload(tracker, monkeypatch):
+    tracker._wifi = {"02:00:00:00:00:02"}
+    tracker._publish()
+    tracker._publish()
+    assert tracker.snapshot()[0] == 1
+    # Lease 02 läuft ab -> neuer Snapshot ohne aktiven Client
+    monkeypatch.setattr(dhcp_tracker.time, "time", lambda: NOW + 60)
+    tracker._publish()
+    version, payload = tracker.snapshot()
+    assert version == 2
+    assert payload["active_leases"] == [] and payload["active_clients"] == 0
+    assert tracker._next_expiry == NOW + 600
+
+
+def test_publish_does_not_share_lease_dicts(tracker):
+    tracker._wifi = {"02:00:00:00:00:01"}
+    tracker._publish()
+    _, payload = tracker.snapshot()
+    assert "adapter" not in tracker._leases[0]
+    assert payload["leases"][0]["adapter"] == "wlan"
@@ -0,0 +1,89 @@
+import os
+
+import genl
+import nl80211
+from station_parser import parse_station_dump
+
+SAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "samples")
+FAMILY_ID = 0x1c
+
+
+def _station_msg(mac, *sta_info, cmd=nl80211.NL80211_CMD_NEW_STATION, seq=1):
+    attrs = genl.pack_u32(nl80211.NL80211_ATTR_IFINDEX, 4)
+    if mac is not None:
+        attrs += genl.pack_attr(nl80211.NL80211_ATTR_MAC, bytes.fromhex(mac.replace(":", "")))
+    attrs += genl.pack_nested(nl80211.NL80211_ATTR_STA_INFO, *sta_info)
+    return genl.pack_genl_msg(FAMILY_ID, cmd, attrs, flags=genl.NLM_F_MULTI, seq=seq)
+
+
+def _s8(atype, v):
+    return genl.pack_attr(atype, (v & 0xff).to_bytes(1, "little"))
+
+
+def test_parse_attrs_alignment_and_nested_flag():
+    data = genl.pack_u8(1, 7) + genl.pack_str(2, "wlan1") + genl.pack_nested(3, genl.pack_u16(1, 513))
+    attrs = genl.parse_attrs(data)
+    assert genl.u8(attrs[1]) == 7
+    assert genl.cstr(attrs[2]) == "wlan1"
+    assert genl.u16(genl.parse_attrs(attrs[3])[1]) == 513     # NLA_F_NESTED ist maskiert
+
+
+def test_parse_messages_stops_at_truncated_message():
+    msg = _station_msg("02:00:00:00:00:01", genl.pack_u32(nl80211.NL80211_STA_INFO_RX_PACKETS, 1))
+    msgs = genl.parse_messages(msg + msg[:-4])
+    assert len(msgs) == 1
+    assert genl.genl_cmd(msgs[0].payload) == nl80211.NL80211_CMD_NEW_STATION
+
+
+def test_station_fields_and_extra():
+    buf = _station_msg(
+        "02:C5:4E:1A:00:11",
+        _s8(nl80211.NL80211_STA_INFO_SIGNAL, -52),
+        genl.pack_u32(nl80211.NL80211_STA_INFO_TX_RETRIES, 1234),
+        genl.pack_u64(nl80211.NL80211_STA_INFO_RX_DROP_MISC, 37),
+        genl.pack_nested(nl80211.NL80211_STA_INFO_TX_BITRATE,
+                         genl.pack_u32(nl80211.NL80211_RATE_INFO_BITRATE32, 722)),
+        genl.pack_nested(nl80211.NL80211_STA_INFO_RX_BITRATE,
+                         genl.pack_u16(nl80211.NL80211_RATE_INFO_BITRATE, 650)),
+        genl.pack_u32(nl80211.NL80211_STA_INFO_EXPECTED_THROUGHPUT, 45500),
+        genl.pack_u8(nl80211.NL80211_STA_INFO_PLINK_STATE, 4),
+        genl.pack_u64(nl80211.NL80211_STA_INFO_TX_BYTES64, 1 << 33),
+    )
+    (st,) = nl80211.parse_station_messages(buf, "wlan1")
+    assert st.mac == "02:c5:4e:1a:00:11"
+    assert st.iface == "wlan1"
+    assert st.signal_dbm == -52.0
+    assert st.tx_retries == 1234
+    assert st.rx_drop_misc == 37
+    assert st.tx_bitrate_mbps == 72.2
+    assert st.rx_bitrate_mbps == 65.0
+    assert st.expected_throughput_mbps == 45.5
+    assert st.extra == {"mesh_plink": "ESTAB", "tx_bytes": 1 << 33}
+
+
+def test_non_station_messages_and_missing_mac_are_skipped():
+    buf = (_station_msg("02:00:00:00:00:01", cmd=nl80211.NL80211_CMD_DEL_STATION)
+           + _station_msg(None, genl.pack_u32(nl80211.NL80211_STA_INFO_RX_PACKETS, 1))
+           + genl.pack_msg(genl.NLMSG_DONE, genl.NLM_F_MULTI, 1, b"\0" * 4))
+    assert nl80211.parse_station_messages(buf, "wlan1") == []
+
+
+def test_bad_attribute_payload_is_ignored():
+    # zu kurzes u32 -> Feld fehlt, der Rest der Station bleibt
+    buf = _station_msg("02:00:00:00:00:01",
+                       genl.pack_attr(nl80211.NL80211_STA_INFO_TX_PACKETS, b"\x01"),
+                       genl.pack_u32(nl80211.NL80211_STA_INFO_RX_PACKETS, 9))
+    (st,) = nl80211.parse_station_messages(buf)
+    assert st.tx_packets is None
+    assert st.rx_packets == 9
+
+
+def test_recorded_dump_matches_iw_text():
+    with open(os.path.join(SAMPLES, "iw_station_dump.txt")) as f:
+        text = {st.mac: st for st in parse_station_dump(f.read())}
+    with open(os.path.join(SAMPLES, "nl80211_station_dump.bin"), "rb") as f:
+        nl = {st.mac: st for st in nl80211.parse_station_messages(f.read(), "wlan1")}
+    assert set(text) == set(nl)
+    for mac, st in nl.items():
+        common = {k: v for k, v in st.as_dict().items() if k not in st.extra}
+        assert common == text[mac].as_dict(), mac
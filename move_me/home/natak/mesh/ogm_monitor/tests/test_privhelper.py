@@ -0,0 +1,71 @@
+import json
+import os
+import socket
+import threading
+
+import pytest
+
+import privhelper
+from privhelper import build_argv
+
+
+def test_valid_requests():
+    assert build_argv("batctl_o", {})[1] == ["batctl", "o"]
+    assert build_argv("iw_station_dump", {"iface": "wlan1"})[1] == ["iw", "dev", "wlan1", "station", "dump"]
+    assert build_argv("alfred_read", {"type": 64})[1] == ["alfred", "-r", "64"]
+    spec, argv = build_argv("restart_service", {"service": "dnsmasq"})
+    assert argv == ["systemctl", "restart", "dnsmasq"] and spec.action
+
+
+@pytest.mark.parametrize("op, args", [
+    ("rm_rf", {}),                                          # unbekannte Operation
+    (None, {}),
+    (["batctl_o"], {}),                                     # nicht hashbar
+    ("batctl_o", {"extra": 1}),                             # überzählige Argumente
+    ("iw_station_dump", {}),                                # fehlendes Argument
+    ("batctl_o", 5),                                        # args kein Objekt
+    ("batctl_o", ["iface"]),
+    ("iw_station_dump", {"iface": "wlan1; reboot"}),
+    ("iw_station_dump", {"iface": "-h".ljust(16, "x")}),    # > IFNAMSIZ
+    ("iw_station_dump", {"iface": 5}),
+    ("alfred_read", {"type": "64"}),
+    ("alfred_read", {"type": 256}),
+    ("alfred_read", {"type": True}),
+    ("restart_service", {"service": "ssh"}),
+    ("restart_service", {"service": ["dnsmasq"]}),
+    ("set_hostname", {"hostname": "-node"}),
+    ("set_hostname", {"hostname": "a" * 64}),
+    ("set_timezone", {"tz": "../../etc/shadow"}),
+    ("set_timezone", {"tz": "Mars/Olympus_Mons"}),
+])
+def test_rejected(op, args):
+    with pytest.raises(ValueError):
+        build_argv(op, args)
+
+
+def test_timezone_must_exist(tmp_path, monkeypatch):
+    (tmp_path / "Europe").mkdir()
+    (tmp_path / "Europe" / "Berlin").write_bytes(b"TZif")
+    monkeypatch.setattr(privhelper, "ZONEINFO_DIR", str(tmp_path))
+    assert build_argv("set_timezone", {"tz": "Europe/Berlin"})[1] == ["timedatectl", "set-timezone",
+                                                                      "Europe/Berlin"]
+    with pytest.raises(ValueError):
+        build_argv("set_timezone", {"tz": "Europe/Paris"})
+
+
+def test_server_rejects_malformed_requests_and_keeps_connection(tmp_path):
+    srv = privhelper.PrivHelperServer(str(tmp_path / "helper.sock"), allowed_users=())
+    srv.allowed_uids.add(os.getuid())
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(5)
+            s.connect(str(tmp_path / "helper.sock"))
+            f = s.makefile("rb")
+            for line in (b"5", b"[]", b"not json", b'{"op": "batctl_o", "args": 5}', b'{"op": {}}'):
+                s.sendall(line + b"\n")
+                resp = json.loads(f.readline())
+                assert resp["ok"] is False and resp["error"], line
+    finally:
+        srv.shutdown()
+        srv.server_close()
@@ -0,0 +1,32 @@
+import threading
+import time
+
+from snapshot import SnapshotPublisher, SnapshotReader
+
+
+def test_wait_returns_next_version(tmp_path):
+    path = str(tmp_path / "ogm_status")
+    pub = SnapshotPublisher(path)
+    try:
+        v = pub.publish(b'{"n": 1}')
+        rd = SnapshotReader(path)
+        assert rd.wait(v, timeout=0) is None
+        threading.Timer(0.1, pub.publish, (b'{"n": 2}',)).start()
+        t0 = time.monotonic()
+        snap = rd.wait(v, timeout=5, poll=0.01)
+        assert snap is not None and snap.version == v + 1 and snap.data == b'{"n": 2}'
+        assert time.monotonic() - t0 < 1
+    finally:
+        pub.close()
+
+
+def test_wait_times_out(tmp_path):
+    path = str(tmp_path / "ogm_status")
+    pub = SnapshotPublisher(path)
+    try:
+        v = pub.publish(b"{}")
+        t0 = time.monotonic()
+        assert SnapshotReader(path).wait(v, timeout=0.2, poll=0.5) is None
+        assert time.monotonic() - t0 < 0.4          # Schlaf endet am Timeout, nicht am Takt
+    finally:
+        pub.close()
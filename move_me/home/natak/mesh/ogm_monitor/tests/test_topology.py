@@ -0,0 +1,46 @@
+from batadv import BatctlOriginatorTable
+from topology import Topology
+
+ME = "02:c5:4e:1a:00:01"
+
+BATCTL_IV = """\
+[B.A.T.M.A.N. adv 2022.0, MainIF/MAC: wlan1/02:c5:4e:1a:00:01 (bat0/4e:9b:3c:11:22:01 BATMAN_IV)]
+   Originator        last-seen (#/255) Nexthop           [outgoingIF]
+ * 02:c5:4e:1a:00:11    0.520s   (230) 02:c5:4e:1a:00:11 [     wlan1]
+ * 02:c5:4e:1a:00:22    0.180s   (200) 02:c5:4e:1a:00:22 [     wlan1]
+ * 02:c5:4e:1a:00:33    1.020s   (150) 02:c5:4e:1a:00:22 [     wlan1]
+"""
+
+
+def _kinds(topo, src):
+    return {dst: (link.metric, link.kind) for dst, link in topo.adj[src].items()}
+
+
+def test_batman_iv_batctl_table_gives_tq_links():
+    table = BatctlOriginatorTable(ME)
+    nodes = table.update(BATCTL_IV)
+    assert table.algo == "BATMAN_IV"
+    topo = Topology()
+    topo.update_local(ME, nodes, None, now=0, metric_kind="tq")
+    assert _kinds(topo, ME) == {"02:c5:4e:1a:00:11": (230.0, "tq"), "02:c5:4e:1a:00:22": (200.0, "tq")}
+    # lokale IV-Links lassen sich mit den TQ-Links aus batadv-vis verketten
+    topo.update_vis([("02:c5:4e:1a:00:22", [("02:c5:4e:1a:00:33", 180)])], now=0)
+    assert topo.bottleneck(ME, "02:c5:4e:1a:00:33") == \
+        (180.0, [ME, "02:c5:4e:1a:00:22", "02:c5:4e:1a:00:33"], "tq")
+    assert topo.bottleneck(ME, "02:c5:4e:1a:00:33", "tput") == (None, [], None)
+
+
+def test_record_tq_field_overrides_kind():
+    topo = Topology()
+    topo.update_local(ME, {"02:c5:4e:1a:00:11": {"nexthop": "02:c5:4e:1a:00:11", "throughput": 210.0, "tq": 210}},
+                      None, now=0)
+    assert _kinds(topo, ME) == {"02:c5:4e:1a:00:11": (210.0, "tq")}
+
+
+def test_batman_v_links_stay_throughput_and_do_not_mix():
+    topo = Topology()
+    topo.update_local(ME, {"02:c5:4e:1a:00:11": {"nexthop": "02:c5:4e:1a:00:11", "throughput": 72.2}}, None, now=0)
+    topo.update_vis([("02:c5:4e:1a:00:11", [("02:c5:4e:1a:00:44", 250)])], now=0)
+    assert _kinds(topo, ME) == {"02:c5:4e:1a:00:11": (72.2, "tput")}
+    assert topo.bottleneck(ME, "02:c5:4e:1a:00:11") == (72.2, [ME, "02:c5:4e:1a:00:11"], "tput")
+    assert topo.bottleneck(ME, "02:c5:4e:1a:00:44") == (None, [], None)
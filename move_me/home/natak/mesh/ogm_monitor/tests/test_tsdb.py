@@ -0,0 +1,53 @@
+import shutil
+import time
+
+import pytest
+
+from tsdb import TimeSeriesStore
+
+KEY = "02:c5:4e:1a:00:11"
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    return {"root": str(tmp_path / "tsdb"), "runtime_root": str(tmp_path / "run")}
+
+
+def _fill(dirs, start, end, every=5, **kw):
+    store = TimeSeriesStore(flush_interval=0, **dirs, **kw)
+    for ts in range(int(start), int(end), every):
+        store.append(ts, KEY, "tq", 200.0)
+    store.close()
+
+
+def test_query_prefers_fine_tier(dirs):
+    now = time.time()
+    _fill(dirs, now - 3600, now)
+    res = TimeSeriesStore(writable=False, **dirs).query(KEY, "tq", now - 3500, now)
+    assert res["source_step"] == 1
+    assert res["t"] and set(res["avg"]) == {200.0}
+
+
+def test_query_falls_back_when_only_10s_ring_exists(dirs):
+    now = time.time()
+    _fill(dirs, now - 3600, now)
+    shutil.rmtree(dirs["runtime_root"])            # tmpfs nach Reboot leer
+    res = TimeSeriesStore(writable=False, **dirs).query(KEY, "tq", now - 3500, now)
+    assert res["source_step"] == 10
+    assert res["t"][0] < now - 3400
+    assert set(res["avg"]) == {200.0}
+
+
+def test_query_falls_back_when_fine_ring_starts_late(dirs):
+    now = time.time()
+    _fill(dirs, now - 3600, now)
+    shutil.rmtree(dirs["runtime_root"])
+    _fill(dirs, now - 600, now, tiers=((1, 3600),))    # 1-s-Ring erst seit 10 min
+    res = TimeSeriesStore(writable=False, **dirs).query(KEY, "tq", now - 3500, now)
+    assert res["source_step"] == 10
+
+
+def test_query_unknown_series_is_empty(dirs):
+    now = time.time()
+    res = TimeSeriesStore(writable=False, **dirs).query(KEY, "tq", now - 3600, now)
+    assert res["t"] == [] and res["source_step"] == 1
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mesh topology graph
+-------------------
+Directed graph of mesh nodes and links, kept up to date incrementally from
+
+- this node's batman-adv neighbor table (direct links, BATMAN_V
+  throughput in Mbit/s) and originator table (best next hop per node)
+- batadv-vis data other nodes publish via ALFRED (data type 1): each node's
+  own neighbor list with link quality (TQ 0..255)
+
+Every source only replaces the outgoing links of the node it describes, and
+only changed links bump `version`; links that are not refreshed expire
+after `link_ttl`. Query results (hop count, widest/bottleneck path) are
+cached per source node until the graph changes.
+
+Throughput (Mbit/s) and TQ (0..255) are not comparable, so a widest path
+only follows links of one kind and its bottleneck carries that kind; nodes
+reachable only over mixed links have no bottleneck.
+
+The monitor writes to_json() to /run/ogm_monitor/topology.json whenever
+the graph changed; the web app loads it with Topology.from_json() and
+answers path queries from there.
+"""
+
+import heapq
+import json
+import struct
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+TOPOLOGY_FILE = "/run/ogm_monitor/topology.json"
+ALFRED_VIS_TYPE = 1           # batadv-vis server data
+ALFRED_VIS_VERSION = 1
+
+_VIS_HDR = struct.Struct("!6sBB")      # mac, iface_n, entries_n
+_VIS_ENTRY = struct.Struct("!6sBB")    # mac, ifindex (255 = TT client), qual
+_VIS_TT_IFINDEX = 255
+LINK_KINDS = ("tput", "tq")   # Vorrang bei bottleneck() ohne kind
+
+
+class Link(NamedTuple):
+    metric: float             # Mbit/s (kind "tput") oder TQ 0..255 (kind "tq")
+    kind: str
+    source: str               # "local" | "vis"
+    updated: float
+
+
+def _mac(b: bytes) -> str:
+    return ":".join(f"{x:02x}" for x in b)
+
+
+def parse_vis(data: bytes) -> Tuple[str, List[Tuple[str, int]]]:
+    """One batadv-vis v1 record -> (node mac, [(neighbor mac, tq)]), TT clients dropped."""
+    mac, iface_n, entries_n = _VIS_HDR.unpack_from(data, 0)
+    off = _VIS_HDR.size + 6 * iface_n
+    links = []
+    for _ in range(entries_n):
+        if off + _VIS_ENTRY.size > len(data):
+            break
+        nmac, ifindex, qual = _VIS_ENTRY.unpack_from(data, off)
+        off += _VIS_ENTRY.size
+        if ifindex != _VIS_TT_IFINDEX:
+            links.append((_mac(nmac), qual))
+    return _mac(mac), links
+
+
+def _similar(a: Optional[float], b: Optional[float]) -> bool:
+    if a is None or b is None:
+        return a == b
+    return abs(a - b) <= max(1.0, 0.05 * abs(a))
+
+
+class Topology:
+    def __init__(self, link_ttl: float = 120.0) -> None:
+        self.link_ttl = link_ttl
+        self.version = 0
+        self.local = ""
+        self.nodes: Dict[str, Dict[str, Any]] = {}           # mac -> {name, via, route_metric}
+        self.adj: Dict[str, Dict[str, Link]] = {}            # src -> dst -> Link
+        self._cache: Dict[Tuple[str, str], Any] = {}
+        self._cache_version = -1
+
+    # ---------------------- updates ----------------------
+    def _node(self, mac: str) -> Dict[str, Any]:
+        n = self.nodes.get(mac)
+        if n is None:
+            n = self.nodes[mac] = {}
+            self.version += 1
+        return n
+
+    def _set_node_attr(self, mac: str, key: str, value: Any) -> None:
+        n = self._node(mac)
+        if n.get(key) != value:
+            n[key] = value
+            self.version += 1
+
+    def set_links(self, src: str, links: Dict[str, Tuple[float, str]], source: str,
+                  now: Optional[float] = None) -> None:
+        """Replace the outgoing links of `src` from one source; bumps version only on change."""
+        now = time.time() if now is None else now
+        self._node(src)
+        cur = self.adj.setdefault(src, {})
+        for dst in [d for d, l in cur.items() if l.source == source and d not in links]:
+            del cur[dst]
+            self.version += 1
+        for dst, (metric, kind) in links.items():
+            self._node(dst)
+            old = cur.get(dst)
+            # Messrauschen bumpt die Version nicht (Caches/Datei bleiben gültig)
+            if old is None or old.kind != kind or not _similar(old.metric, metric):
+                cur[dst] = Link(metric, kind, source, now)
+                self.version += 1
+            else:
+                cur[dst] = old._replace(source=source, updated=now)
+
+    def update_local(self, me: str, originators: Dict[str, Dict[str, Any]],
+                     neighbors: Optional[List[Dict[str, Any]]] = None,
+                     hostnames: Optional[Dict[str, str]] = None, now: Optional[float] = None,
+                     metric_kind: str = "tput") -> None:
+        """
+        This node's view. Without a neighbor table, direct neighbors are the
+        originators that are their own next hop; their link metric is the
+        originator's "throughput" field, which holds TQ under BATMAN_IV
+        (metric_kind "tq", or a record with a "tq" value).
+        """
+        now = time.time() if now is None else now
+        me = me.lower()
+        self.local = me
+        links: Dict[str, Tuple[float, str]] = {}
+        if neighbors is not None:
+            for n in neighbors:
+                if "throughput" in n:
+                    links[n["mac"]] = (float(n["throughput"]), "tput")
+                else:
+                    tq = originators.get(n["mac"], {}).get("throughput", 0.0)
+                    links[n["mac"]] = (float(tq), "tq")
+        else:
+            for mac, o in originators.items():
+                if o.get("nexthop") == mac:
+                    kind = "tq" if o.get("tq") is not None else metric_kind
+                    links[mac] = (float(o.get("throughput") or 0.0), kind)
+        self.set_links(me, links, "local", now)
+
+        for mac, o in originators.items():
+            self._set_node_attr(mac, "via", o.get("nexthop", ""))
+            rm, old = o.get("throughput"), self.nodes[mac].get("route_metric")
+            if not _similar(old, rm):
+                self._set_node_attr(mac, "route_metric", rm)
+        for mac, n in self.nodes.items():
+            if mac not in originators and "via" in n:
+                n.pop("via")
+                n.pop("route_metric", None)
+                self.version += 1
+        if hostnames:
+            for mac, name in hostnames.items():
+                if mac in self.nodes:
+                    self._set_node_attr(mac, "name", name)
+
+    def update_vis(self, records: Iterable[Tuple[str, List[Tuple[str, int]]]],
+                   now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        for mac, links in records:
+            if mac == self.local:
+                continue                # eigene Sicht kommt aus update_local
+            self.set_links(mac, {n: (float(q), "tq") for n, q in links}, "vis", now)
+
+    def expire(self, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        for src, links in self.adj.items():
+            for dst in [d for d, l in links.items() if now - l.updated > self.link_ttl]:
+                del links[dst]
+                self.version += 1
+        linked = set(self.adj) | {d for links in self.adj.values() for d in links}
+        for mac in [m for m in self.nodes if m not in linked and m != self.local
+                    and not self.nodes[m].get("via")]:
+            del self.nodes[mac]
+            self.adj.pop(mac, None)
+            self.version += 1
+
+    # ---------------------- queries ----------------------
+    def _cached(self, key: Tuple[str, str], compute):
+        if self._cache_version != self.version:
+            self._cache.clear()
+            self._cache_version = self.version
+        val = self._cache.get(key)
+        if val is None:
+            val = self._cache[key] = compute()
+        return val
+
+    def _bfs(self, src: str) -> Dict[str, Optional[str]]:
+        """Predecessor map of a BFS from `src` (hop count)."""
+        prev: Dict[str, Optional[str]] = {src: None}
+        q = deque([src])
+        while q:
+            u = q.popleft()
+            for v in self.adj.get(u, ()):
+                if v not in prev:
+                    prev[v] = u
+                    q.append(v)
+        return prev
+
+    def _widest(self, src: str, kind: str) -> Tuple[Dict[str, float], Dict[str, Optional[str]]]:
+        """Max-bottleneck paths from `src` over links of one `kind` (Dijkstra on min edge metric)."""
+        best: Dict[str, float] = {src: float("inf")}
+        prev: Dict[str, Optional[str]] = {src: None}
+        heap = [(-best[src], src)]
+        done = set()
+        while heap:
+            negw, u = heapq.heappop(heap)
+            if u in done:
+                continue
+            done.add(u)
+            for v, link in self.adj.get(u, {}).items():
+                if link.kind != kind:
+                    continue            # Mbit/s und TQ nicht mischen
+                w = min(-negw, link.metric)
+                if w > best.get(v, -1.0):
+                    best[v] = w
+                    prev[v] = u
+                    heapq.heappush(heap, (-w, v))
+        return best, prev
+
+    @staticmethod
+    def _walk(prev: Dict[str, Optional[str]], dst: str) -> List[str]:
+        if dst not in prev:
+            return []
+        path = [dst]
+        while prev[path[-1]] is not None:
+            path.append(prev[path[-1]])
+        return path[::-1]
+
+    def path(self, src: str, dst: str) -> List[str]:
+        """Fewest-hop path (empty list if unreachable)."""
+        return self._walk(self._cached(("bfs", src), lambda: self._bfs(src)), dst)
+
+    def hops(self, src: str, dst: str) -> Optional[int]:
+        p = self.path(src, dst)
+        return len(p) - 1 if p else None
+
+    def bottleneck(self, src: str, dst: str,
+                   kind: Optional[str] = None) -> Tuple[Optional[float], List[str], Optional[str]]:
+        """
+        (bottleneck metric, widest path, kind) from src to dst over links of
+        one kind; without `kind` the first of LINK_KINDS that reaches dst.
+        (None, [], None) if no single-kind path exists.
+        """
+        if dst == src:
+            return None, [src], None
+        for k in (kind,) if kind else LINK_KINDS:
+            best, prev = self._cached(("widest:" + k, src), lambda: self._widest(src, k))
+            if dst in best:
+                return best[dst], self._walk(prev, dst), k
+        return None, [], None
+
+    # ---------------------- export ----------------------
+    def to_dict(self) -> Dict[str, Any]:
+        """Compact form: node list + links as [src_idx, dst_idx, metric, kind]."""
+        macs = sorted(self.nodes)
+        idx = {m: i for i, m in enumerate(macs)}
+        return {"version": self.version, "local": self.local,
+                "nodes": [dict(self.nodes[m], mac=m) for m in macs],
+                "links": [[idx[s], idx[d], round(l.metric, 2), l.kind]
+                          for s, links in self.adj.items() for d, l in links.items()
+                          if s in idx and d in idx]}
+
+    def to_json(self) -> bytes:
+        return json.dumps(self.to_dict(), separators=(",", ":")).encode()
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Topology":
+        t = cls()
+        t.local = data.get("local", "")
+        macs = [n["mac"] for n in data.get("nodes", [])]
+        for n in data.get("nodes", []):
+            t.nodes[n["mac"]] = {k: v for k, v in n.items() if k != "mac"}
+        for s, d, metric, kind in data.get("links", []):
+            t.adj.setdefault(macs[s], {})[macs[d]] = Link(metric, kind, "file", 0.0)
+        t.version = data.get("version", 0)
+        return t
+
+    def adjacency(self) -> Dict[str, Dict[str, float]]:
+        return {s: {d: l.metric for d, l in links.items()} for s, links in self.adj.items() if links}
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistent time-series store
+----------------------------
+Fixed-size, memory-mapped ring files per (series, metric, tier), so link
+history survives reboots and monitor restarts:
+
+    <root>/<series>/<metric>.<step>s.ring
+
+Every ring holds `slots` buckets of `step` seconds; a bucket stores
+min/max/sum/count of the samples that fell into it. An append touches one
+slot per tier in place (O(1), no file rewrites). Default tiers:
+
+    1 s for 1 h, 10 s for 24 h, 1 min for 30 days
+
+SD card wear: the finest tier lives under `runtime_root` (tmpfs, /run;
+preallocated, 86 KB per series and metric) and is written every second,
+but is lost on reboot. The coarser tiers stay on persistent storage and
+collect their buckets in memory; they are written to the mmap only every
+`flush_interval` seconds (and on close), so each of their pages is dirtied
+once per flush instead of once per sample. Queries on those tiers
+therefore lag by up to `flush_interval`.
+
+query() picks the finest tier whose data reaches back to the start of the
+requested range, so after a reboot (empty 1 s tier) a "last hour" query is
+answered from the persistent 10 s tier. It then downsamples server-side into
+at most `points` min/max/avg buckets, reading only the slots of the requested
+window. The files are created sparse; the size per series and metric is
+24 bytes * (3600 + 8640 + 43200) ~= 1.3 MB.
+
+A read-only store (web app) re-opens a ring when its inode or size
+changed and drops it when the writer pruned it.
+"""
+
+import math
+import mmap
+import os
+import re
+import struct
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+TSDB_DIR = "/home/natak/mesh/ogm_monitor/tsdb"
+TSDB_RUNTIME_DIR = "/run/ogm_monitor/tsdb"
+FLUSH_INTERVAL_SEC = 300
+
+# (step s, slots)
+DEFAULT_TIERS: Tuple[Tuple[int, int], ...] = ((1, 3600), (10, 8640), (60, 43200))
+DEFAULT_METRICS = ("signal_dbm", "throughput", "tx_retry_ratio")
+
+_MAGIC = b"OGMTS\0\0\1"
+_HEADER = struct.Struct("<8sIIq")      # magic, step, slots, last bucket written
+_HEADER_SIZE = 64
+_SLOT = struct.Struct("<qfffI")        # bucket no., min, max, sum, count
+
+_SAFE = re.compile(r"[^0-9A-Za-z_.-]")
+
+
+def series_name(key: str) -> str:
+    """MAC or other key -> directory name ('02:c5:..' -> '02c5..')."""
+    return _SAFE.sub("", key.replace(":", "").lower())
+
+
+class Ring:
+    """One mmap'ed ring file; `buffered` rings keep new buckets in memory until flush()."""
+
+    def __init__(self, path: str, step: int, slots: int, writable: bool = True,
+                 buffered: bool = False, preallocate: bool = False) -> None:
+        self.path = path
+        self.step = step
+        self.slots = slots
+        self.writable = writable
+        self.buffered = buffered and writable
+        self._pending: Dict[int, List[float]] = {}        # bucket -> [min, max, sum, count]
+        size = _HEADER_SIZE + slots * _SLOT.size
+        if writable:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fresh = os.fstat(fd).st_size != size
+                if not fresh:
+                    magic, st, sl, _ = _HEADER.unpack(os.pread(fd, _HEADER.size, 0))
+                    fresh = (magic, st, sl) != (_MAGIC, step, slots)
+                if fresh:
+                    os.ftruncate(fd, 0)
+                    os.ftruncate(fd, size)          # sparse, alles 0
+                    os.pwrite(fd, _HEADER.pack(_MAGIC, step, slots, -1), 0)
+                if preallocate:
+                    # tmpfs: Platz jetzt reservieren (ENOSPC hier statt SIGBUS beim Schreiben)
+                    os.posix_fallocate(fd, 0, size)
+                self._mm = mmap.mmap(fd, size)
+                st = os.fstat(fd)
+            finally:
+                os.close(fd)
+        else:
+            with open(path, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                st = os.fstat(f.fileno())
+            magic, self.step, self.slots, _ = _HEADER.unpack_from(self._mm, 0)
+            if magic != _MAGIC or len(self._mm) != _HEADER_SIZE + self.slots * _SLOT.size:
+                self._mm.close()
+                raise ValueError(f"not a ring file: {path}")
+        self._ident = (st.st_ino, st.st_size)
+
+    def changed(self) -> bool:
+        """True if the file was replaced, resized or removed since it was mapped."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return True
+        return (st.st_ino, st.st_size) != self._ident
+
+    def close(self) -> None:
+        if self.writable:
+            self.flush()
+        self._mm.close()
+
+    @property
+    def last_bucket(self) -> int:
+        return _HEADER.unpack_from(self._mm, 0)[3]
+
+    def add(self, ts: float, value: float) -> None:
+        bucket = int(ts // self.step)
+        if not self.buffered:
+            self._merge(bucket, value, value, value, 1)
+            return
+        p = self._pending.get(bucket)
+        if p is None:
+            self._pending[bucket] = [value, value, value, 1]
+        else:
+            p[0] = min(p[0], value)
+            p[1] = max(p[1], value)
+            p[2] += value
+            p[3] += 1
+
+    def flush(self) -> None:
+        pending, self._pending = self._pending, {}
+        for bucket in sorted(pending):
+            self._merge(bucket, *pending[bucket])
+
+    def _merge(self, bucket: int, mn: float, mx: float, sm: float, n: int) -> None:
+        off = _HEADER_SIZE + (bucket % self.slots) * _SLOT.size
+        b, omn, omx, osm, on = _SLOT.unpack_from(self._mm, off)
+        if b != bucket or on == 0:
+            _SLOT.pack_into(self._mm, off, bucket, mn, mx, sm, n)
+        else:
+            _SLOT.pack_into(self._mm, off, bucket, min(omn, mn), max(omx, mx), osm + sm, on + n)
+        if bucket > self.last_bucket:
+            struct.pack_into("<q", self._mm, _HEADER.size - 8, bucket)
+
+    def read(self, start: float, end: float) -> List[Tuple[float, float, float, float, int]]:
+        """(ts, min, max, sum, count) of all buckets in [start, end], oldest first."""
+        b0, b1 = int(start // self.step), int(end // self.step)
+        b0 = max(b0, b1 - self.slots + 1)
+        if b1 < b0:
+            return []
+        # nur die Slots des Fensters (höchstens zwei Stücke wegen Umlauf), aufsteigend
+        i0, n = b0 % self.slots, b1 - b0 + 1
+        first = min(n, self.slots - i0)
+        out = []
+        for i, cnt in ((i0, first), (0, n - first)):
+            if cnt <= 0:
+                continue
+            off = _HEADER_SIZE + i * _SLOT.size
+            out.extend((b * self.step, mn, mx, sm, c)
+                       for b, mn, mx, sm, c in _SLOT.iter_unpack(self._mm[off:off + cnt * _SLOT.size])
+                       if c and b0 <= b <= b1)
+        return out
+
+
+class TimeSeriesStore:
+    def __init__(self, root: str = TSDB_DIR, tiers: Iterable[Tuple[int, int]] = DEFAULT_TIERS,
+                 metrics: Iterable[str] = DEFAULT_METRICS, writable: bool = True,
+                 max_open: int = 512, runtime_root: Optional[str] = TSDB_RUNTIME_DIR,
+                 flush_interval: float = FLUSH_INTERVAL_SEC) -> None:
+        self.root = root
+        self.runtime_root = runtime_root or None      # None -> alle Tiers unter root
+        self.tiers = tuple(sorted(tiers))
+        self.metrics = tuple(metrics)
+        self.writable = writable
+        self.max_open = max_open
+        self.flush_interval = flush_interval
+        self._flushed: Optional[float] = None
+        self._rings: Dict[str, Ring] = {}
+
+    def _roots(self) -> List[str]:
+        return [self.root] + ([self.runtime_root] if self.runtime_root else [])
+
+    def _ring(self, series: str, metric: str, step: int, slots: int) -> Ring:
+        runtime = self.runtime_root is not None and step == self.tiers[0][0]
+        path = os.path.join(self.runtime_root if runtime else self.root, series, f"{metric}.{step}s.ring")
+        r = self._rings.get(path)
+        if r is not None and not self.writable and r.changed():
+            self._rings.pop(path).close()                 # vom Schreiber ersetzt/gelöscht
+            r = None
+        if r is None:
+            if len(self._rings) >= self.max_open:
+                for p in list(self._rings)[: self.max_open // 4]:
+                    self._rings.pop(p).close()
+            r = self._rings[path] = Ring(path, step, slots, self.writable,
+                                         buffered=not runtime and self.flush_interval > 0,
+                                         preallocate=runtime)
+        return r
+
+    def flush(self) -> None:
+        """Write the buffered buckets of the persistent tiers into their rings."""
+        for r in self._rings.values():
+            r.flush()
+
+    def close(self) -> None:
+        for r in self._rings.values():
+            r.close()
+        self._rings.clear()
+
+    # ---------------------- write ----------------------
+    def append(self, ts: float, key: str, metric: str, value: float) -> None:
+        series = series_name(key)
+        for step, slots in self.tiers:
+            self._ring(series, metric, step, slots).add(ts, value)
+
+    def append_snapshot(self, ts: float, nodes: Dict[str, Dict[str, Any]]) -> None:
+        # alle Ringe eines Ticks offen halten, sonst wird jeder Tick neu gemappt
+        need = len(nodes) * len(self.metrics) * len(self.tiers)
+        if need > self.max_open:
+            self.max_open = need + need // 4
+        for mac, info in nodes.items():
+            for m in self.metrics:
+                v = info.get(m)
+                if isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v):
+                    self.append(ts, mac, m, float(v))
+        if self._flushed is None:
+            self._flushed = ts
+        elif self.flush_interval and ts - self._flushed >= self.flush_interval:
+            self._flushed = ts
+            self.flush()
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Delete series not written within the longest tier's retention."""
+        now = time.time() if now is None else now
+        step, slots = self.tiers[-1]
+        horizon = now - step * slots
+        removed = 0
+        for series in self.list_series():
+            dirs = [d for d in (os.path.join(r, series) for r in self._roots()) if os.path.isdir(d)]
+            if max((os.path.getmtime(os.path.join(d, f)) for d in dirs for f in os.listdir(d)),
+                   default=0) >= horizon:
+                continue
+            for d in dirs:
+                for p in [p for p in self._rings if os.path.dirname(p) == d]:
+                    self._rings.pop(p).close()
+                for f in os.listdir(d):
+                    os.unlink(os.path.join(d, f))
+                os.rmdir(d)
+            removed += 1
+        return removed
+
+    # ---------------------- read ----------------------
+    def list_series(self) -> List[str]:
+        series = set()
+        for root in self._roots():
+            try:
+                series.update(d for d in os.listdir(root) if os.path.isdir(os.path.join(root, d)))
+            except OSError:
+                pass
+        return sorted(series)
+
+    def list_metrics(self, key: str) -> List[str]:
+        metrics = set()
+        for root in self._roots():
+            try:
+                files = os.listdir(os.path.join(root, series_name(key)))
+            except OSError:
+                continue
+            metrics.update(f.split(".", 1)[0] for f in files if f.endswith(".ring"))
+        return sorted(metrics)
+
+    def query(self, key: str, metric: str, start: float, end: float,
+              points: int = 300) -> Dict[str, Any]:
+        """
+        Range query with min/max bucket downsampling to <= `points` buckets.
+        Result: {"step", "t", "min", "max", "avg"} (t = bucket start, unix s).
+        Falls back to a coarser tier when the finer ring is missing or starts
+        later than `start`; "source_step" names the tier that was read.
+        """
+        series = series_name(key)
+        now = time.time()
+        # Tiers, deren Aufbewahrung bis `start` reicht ("letzte Stunde" nicht am Rand verlieren)
+        tiers = [t for t in self.tiers if now - start <= t[0] * t[1] * 1.01] or [self.tiers[-1]]
+        step, rows = tiers[0][0], []
+        for tstep, tslots in tiers:
+            try:
+                trows = self._ring(series, metric, tstep, tslots).read(start, end)
+            except (OSError, ValueError):
+                continue                                # Ring fehlt (1-s-Tier nach Reboot)
+            if trows and (not rows or trows[0][0] < rows[0][0]):
+                step, rows = tstep, trows
+            if rows and rows[0][0] < start + tstep:
+                break                                   # feinster Tier, der `start` abdeckt
+
+        points = max(1, points)
+        width = max(step, math.ceil((end - start) / points / step) * step)
+        out: Dict[str, Any] = {"series": series, "metric": metric, "step": width,
+                               "source_step": step, "t": [], "min": [], "max": [], "avg": []}
+        cur = None
+        mn = mx = sm = 0.0
+        n = 0
+        for ts, rmn, rmx, rsm, rn in rows:
+            b = int((ts - start) // width)
+            if b != cur:
+                if cur is not None:
+                    self._emit(out, start + cur * width, mn, mx, sm, n)
+                cur, mn, mx, sm, n = b, rmn, rmx, 0.0, 0
+            mn, mx = min(mn, rmn), max(mx, rmx)
+            sm += rsm
+            n += rn
+        if cur is not None:
+            self._emit(out, start + cur * width, mn, mx, sm, n)
+        return out
+
+    @staticmethod
+    def _emit(out: Dict[str, Any], t: float, mn: float, mx: float, sm: float, n: int) -> None:
+        out["t"].append(int(t))
+        out["min"].append(round(mn, 3))
+        out["max"].append(round(mx, 3))
+        out["avg"].append(round(sm / n, 3))
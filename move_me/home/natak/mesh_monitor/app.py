@@ -1,9 +1,49 @@
 from flask import Flask, render_template, jsonify, request
-import socket, subprocess, json, os, time, sys, platform, shutil, re
+import socket, subprocess, json, os, time, sys, platform, shutil, re, threading, fcntl, struct, queue
+import gzip, zlib, hashlib
+from collections import OrderedDict
 import flask
 from pathlib import Path
 from datetime import datetime
 
+# gemeinsame Module mit dem OGM-Monitor (alfred_client, ...)
+OGM_DIR = "/home/natak/mesh/ogm_monitor"
+if OGM_DIR not in sys.path:
+    sys.path.append(OGM_DIR)
+try:
+    from alfred_client import AlfredClient
+except Exception:
+    AlfredClient = None
+try:
+    from history import query_history
+except Exception:
+    query_history = None
+try:
+    from snapshot import SnapshotReader
+    _snapshot = SnapshotReader()
+except Exception:
+    _snapshot = None
+try:
+    from topology import LINK_KINDS, TOPOLOGY_FILE, Topology
+except Exception:
+    Topology = None
+try:
+    from privhelper import HELPER_SOCK, HelperError, HelperUnavailable, PrivHelperClient
+    _helper = PrivHelperClient(os.environ.get('MESH_PRIV_HELPER_SOCK', HELPER_SOCK))
+except Exception:
+    _helper = None
+try:
+    from dhcp_tracker import LEASE_FILE, LeaseTracker
+    _lease_tracker = LeaseTracker(LEASE_FILE, lan_iface='br0', ap_iface='wlan0')
+except Exception:
+    _lease_tracker = None
+try:
+    from tsdb import TSDB_DIR, TSDB_RUNTIME_DIR, TimeSeriesStore
+    _tsdb = TimeSeriesStore(os.environ.get('OGM_TSDB_DIR', TSDB_DIR), writable=False,
+                            runtime_root=os.environ.get('OGM_TSDB_RUNTIME_DIR', TSDB_RUNTIME_DIR))
+except Exception:
+    _tsdb = None
+
 NEIGH_ACTIVE = {"REACHABLE", "DELAY", "PROBE"}  # optional: add "STALE" with a time window
 
 def get_reticulum_version():
@@ -46,14 +86,28 @@ BATMESH_SH     = Path("/home/natak/mesh/batmesh.sh")
 
 # Configuration
 NODE_TIMEOUT = 30  # Seconds - nodes not seen within this time will be greyed out
+# OGM-Monitor schreibt nach /run (tmpfs) und checkpointet nach ~/mesh/ogm_monitor
+STATUS_FILES = ('/run/ogm_monitor/node_status.json',
+                '/home/natak/mesh/ogm_monitor/node_status.json')
+
+def status_file_path():
+    """Neueste vorhandene node_status.json (Runtime-Datei oder Checkpoint)"""
+    best, best_mtime = STATUS_FILES[-1], -1.0
+    for p in STATUS_FILES:
+        try:
+            m = os.stat(p).st_mtime
+        except OSError:
+            continue
+        if m > best_mtime:
+            best, best_mtime = p, m
+    return best
 
 def get_local_mac():
     """Get local MAC from wlan1 interface"""
     try:
-        result = subprocess.run(['cat', '/sys/class/net/wlan1/address'], 
-                              capture_output=True, text=True)
-        return result.stdout.strip() if result.returncode == 0 else "unknown"
-    except:
+        with open('/sys/class/net/wlan1/address') as f:
+            return f.read().strip() or "unknown"
+    except OSError:
         return "unknown"
 
 def _first_line(txt: str) -> str:
@@ -107,6 +161,12 @@ def get_alfred_version() -> str:
     return "unbekannt"
 
 def get_batman_version():
+    # Kernelmodul direkt aus sysfs, sonst "batctl -v"
+    try:
+        with open('/sys/module/batman_adv/version') as f:
+            return f.read().strip()
+    except OSError:
+        pass
     try:
         out = subprocess.check_output(["batctl", "-v"], stderr=subprocess.STDOUT).decode()
         # Beispielausgabe: "batctl 2023.4 [batman-adv: 2023.4]"
@@ -117,11 +177,107 @@ def get_batman_version():
     except Exception:
         return "unbekannt"
 
+def body_etag(body):
+    """Inhalts-ETag (gleicher Body -> gleicher Tag, auch über Neustarts)"""
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+class StatusCache:
+    """
+    Gemeinsamer Zugriff auf den Monitor-Status für alle Status-Endpoints.
+    Quelle ist der Snapshot in Shared Memory, sonst node_status.json. Ein
+    Treffer kostet genau einen stat (Snapshot-Header bzw. Statusdatei);
+    neu geparst wird nur, wenn sich Version bzw. (inode, mtime, size)
+    geändert haben. Gleichzeitige Requests teilen sich einen Parse
+    (single-flight). Neben dem Dict wird der fertige JSON-Body gehalten,
+    abgeleitete Bodies (z. B. /api/wifi) per body() je Version.
+    Die gelieferten Dicts werden geteilt und dürfen nicht verändert werden.
+    """
+    RESOLVE_SEC = 5     # so oft Runtime-Datei vs. Checkpoint neu wählen
+
+    def __init__(self):
+        self._entry = (None, {}, b'')     # (key, data, body), atomar ersetzt
+        self._derived = {}
+        self._path = None
+        self._resolved = 0.0
+        self._lock = threading.Lock()
+
+    def _key(self):
+        if _snapshot is not None:
+            try:
+                v = _snapshot.version()
+                if v:
+                    return ('shm', v)
+            except Exception as e:
+                print(f"Error reading status snapshot: {e}")
+        return self._file_key()
+
+    def _file_key(self):
+        now = time.monotonic()
+        if self._path is None or now - self._resolved > self.RESOLVE_SEC:
+            self._path, self._resolved = status_file_path(), now
+        try:
+            st = os.stat(self._path)
+        except OSError:
+            self._path = None
+            raise
+        return (self._path, st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _load(self, key):
+        if key[0] == 'shm':
+            snap = _snapshot.read()
+            if snap is not None:
+                return ('shm', snap.version), snap.data
+            key = self._file_key()
+        with open(key[0], 'rb') as f:
+            # Schlüssel vom geöffneten Inode, falls die Datei inzwischen ersetzt wurde
+            st = os.fstat(f.fileno())
+            return (key[0], st.st_ino, st.st_mtime_ns, st.st_size), f.read()
+
+    def get(self):
+        """(key, data, body) der aktuellen Version"""
+        key = self._key()
+        entry = self._entry
+        if entry[0] == key:
+            return entry
+        with self._lock:
+            entry = self._entry
+            if entry[0] == key:       # ein anderer Request hat schon geparst
+                return entry
+            key, body = self._load(key)
+            entry = (key, json.loads(body), body)
+            self._entry = entry
+        return entry
+
+    def body(self, name, build, extra=None):
+        """(Body, ETag) von build(data), gecacht pro Status-Version (+ extra)"""
+        key, data, _ = self.get()
+        hit = self._derived.get(name)
+        if hit is not None and hit[0] == (key, extra):
+            return hit[1]
+        body = build(data)
+        result = (body, body_etag(body))
+        self._derived[name] = ((key, extra), result)
+        return result
+
+    @staticmethod
+    def etag(key):
+        """ETag aus der Snapshot-Version bzw. (inode, mtime, size) der Datei"""
+        if key[0] == 'shm':
+            return f"s{key[1]}"
+        return f"f{key[1]:x}-{key[2]:x}-{key[3]:x}"
+
+_status = StatusCache()
+
+def load_status():
+    """
+    Aktueller Status des OGM-Monitors (Snapshot aus Shared Memory, sonst
+    node_status.json), über _status gecacht.
+    """
+    return _status.get()[1]
+
 def read_node_status():
     try:
-        with open('/home/natak/mesh/ogm_monitor/node_status.json', 'r') as f:
-            data = json.load(f)
-            return data.get('nodes', {})
+        return load_status().get('nodes', {})
     except Exception as e:
         print(f"Error reading node_status.json: {e}")
         return {}
@@ -146,9 +302,29 @@ def update_wpa_supplicant_frequency(new_frequency):
     cmd = f'sed -i "s/frequency=.*/frequency={new_frequency}/" /etc/wpa_supplicant/wpa_supplicant-wlan1-encrypt.conf'
     return subprocess.run(cmd, shell=True, capture_output=True)
 
+def run_privileged(op, argv, **args):
+    """
+    Privilegierter Aufruf: als root direkt, sonst als privhelper-Operation `op`
+    (persistente Socket-Verbindung). Kein sudo-Rückfall mehr (sudoers erlaubt
+    nur noch den Helper-Neustart): läuft der Helper nicht, rc 1 mit Meldung.
+    Liefert immer ein CompletedProcess mit Text-Ausgabe.
+    """
+    if os.geteuid() == 0:
+        return subprocess.run(argv, capture_output=True, text=True)
+    if _helper is None:
+        return subprocess.CompletedProcess(argv, 1, '', 'privileged helper unavailable (privhelper module missing)')
+    try:
+        r = _helper.call(op, **args)
+    except HelperUnavailable as e:
+        return subprocess.CompletedProcess(
+            argv, 1, '', f'privileged helper unavailable ({e}); is mesh-privhelper.service running?')
+    except HelperError as e:
+        return subprocess.CompletedProcess(argv, 1, '', str(e))
+    return subprocess.CompletedProcess(argv, r.rc, r.out, r.err)
+
 def reboot_system():
     """Reboot the system to apply changes"""
-    return subprocess.run(['sudo', 'reboot'], capture_output=True)
+    return run_privileged('reboot', ['systemctl', 'reboot'])
 
 def get_current_ip():
     """Read current IP from br0.network"""
@@ -198,15 +374,17 @@ def get_timezone():
     except: return "UTC"
 
 def set_timezone(tz):
-    return subprocess.run(['sudo','timedatectl','set-timezone',tz], capture_output=True, text=True)
+    return run_privileged('set_timezone', ['timedatectl','set-timezone',tz], tz=tz)
 
 def change_hostname(newname):
-    return subprocess.run(['sudo','hostnamectl','set-hostname', newname], capture_output=True, text=True)
+    return run_privileged('set_hostname', ['hostnamectl','set-hostname', newname], hostname=newname)
 
 def restart_service(service):
     if service not in ALLOWED_SERVICES:
         return subprocess.CompletedProcess(args=[], returncode=1, stdout='', stderr='Service not allowed')
-    return subprocess.run(['sudo','systemctl','restart',service], capture_output=True, text=True)
+    r = run_privileged('restart_service', ['systemctl','restart',service], service=service)
+    _health.poke()
+    return r
 
 def read_dhcp_config():
     """
@@ -290,87 +468,217 @@ def read_dhcp_leases():
     except: pass
     return leases
 
-def gather_node_info():
-    # OS/Kernal
-    kernel = platform.release()
+def _os_pretty_name():
     try:
-        os_pretty = subprocess.run(['bash','-lc','. /etc/os-release && echo $PRETTY_NAME'],
-                                   capture_output=True, text=True)
-        os_name = os_pretty.stdout.strip() or platform.platform()
-    except:
-        os_name = platform.platform()
-    # uptime
+        with open('/etc/os-release') as f:
+            for ln in f:
+                if ln.startswith('PRETTY_NAME='):
+                    return ln.split('=', 1)[1].strip().strip('"').strip("'")
+    except OSError:
+        pass
+    return platform.platform()
+
+class NodeStaticInfo:
+    """
+    Selten ändernde Node-Infos (OS, Kernel, Versionen von Reticulum,
+    batman-adv, alfred, ...). Die Ermittlung kostet etliche Subprozesse und
+    läuft deshalb einmal im Hintergrund nach dem Start und danach nur auf
+    Anforderung (refresh()); Requests bekommen immer den Cache.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.updated = 0.0
+        self._lock = threading.Lock()
+        self._running = False
+
+    def _collect(self):
+        try:
+            data = {
+                'os': _os_pretty_name(),
+                'kernel': platform.release(),
+                'app_version': APP_VERSION,
+                'flask_version': flask.__version__,
+                'python_version': sys.version.split()[0],
+                'reticulum_version': get_reticulum_version(),
+                'batman_version': get_batman_version(),
+                'alfred_version': get_alfred_version(),
+            }
+            self.data, self.updated = data, time.time()
+        finally:
+            self._running = False
+
+    def refresh(self):
+        """Neu ermitteln (im Hintergrund); False, wenn schon ein Lauf aktiv ist."""
+        with self._lock:
+            if self._running:
+                return False
+            self._running = True
+        threading.Thread(target=self._collect, daemon=True, name='node-static').start()
+        return True
+
+    def get(self):
+        return dict(self.data, static_updated=self.updated, static_pending=self._running)
+
+_node_static = NodeStaticInfo()
+_node_static.refresh()
+
+SIOCGIFADDR = 0x8915
+
+def _ipv4_addresses():
+    """IPv4 pro Interface per ioctl (kein `ip`-Aufruf), in ifindex-Reihenfolge"""
+    ips = []
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        for _idx, name in socket.if_nameindex():
+            try:
+                req = struct.pack('256s', name.encode()[:15])
+                ips.append(socket.inet_ntoa(fcntl.ioctl(s.fileno(), SIOCGIFADDR, req)[20:24]))
+            except OSError:
+                pass            # Interface ohne IPv4
+    return ips
+
+def _format_uptime(sec):
+    """wie `uptime -p`"""
+    minutes = int(sec // 60)
+    parts = []
+    for unit, size in (('week', 10080), ('day', 1440), ('hour', 60), ('minute', 1)):
+        n, minutes = divmod(minutes, size)
+        if n:
+            parts.append(f"{n} {unit}{'s' if n != 1 else ''}")
+    return 'up ' + (', '.join(parts) or '0 minutes')
+
+def gather_node_dynamic():
+    """Günstige, sich ändernde Werte – pro Request aus /proc und sysfs"""
     try:
-        up = subprocess.run(['uptime','-p'], capture_output=True, text=True).stdout.strip()
-    except:
+        with open('/proc/uptime') as f:
+            up = _format_uptime(float(f.read().split()[0]))
+    except (OSError, ValueError):
         up = ''
-    # load
     try:
         la = os.getloadavg()
         load = f"{la[0]:.2f}, {la[1]:.2f}, {la[2]:.2f}"
-    except:
+    except OSError:
         load = ''
-    # memory
     try:
         meminfo = {}
         with open('/proc/meminfo') as f:
             for line in f:
-                k,v = line.split(':',1)
-                meminfo[k]=v.strip()
+                k, v = line.split(':', 1)
+                if k in ('MemTotal', 'MemAvailable'):
+                    meminfo[k] = v.strip()
         mem = f"{meminfo.get('MemAvailable','?')} free / {meminfo.get('MemTotal','?')} total"
-    except:
+    except (OSError, ValueError):
         mem = ''
-    # disk
     try:
         du = shutil.disk_usage('/')
         disk = f"{du.free//(1024**3)}G free / {du.total//(1024**3)}G total"
-    except:
+    except OSError:
         disk = ''
-    # ipv4
     try:
-        out = subprocess.run(['ip','-o','-4','addr','show'], capture_output=True, text=True).stdout
-        ips = [ln.split()[3].split('/')[0] for ln in out.strip().splitlines()]
-    except:
+        ips = _ipv4_addresses()
+    except OSError:
         ips = []
     return {
         'hostname': socket.gethostname(),
         'local_mac': get_local_mac(),
-        'os': os_name, 'kernel': kernel, 'uptime': up,
-        'load': load, 'memory': mem, 'disk': disk, 'ipv4': ips,
-        'app_version': APP_VERSION,
-        'flask_version': flask.__version__,
-        'python_version': sys.version.split()[0],
-        'reticulum_version': get_reticulum_version(),
-        'batman_version': get_batman_version(),
-        'alfred_version': get_alfred_version(),
+        'uptime': up, 'load': load, 'memory': mem, 'disk': disk, 'ipv4': ips,
     }
 
+def gather_node_info():
+    return {**_node_static.get(), **gather_node_dynamic()}
+
 def read_full_status():
     try:
-        with open('/home/natak/mesh/ogm_monitor/node_status.json','r') as f:
-            return json.load(f)
+        return load_status()
     except Exception as e:
         print(f"Error reading node_status.json: {e}")
         return {"timestamp": 0, "nodes": {}}
 
-def _svc_state(name: str) -> str:
+HEALTH_UNITS = ('ogm-monitor', 'alfred', 'mesh-monitor')
+HEALTH_REFRESH_SEC = 5
+
+class ServiceHealth:
     """
-    Liefert 'ok' wenn Service aktiv ist, sonst 'bad'.
-    Versucht sowohl 'name' als auch 'name.service'.
+    Zustand der Mesh-Dienste, für alle Requests gecacht. Ein Hintergrund-Thread
+    fragt alle Units mit einem einzigen `systemctl is-active a b c` ab (alle
+    `interval` s oder sofort nach poke()). `version` steigt nur, wenn sich ein
+    Zustand ändert; wait() blockiert bis dahin (Push bei Änderung).
     """
-    candidates = [name, f"{name}.service"]
-    for n in candidates:
+
+    def __init__(self, units, interval=HEALTH_REFRESH_SEC):
+        self.units = tuple(units)
+        self.interval = interval
+        self.states = {u: 'unknown' for u in self.units}
+        self.checked = 0.0
+        self.changed = 0.0          # Zeitpunkt der letzten Zustandsänderung (version)
+        self.version = 0
+        self.error = None
+        self._cond = threading.Condition()
+        self._wake = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def _query(self):
+        p = subprocess.run(['systemctl', 'is-active', '--'] + [f'{u}.service' for u in self.units],
+                           capture_output=True, text=True, timeout=5)
+        states = (p.stdout or '').split()
+        if len(states) != len(self.units):
+            raise RuntimeError((p.stderr or '').strip() or f'systemctl exit {p.returncode}')
+        return dict(zip(self.units, states))
+
+    def refresh(self):
         try:
-            p = subprocess.run(
-                ["systemctl", "is-active", n],
-                capture_output=True, text=True, timeout=1.5
-            )
-            state = (p.stdout or '').strip()
-            if state == "active":
-                return "ok"
-        except Exception:
-            pass
-    return "bad"
+            states, error = self._query(), None
+        except Exception as e:
+            states, error = None, str(e)
+        with self._cond:
+            self.checked = time.time()
+            self.error = error
+            if states is not None and states != self.states:
+                self.states = states
+                self.changed = self.checked
+                self.version += 1
+                self._cond.notify_all()
+
+    def poke(self):
+        """Sofort neu prüfen (z. B. nach einem Service-Neustart)."""
+        self._wake.set()
+
+    def _loop(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.refresh()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self.refresh()          # erster Request bekommt schon echte Werte
+                self._thread = threading.Thread(target=self._loop, daemon=True, name='svc-health')
+                self._thread.start()
+
+    def snapshot(self):
+        self._ensure_started()
+        with self._cond:
+            return {'services': {u: 'ok' if st == 'active' else 'bad' for u, st in self.states.items()},
+                    'states': dict(self.states),
+                    'checked': self.checked,
+                    'age': round(time.time() - self.checked, 1),
+                    'changed': self.changed,
+                    'version': self.version,
+                    'error': self.error}
+
+    def wait(self, after, timeout):
+        """Snapshot, sobald version > after (None nach timeout)."""
+        self._ensure_started()
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.version > after, timeout):
+                return None
+        return self.snapshot()
+
+_health = ServiceHealth(HEALTH_UNITS)
 
 def get_current_ssid():
     try:
@@ -407,8 +715,9 @@ def _bridge_members_br0():
     return [x for x in out.split() if x]
 
 def _bat_members():
-    out = subprocess.getoutput("batctl if | awk '{print $1}'")
-    return [x for x in out.split() if x]
+    # "wlan1: active"
+    out = run_privileged('batctl_if', ['batctl', 'if']).stdout or ''
+    return [ln.split(':', 1)[0].strip() for ln in out.splitlines() if ':' in ln]
 
 def _neigh_active_macs(dev="br0"):
     out = subprocess.getoutput(f"ip neigh show dev {dev}")
@@ -423,7 +732,7 @@ def _neigh_active_macs(dev="br0"):
     return macs
 
 def _wifi_assoc_macs(iface="wlan0"):
-    out = subprocess.getoutput(f"iw dev {iface} station dump")
+    out = run_privileged('iw_station_dump', ['iw', 'dev', iface, 'station', 'dump'], iface=iface).stdout or ''
     return set(m.lower() for m in re.findall(r"Station\s+([0-9a-f:]{17})", out, re.I))
 
 
@@ -510,32 +819,355 @@ def about_page():
 
 ### API Endpoints
 
-@app.route('/api/wifi')
-def api_wifi():
+# Conditional GET + Kompression für JSON/Text-GETs (after_request): schwaches
+# ETag (vom Endpoint, sonst Hash des Bodys), 304 bei If-None-Match, gzip/deflate
+# ab COMPRESS_MIN_BYTES. Komprimiert wird einmal pro (ETag, Encoding), nicht pro Client.
+COMPRESS_MIN_BYTES = 1024
+COMPRESS_LEVEL = 6
+COMPRESS_CACHE_SIZE = 64
+COMPRESS_TYPES = ('application/json', 'text/plain')
+COMPRESS_ENCODINGS = ('gzip', 'deflate')
+
+class CompressionCache:
+    """LRU der komprimierten Bodies, Schlüssel (ETag, Encoding)"""
+
+    def __init__(self, size=COMPRESS_CACHE_SIZE, level=COMPRESS_LEVEL):
+        self.size = size
+        self.level = level
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _compress(self, body, encoding):
+        if encoding == 'gzip':
+            return gzip.compress(body, self.level, mtime=0)
+        return zlib.compress(body, self.level)       # HTTP "deflate" = zlib-Format
+
+    def get(self, etag, encoding, body):
+        key = (etag, encoding)
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return data
+        data = self._compress(body, encoding)
+        with self._lock:
+            self.misses += 1
+            self._items[key] = data
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+        return data
+
+_compressed = CompressionCache()
+
+def json_response(body, etag=None):
+    """JSON-Body (bytes) mit optionalem ETag; 304/Kompression macht _http_cache"""
+    resp = app.response_class(body, mimetype='application/json')
+    if etag:
+        resp.set_etag(etag, weak=True)
+    return resp
+
+def _pick_encoding(accept):
+    best, best_q = None, 0
+    for enc in COMPRESS_ENCODINGS:
+        q = accept.quality(enc)
+        if q > best_q:
+            best, best_q = enc, q
+    return best
+
+@app.after_request
+def _http_cache(resp):
+    if (request.method not in ('GET', 'HEAD') or resp.status_code != 200
+            or resp.direct_passthrough or resp.is_streamed
+            or resp.mimetype not in COMPRESS_TYPES or 'Content-Encoding' in resp.headers):
+        return resp
+    body = resp.get_data()
+    etag, _ = resp.get_etag()
+    if etag is None:
+        etag = body_etag(body)
+        resp.set_etag(etag, weak=True)
+    if 'Cache-Control' not in resp.headers:
+        resp.headers['Cache-Control'] = 'no-cache'     # immer revalidieren, dann 304
+    resp.vary.add('Accept-Encoding')
+    if request.if_none_match.contains_weak(etag):
+        not_modified = app.response_class(status=304)
+        for h in ('ETag', 'Cache-Control', 'Vary'):
+            not_modified.headers[h] = resp.headers[h]
+        return not_modified
+    if len(body) >= COMPRESS_MIN_BYTES:
+        encoding = _pick_encoding(request.accept_encodings)
+        if encoding:
+            resp.set_data(_compressed.get(etag, encoding, body))
+            resp.headers['Content-Encoding'] = encoding
+    return resp
+
+def wifi_payload(filedata=None):
+    """Body von /api/wifi (auch das 'status'-Event des Streams)"""
     # ganze JSON inkl. 'local' lesen
-    try:
-        with open('/home/natak/mesh/ogm_monitor/node_status.json','r') as f:
-            filedata = json.load(f)
-    except Exception:
-        filedata = {}
+    if filedata is None:
+        try:
+            filedata = load_status()
+        except Exception:
+            filedata = {}
 
     nodes = filedata.get('nodes', {})
     local = filedata.get('local', {'mac': get_local_mac()})
 
-    health = {
-        'ogm-monitor': _svc_state('ogm-monitor'),
-        'alfred': _svc_state('alfred'),
-        'mesh-monitor': _svc_state('mesh-monitor'),
-    }
+    # gecacht, ein systemctl-Aufruf alle HEALTH_REFRESH_SEC für alle Clients.
+    # Nur Werte, die sich mit _health.version ändern (kein checked/age), sonst
+    # wäre der gecachte Body samt ETag/gzip alle paar Sekunden neu.
+    health = _health.snapshot()
 
-    return jsonify({
+    return {
         'hostname': socket.gethostname(),
         'local_mac': get_local_mac(),
         'node_status': nodes,
         'local': local,
         'node_timeout': NODE_TIMEOUT,
-        'health': health,               # <— NEU
-    })
+        'health': health['services'],
+        'health_changed': health['changed'],
+        'health_interval': _health.interval,
+    }
+
+def wifi_body():
+    """(Body, ETag) von /api/wifi, neu gebaut nur bei neuem Status/Health-Zustand/Hostname"""
+    _health._ensure_started()
+    extra = (socket.gethostname(), _health.version)
+    try:
+        return _status.body('wifi', lambda d: json.dumps(wifi_payload(d)).encode(), extra)
+    except Exception:
+        body = json.dumps(wifi_payload({})).encode()
+        return body, body_etag(body)
+
+@app.route('/api/wifi')
+def api_wifi():
+    body, etag = wifi_body()
+    return json_response(body, etag)
+
+LONG_POLL_MAX = 4           # gleichzeitige Long-Polls (Profil setzt den Wert)
+LONG_POLL_MAX_SEC = 60.0
+LONG_POLL_RETRY_SEC = 5     # Retry-After, wenn alle Slots belegt sind
+LONG_POLL_POLL_SEC = 0.05   # Takt, in dem /api/status/wait das Shared Memory prüft
+
+class LongPollGate:
+    """
+    Long-Polls (/api/status/wait, /api/health?version=) belegen einen
+    Request-Thread für die ganze Wartezeit. Höchstens `limit` warten
+    gleichzeitig; weitere Anfragen schauen nur einmal nach (timeout 0) und
+    bekommen sonst sofort 204 mit Retry-After, statt den Pool zu blockieren.
+    `poll_sec` ist der Takt für Wartefunktionen ohne Benachrichtigung
+    (SnapshotReader.wait pollt das Shared Memory des Monitors): kleiner =
+    weniger Latenz, größer = weniger Aufwachen pro wartendem Thread.
+    """
+
+    def __init__(self, limit=LONG_POLL_MAX, max_sec=LONG_POLL_MAX_SEC, poll_sec=LONG_POLL_POLL_SEC):
+        self.configure(limit, max_sec, poll_sec)
+        self.counters = {'waited': 0, 'busy': 0}
+
+    def configure(self, limit, max_sec, poll_sec=LONG_POLL_POLL_SEC):
+        self.limit = limit
+        self.max_sec = max_sec
+        self.poll_sec = poll_sec
+        self._slots = threading.BoundedSemaphore(limit)
+
+    def wait(self, wait, after, timeout):
+        """wait(after, timeout) mit Slot -> (Ergebnis oder None, busy)"""
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            self.counters['busy'] += 1
+            return wait(after, 0), True
+        try:
+            self.counters['waited'] += 1
+            return wait(after, min(timeout, self.max_sec)), False
+        finally:
+            slots.release()
+
+_long_polls = LongPollGate()
+
+def long_poll_args():
+    """(version, timeout) aus ?version=&timeout= (Default 25 s); ValueError bei Unsinn"""
+    return int(request.args.get('version') or 0), float(request.args.get('timeout') or 25)
+
+def no_change(busy):
+    """204 nach Timeout; bei vollem Long-Poll-Pool mit Retry-After"""
+    resp = app.response_class(status=204)
+    if busy:
+        resp.headers['Retry-After'] = str(LONG_POLL_RETRY_SEC)
+    return resp
+
+@app.route('/api/health')
+def api_health():
+    """
+    Dienst-Zustände aus dem Cache (inkl. checked/age). Mit ?version=<n>
+    Long-Poll: Antwort erst, wenn sich ein Zustand ändert (max. ?timeout= s,
+    Default 25), sonst 204. Begrenzt durch _long_polls.
+    """
+    if 'version' not in request.args:
+        return jsonify(_health.snapshot())
+    try:
+        after, timeout = long_poll_args()
+    except ValueError:
+        return jsonify({'error': 'invalid version/timeout'}), 400
+    snap, busy = _long_polls.wait(_health.wait, after, timeout)
+    if snap is None:
+        return no_change(busy)
+    return jsonify(snap)
+
+SSE_TOPICS = ('status', 'node', 'logs')
+SSE_QUEUE_SIZE = 8          # pro Client; volle Queue verwirft das älteste Event
+SSE_HEARTBEAT_SEC = 15
+SSE_MAX_CLIENTS = 32
+SSE_NODE_INTERVAL_SEC = 1
+SSE_LOGS_INTERVAL_SEC = 2
+
+class EventHub:
+    """
+    Server-Sent Events: ein Producer-Thread, beliebig viele Clients.
+
+    - status: Body von /api/wifi, nur wenn der Monitor einen neuen Snapshot
+      veröffentlicht oder sich die Dienst-Zustände ändern
+    - node:   /api/node-info, alle SSE_NODE_INTERVAL_SEC
+    - logs:   /api/packet-logs, wenn sich die Logs ändern
+
+    Jedes Event wird einmal serialisiert und an alle Abonnenten verteilt;
+    jeder Client hat eine begrenzte Queue (langsame Clients verlieren alte
+    Events statt Speicher zu binden). Neue Clients bekommen sofort das
+    letzte Event jedes Topics. Ohne Clients schläft der Producer.
+    """
+
+    def __init__(self, max_clients=SSE_MAX_CLIENTS):
+        self.max_clients = max_clients
+        self._clients = {}          # queue -> set(topics)
+        self._last = {}             # topic -> kodiertes Event
+        self._lock = threading.Lock()
+        self._has_clients = threading.Event()
+        self._thread = None
+        self.counters = {'events': 0, 'dropped': 0, 'rejected': 0}
+
+    def subscribe(self, topics):
+        """Queue für die Topics; None, wenn max_clients erreicht ist."""
+        q = queue.Queue(SSE_QUEUE_SIZE)
+        with self._lock:
+            if len(self._clients) >= self.max_clients:
+                self.counters['rejected'] += 1
+                return None
+            self._clients[q] = set(topics)
+            for t in topics:
+                if t in self._last:
+                    q.put_nowait(self._last[t])
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name='sse-hub')
+                self._thread.start()
+        self._has_clients.set()
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._clients.pop(q, None)
+            if not self._clients:
+                self._has_clients.clear()
+
+    def clients(self):
+        return len(self._clients)
+
+    def publish(self, topic, body, event_id=''):
+        msg = (f"id: {event_id}\n" if event_id else "") + f"event: {topic}\ndata: {body}\n\n"
+        msg = msg.encode()
+        with self._lock:
+            self._last[topic] = msg
+            targets = [q for q, topics in self._clients.items() if topic in topics]
+        self.counters['events'] += 1
+        for q in targets:
+            try:
+                q.put_nowait(msg)
+            except queue.Full:
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    pass
+                self.counters['dropped'] += 1
+                try:
+                    q.put_nowait(msg)
+                except queue.Full:
+                    pass
+
+    def _wait_status(self, after, timeout):
+        """Neue Status-Version (> after) oder None; ohne Snapshot per Datei-mtime."""
+        if _snapshot is not None:
+            try:
+                if _snapshot.version():
+                    snap = _snapshot.wait(after, timeout)
+                    return snap.version if snap is not None else None
+            except Exception as e:
+                print(f"sse: snapshot error: {e}")
+        time.sleep(timeout)
+        try:
+            v = os.stat(status_file_path()).st_mtime_ns
+        except OSError:
+            return None
+        return v if v != after else None
+
+    def _run(self):
+        status_v, health_v = -1, -1
+        next_node = next_logs = 0.0
+        logs_body = None
+        while True:
+            self._has_clients.wait()
+            try:
+                # blockiert bis zum nächsten Snapshot, höchstens bis node/logs fällig sind
+                v = self._wait_status(status_v, max(0.05, min(next_node, next_logs) - time.monotonic()))
+                if v is not None or _health.version != health_v:
+                    status_v = status_v if v is None else v
+                    health_v = _health.version
+                    self.publish('status', wifi_body()[0].decode(), f"{status_v}.{health_v}")
+                now = time.monotonic()
+                if now >= next_node:
+                    next_node = now + SSE_NODE_INTERVAL_SEC
+                    if any('node' in t for t in list(self._clients.values())):
+                        self.publish('node', json.dumps(gather_node_info()))
+                if now >= next_logs:
+                    next_logs = now + SSE_LOGS_INTERVAL_SEC
+                    body = json.dumps({'hostname': socket.gethostname(), 'logs': read_packet_logs()})
+                    if body != logs_body:
+                        logs_body = body
+                        self.publish('logs', body)
+            except Exception as e:
+                print(f"sse producer error: {e}")
+                time.sleep(1)
+
+_hub = EventHub()
+
+@app.route('/api/stream')
+def api_stream():
+    """
+    SSE-Stream (EventSource) mit den Topics ?topics=status,node,logs
+    (Default status). 503, wenn schon max_clients (SSE_MAX_CLIENTS) verbunden sind –
+    die Seiten fallen dann auf Polling zurück.
+    """
+    topics = {t for t in (request.args.get('topics') or 'status').split(',') if t in SSE_TOPICS}
+    if not topics:
+        return jsonify({'error': 'unknown topics', 'topics': list(SSE_TOPICS)}), 400
+    q = _hub.subscribe(topics)
+    if q is None:
+        return jsonify({'error': 'too many stream clients'}), 503
+
+    def gen():
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    yield q.get(timeout=SSE_HEARTBEAT_SEC)
+                except queue.Empty:
+                    yield b": keepalive\n\n"
+        finally:
+            _hub.unsubscribe(q)
+
+    resp = app.response_class(gen(), mimetype='text/event-stream')
+    resp.headers['Cache-Control'] = 'no-cache'
+    resp.headers['X-Accel-Buffering'] = 'no'
+    return resp
 
 
 @app.route('/api/mesh-config', methods=['GET'])
@@ -646,11 +1278,30 @@ def api_node_status():
     """
     Für index.html (Mesh Status) – liefert Node- und Peer-Infos.
     """
-    return jsonify({
-        'hostname': socket.gethostname(),
-        'node_status': read_node_status(),
-        'peer_discovery': read_peer_discovery()
-    })
+    def build(data):
+        return json.dumps({
+            'hostname': socket.gethostname(),
+            'node_status': data.get('nodes', {}),
+            'peer_discovery': read_peer_discovery()
+        }).encode()
+    try:
+        body, etag = _status.body('node-status', build, socket.gethostname())
+    except Exception as e:
+        print(f"Error reading node_status.json: {e}")
+        body, etag = build({}), None
+    return json_response(body, etag)
+
+@app.route('/api/status')
+def api_status():
+    """Kompletter Monitor-Status, Body unverändert aus dem Status-Cache"""
+    try:
+        key, _, body = _status.get()
+    except Exception as e:
+        return jsonify({'error': f'status not available: {e}'}), 503
+    resp = json_response(body, StatusCache.etag(key))
+    if key[0] == 'shm':
+        resp.headers['X-Status-Version'] = str(key[1])
+    return resp
 
 @app.route('/api/packet-logs')
 def api_packet_logs():
@@ -707,8 +1358,8 @@ def api_dhcp_config():
     return jsonify(success=ok, message=msg if ok else None, error=None if ok else msg)
 
 
-@app.route('/api/dhcp-leases')
-def api_dhcp_leases():
+def dhcp_leases_payload():
+    """Ohne Tracker: Lease-Datei, `ip neigh` und Station-Dump pro Aufruf"""
     leases = read_dhcp_leases()
     now = int(datetime.now().timestamp())
 
@@ -734,17 +1385,202 @@ def api_dhcp_leases():
                 l["adapter"] = "?"
             active_leases.append(l)
 
-    return jsonify({
+    return {
         "leases": leases,                # alle
         "active_leases": active_leases,  # nur aktive
         "active_clients": len(active_macs),
+    }
+
+_leases_body = (None, b'', None)       # (key, body, etag), atomar ersetzt
+
+@app.route('/api/dhcp-leases')
+def api_dhcp_leases():
+    """
+    Leases + aktive Clients. Mit LeaseTracker (inotify + Netlink-Events) ist
+    das Ergebnis vorberechnet: Body und ETag nur bei neuer Tracker-Version
+    neu serialisiert, sonst O(1).
+    """
+    global _leases_body
+    if _lease_tracker is not None and _lease_tracker.start().running():
+        version, payload = _lease_tracker.snapshot()
+        key = (version, socket.gethostname())
+        cached = _leases_body
+        if cached[0] != key:
+            body = json.dumps({**payload, "hostname": key[1], "local_mac": get_local_mac()}).encode()
+            cached = _leases_body = (key, body, body_etag(body))
+        return json_response(cached[1], cached[2])
+
+    return jsonify({
+        **dhcp_leases_payload(),
         "hostname": socket.gethostname(),
         "local_mac": get_local_mac(),
     })
 
 
+@app.route('/api/alfred/<int:data_type>')
+def api_alfred(data_type):
+    """ALFRED-Datensätze eines Typs (z. B. 64 = Hostnames) direkt über alfred.sock"""
+    if AlfredClient is None:
+        return jsonify({'error': 'alfred_client not available'}), 500
+    if not 0 <= data_type <= 255:
+        return jsonify({'error': 'invalid type'}), 400
+    try:
+        records = AlfredClient().request(data_type)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 503
+    return jsonify({
+        'type': data_type,
+        'records': [{'mac': r.mac, 'version': r.version,
+                     'value': r.data.decode('utf-8', 'replace').rstrip('\x00\n\r')}
+                    for r in records],
+    })
+
+@app.route('/api/history')
+@app.route('/api/history/<mac>')
+def api_history(mac=None):
+    """Verlauf + Raten pro Nachbar aus dem RAM des OGM-Monitors (?since=<unix ts>)"""
+    if query_history is None:
+        return jsonify({'error': 'history module not available'}), 500
+    try:
+        since = float(request.args.get('since', 0) or 0)
+    except ValueError:
+        return jsonify({'error': 'invalid since'}), 400
+    try:
+        data = query_history(mac, since)
+    except Exception as e:
+        return jsonify({'error': f'ogm-monitor not reachable: {e}'}), 503
+    return jsonify(data), (404 if data.get('error') == 'unknown mac' else 200)
+
+@app.route('/api/timeseries')
+@app.route('/api/timeseries/<mac>')
+@app.route('/api/timeseries/<mac>/<metric>')
+def api_timeseries(mac=None, metric=None):
+    """
+    Langzeitverlauf aus tsdb (?from=&to= unix ts, Default letzte Stunde;
+    ?points=300), serverseitig auf min/max/avg-Buckets reduziert.
+    Ohne metric: verfügbare Serien bzw. Metriken.
+    """
+    if _tsdb is None:
+        return jsonify({'error': 'tsdb module not available'}), 500
+    if mac is None:
+        return jsonify({'series': _tsdb.list_series()})
+    if metric is None:
+        return jsonify({'series': mac, 'metrics': _tsdb.list_metrics(mac)})
+    now = time.time()
+    try:
+        end = float(request.args.get('to') or now)
+        start = float(request.args.get('from') or end - 3600)
+        points = min(int(request.args.get('points') or 300), 2000)
+    except ValueError:
+        return jsonify({'error': 'invalid from/to/points'}), 400
+    if start >= end or points < 1:
+        return jsonify({'error': 'empty range'}), 400
+    if metric not in _tsdb.list_metrics(mac):
+        return jsonify({'error': 'unknown series/metric', 'series': mac, 'metric': metric}), 404
+    return jsonify(_tsdb.query(mac, metric, start, end, points))
+
+@app.route('/api/status/wait')
+def api_status_wait():
+    """
+    Long-Poll: liefert den Status-Snapshot, sobald eine Version > ?version=
+    erscheint (max. ?timeout= s, Default 25), sonst 204. Version im Header
+    X-Status-Version; Body unverändert aus Shared Memory. Begrenzt durch
+    _long_polls.
+    """
+    if _snapshot is None:
+        return jsonify({'error': 'snapshot module not available'}), 500
+    try:
+        after, timeout = long_poll_args()
+    except ValueError:
+        return jsonify({'error': 'invalid version/timeout'}), 400
+    poll = _long_polls.poll_sec
+    snap, busy = _long_polls.wait(lambda v, t: _snapshot.wait(v, t, poll), after, timeout)
+    if snap is None:
+        return no_change(busy)
+    resp = app.response_class(snap.data, mimetype='application/json')
+    resp.headers['X-Status-Version'] = str(snap.version)
+    resp.headers['Cache-Control'] = 'no-store'
+    return resp
+
+_topology_cache = {'key': None, 'raw': b'', 'topo': None}
+
+def load_topology():
+    """(raw JSON, Topology) aus topology.json, neu geladen nur wenn sich die Datei ändert"""
+    st = os.stat(TOPOLOGY_FILE)
+    key = (st.st_ino, st.st_mtime_ns, st.st_size)
+    c = _topology_cache
+    if c['key'] != key:
+        with open(TOPOLOGY_FILE, 'rb') as f:
+            raw = f.read()
+        c.update(key=key, raw=raw, topo=Topology.from_dict(json.loads(raw)))
+    return c['raw'], c['topo']
+
+@app.route('/api/topology')
+def api_topology():
+    """
+    Mesh-Graph des OGM-Monitors: kompakt (nodes + links [src, dst, metric, kind])
+    oder mit ?format=adjacency als {src: {dst: metric}}.
+    """
+    if Topology is None:
+        return jsonify({'error': 'topology module not available'}), 500
+    try:
+        raw, topo = load_topology()
+    except (OSError, ValueError) as e:
+        return jsonify({'error': f'topology not available: {e}'}), 503
+    if request.args.get('format') == 'adjacency':
+        return jsonify({'version': topo.version, 'local': topo.local, 'adjacency': topo.adjacency()})
+    return app.response_class(raw, mimetype='application/json')
+
+@app.route('/api/topology/path')
+def api_topology_path():
+    """?dst=<mac>[&src=<mac>, Default: dieser Knoten][&kind=tput|tq] -> Hops, Pfad, Engpass"""
+    if Topology is None:
+        return jsonify({'error': 'topology module not available'}), 500
+    try:
+        _, topo = load_topology()
+    except (OSError, ValueError) as e:
+        return jsonify({'error': f'topology not available: {e}'}), 503
+    dst = (request.args.get('dst') or '').lower()
+    src = (request.args.get('src') or topo.local).lower()
+    kind = request.args.get('kind') or None
+    if not dst:
+        return jsonify({'error': 'missing dst'}), 400
+    if kind is not None and kind not in LINK_KINDS:
+        return jsonify({'error': 'unknown kind', 'kinds': list(LINK_KINDS)}), 400
+    for mac in (src, dst):
+        if mac not in topo.nodes:
+            return jsonify({'error': 'unknown node', 'mac': mac}), 404
+    # Engpass nur über Links einer Art (Mbit/s bzw. TQ), nie gemischt
+    bottleneck, widest, kind = topo.bottleneck(src, dst, kind)
+    return jsonify({'src': src, 'dst': dst, 'version': topo.version,
+                    'hops': topo.hops(src, dst), 'path': topo.path(src, dst),
+                    'bottleneck': bottleneck, 'bottleneck_kind': kind, 'widest_path': widest,
+                    'via': topo.nodes[dst].get('via')})
+
+OGM_STATS_FILE = '/run/ogm_monitor/stats.json'
+OGM_PROFILE_FILE = '/run/ogm_monitor/profile.txt'
+
+@app.route('/api/ogm-stats')
+def api_ogm_stats():
+    """Tick-/Collector-Histogramme des OGM-Monitors; ?profile=1 -> letzter SIGUSR1-Profilbericht"""
+    path = OGM_PROFILE_FILE if request.args.get('profile') else OGM_STATS_FILE
+    try:
+        with open(path) as f:
+            body = f.read()
+    except OSError as e:
+        return jsonify({'error': f'{path} not available: {e.strerror}'}), 404
+    mimetype = 'text/plain' if path == OGM_PROFILE_FILE else 'application/json'
+    return app.response_class(body, mimetype=mimetype)
+
 @app.route('/api/node-info')
 def api_node_info():
+    """
+    Statische Infos (OS, Kernel, Versionen) aus dem Cache, dynamische
+    (Load, Speicher, Uptime, IPs) frisch; ?refresh=1 ermittelt die
+    statischen im Hintergrund neu.
+    """
+    if request.args.get('refresh') == '1':
+        _node_static.refresh()
     return jsonify(gather_node_info())
 
 @app.route('/api/wifi-ssid', methods=['GET'])
@@ -789,7 +1625,7 @@ def api_restart_service():
             return jsonify({'error':'missing service name'}), 400
         if name not in ALLOWED_SERVICES:
             return jsonify({'error':'service not allowed'}), 403
-        r = subprocess.run(['sudo','systemctl','restart', name], capture_output=True, text=True)
+        r = restart_service(name)
         if r.returncode != 0:
             return jsonify({'error':'failed to restart', 'stderr': r.stderr}), 500
         return jsonify({'success': True})
@@ -817,6 +1653,83 @@ def api_network_status():
     })
 
 
+# Webserver: `python3 app.py` startet waitress mit festem Thread-Pool (Profil aus
+# MESH_MONITOR_PROFILE, Default auto = lowmem unter LOWMEM_MAX_MB RAM). Jeder
+# SSE-Stream belegt einen Thread für seine ganze Dauer, daher threads + sse_clients.
+# Long-Polls laufen in den Request-Threads: höchstens long_polls gleichzeitig, je
+# max. long_poll_sec, damit immer Threads für normale Anfragen frei bleiben.
+# Der Flask-Dev-Server (Debugger, Reloader) nur mit --debug bzw. MESH_MONITOR_DEBUG=1.
+WEB_HOST = os.environ.get('MESH_MONITOR_HOST', '0.0.0.0')
+WEB_PORT = int(os.environ.get('MESH_MONITOR_PORT', '5000'))
+LOWMEM_MAX_MB = 1024
+WEB_PROFILES = {
+    #           Request-Threads, SSE-Clients, offene Verbindungen, Keep-Alive/Idle-Timeout (s),
+    #           gleichzeitige Long-Polls, max. Wartezeit (s), Poll-Takt Shared Memory (s)
+    'default': {'threads': 6, 'sse_clients': 16, 'connection_limit': 64, 'channel_timeout': 60,
+                'long_polls': 4, 'long_poll_sec': 60, 'long_poll_interval': 0.05},
+    'lowmem':  {'threads': 3, 'sse_clients': 6,  'connection_limit': 24, 'channel_timeout': 30,
+                'long_polls': 1, 'long_poll_sec': 20, 'long_poll_interval': 0.1},
+}
+
+def _mem_total_mb():
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemTotal:'):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+def web_profile(name='auto'):
+    if name == 'auto':
+        mem = _mem_total_mb()
+        name = 'lowmem' if 0 < mem < LOWMEM_MAX_MB else 'default'
+    if name not in WEB_PROFILES:
+        raise SystemExit(f"unknown profile {name!r} (auto, {', '.join(WEB_PROFILES)})")
+    return name, WEB_PROFILES[name]
+
+def serve(profile='auto', host=WEB_HOST, port=WEB_PORT, debug=False):
+    if debug:
+        print("mesh-monitor: Flask development server (debug)", flush=True)
+        app.run(host=host, port=port, debug=True, threaded=True)
+        return
+    name, cfg = web_profile(profile)
+    _hub.max_clients = cfg['sse_clients']
+    _long_polls.configure(cfg['long_polls'], cfg['long_poll_sec'], cfg['long_poll_interval'])
+    try:
+        from waitress import serve as waitress_serve
+    except ImportError:
+        waitress_serve = None
+    if waitress_serve is None:
+        # ohne waitress: Werkzeug ohne Debugger/Reloader, aber ein Thread pro Verbindung
+        print("mesh-monitor: waitress not installed (apt install python3-waitress), "
+              "falling back to the Werkzeug server", flush=True)
+        app.run(host=host, port=port, debug=False, threaded=True)
+        return
+    threads = cfg['threads'] + cfg['sse_clients']
+    print(f"mesh-monitor: waitress on {host}:{port} | profile {name} | threads {threads} "
+          f"({cfg['threads']} + {cfg['sse_clients']} SSE) | long-polls {cfg['long_polls']} "
+          f"| connections {cfg['connection_limit']}",
+          flush=True)
+    waitress_serve(app, host=host, port=port, threads=threads,
+                   connection_limit=cfg['connection_limit'],
+                   channel_timeout=cfg['channel_timeout'],
+                   cleanup_interval=min(30, cfg['channel_timeout']),
+                   backlog=64, ident='mesh-monitor')
+
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True, threaded=True)
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Mesh monitor web interface.")
+    ap.add_argument('--profile', default=os.environ.get('MESH_MONITOR_PROFILE', 'auto'),
+                    help=f"auto, {', '.join(WEB_PROFILES)}")
+    ap.add_argument('--host', default=WEB_HOST)
+    ap.add_argument('--port', type=int, default=WEB_PORT)
+    ap.add_argument('--debug', action='store_true',
+                    default=os.environ.get('MESH_MONITOR_DEBUG') == '1',
+                    help="Flask development server with debugger and reloader")
+    args = ap.parse_args()
+    serve(args.profile, args.host, args.port, args.debug)
 
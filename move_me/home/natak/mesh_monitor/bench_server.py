@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Flask dev server vs. waitress profiles
+-------------------------------------------------
+Starts app.py once per mode on a local port, then lets --clients concurrent
+keep-alive clients poll the UI endpoints for --duration seconds and reports
+
+- throughput (requests/s) and latency p50 / p99
+- errors (status >= 500 or connection failures)
+- peak RSS and thread count of the server process tree, sampled during the
+  run (the debug server's reloader runs a second process, both are counted)
+
+Modes:
+    dev       python3 app.py --debug          (the old start_monitor.sh setup)
+    default   python3 app.py --profile default  (waitress)
+    lowmem    python3 app.py --profile lowmem   (waitress)
+
+    python3 bench_server.py
+    python3 bench_server.py --modes dev lowmem --clients 16 --duration 30
+"""
+
+import argparse
+import http.client
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Tuple
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+MODES = {
+    "dev":     ["--debug"],
+    "default": ["--profile", "default"],
+    "lowmem":  ["--profile", "lowmem"],
+}
+PATHS = ("/api/wifi", "/api/node-info", "/api/dhcp-leases", "/api/node-status", "/")
+
+
+def _children() -> Dict[int, List[int]]:
+    tree: Dict[int, List[int]] = {}
+    for d in os.listdir("/proc"):
+        if not d.isdigit():
+            continue
+        try:
+            with open(f"/proc/{d}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        tree.setdefault(ppid, []).append(int(d))
+    return tree
+
+
+def tree_usage(pid: int) -> Tuple[int, int]:
+    """(RSS kB, threads) of pid and all descendants."""
+    tree, todo, rss, threads = _children(), [pid], 0, 0
+    while todo:
+        p = todo.pop()
+        todo.extend(tree.get(p, ()))
+        try:
+            with open(f"/proc/{p}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        rss += int(line.split()[1])
+                    elif line.startswith("Threads:"):
+                        threads += int(line.split()[1])
+        except OSError:
+            pass
+    return rss, threads
+
+
+def wait_ready(port: int, timeout: float = 30.0) -> None:
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        try:
+            c = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            c.request("GET", "/api/node-info")
+            c.getresponse().read()
+            c.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit(f"server on port {port} did not come up")
+
+
+def client(port: int, end: float, lat: List[float], errors: List[int]) -> None:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    i = 0
+    while time.monotonic() < end:
+        path = PATHS[i % len(PATHS)]
+        i += 1
+        t0 = time.perf_counter()
+        try:
+            conn.request("GET", path, headers={"Accept-Encoding": "gzip"})
+            r = conn.getresponse()
+            r.read()
+            if r.status >= 500:
+                errors[0] += 1
+            if r.getheader("Connection", "").lower() == "close":
+                conn.close()
+        except (OSError, http.client.HTTPException):
+            errors[0] += 1
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+            continue
+        lat.append(time.perf_counter() - t0)
+    conn.close()
+
+
+def run_mode(mode: str, port: int, clients: int, duration: float) -> Dict[str, float]:
+    env = dict(os.environ, MESH_MONITOR_PORT=str(port), MESH_MONITOR_HOST="127.0.0.1")
+    env.pop("MESH_MONITOR_DEBUG", None)
+    proc = subprocess.Popen([sys.executable, APP, *MODES[mode]], env=env, start_new_session=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                            cwd=os.path.dirname(APP))
+    try:
+        wait_ready(port)
+        idle_rss, _ = tree_usage(proc.pid)
+        lat: List[float] = []
+        errors = [0]
+        end = time.monotonic() + duration
+        workers = [threading.Thread(target=client, args=(port, end, lat, errors)) for _ in range(clients)]
+        for w in workers:
+            w.start()
+        peak_rss = peak_threads = 0
+        while any(w.is_alive() for w in workers):
+            rss, threads = tree_usage(proc.pid)
+            peak_rss, peak_threads = max(peak_rss, rss), max(peak_threads, threads)
+            time.sleep(0.25)
+        for w in workers:
+            w.join()
+    finally:
+        os.killpg(proc.pid, signal.SIGTERM)
+        proc.wait(10)
+    lat.sort()
+    n = len(lat)
+    return {"requests": n, "rps": n / duration, "errors": errors[0],
+            "p50_ms": lat[n // 2] * 1000 if n else 0.0,
+            "p99_ms": lat[min(n - 1, int(n * 0.99))] * 1000 if n else 0.0,
+            "idle_rss_mb": idle_rss / 1024, "peak_rss_mb": peak_rss / 1024, "threads": peak_threads}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    ap.add_argument("--clients", type=int, default=8)
+    ap.add_argument("--duration", type=float, default=20.0)
+    ap.add_argument("--port", type=int, default=5099)
+    args = ap.parse_args()
+
+    print(f"{'mode':>8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} "
+          f"{'idle MB':>8} {'peak MB':>8} {'threads':>8}")
+    for mode in args.modes:
+        r = run_mode(mode, args.port, args.clients, args.duration)
+        print(f"{mode:>8} {r['rps']:>8.1f} {r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['errors']:>7} "
+              f"{r['idle_rss_mb']:>8.1f} {r['peak_rss_mb']:>8.1f} {r['threads']:>8}")
+
+
+if __name__ == "__main__":
+    main()
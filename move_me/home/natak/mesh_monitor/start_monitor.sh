@@ -26,7 +26,11 @@ echo "Additional wait before network restart..."
 
 # Restart systemd-networkd to ensure hostapd can hand out DHCP addresses
 echo "Restarting systemd-networkd for hostapd DHCP..."
-sudo systemctl restart systemd-networkd
+if [ "$(id -u)" -eq 0 ]; then
+    systemctl restart systemd-networkd
+else
+    python3 /home/natak/mesh/ogm_monitor/privhelper.py --call restart_service service=systemd-networkd
+fi
 
 # Wait for systemd-networkd to settle
 #sleep 1
@@ -34,6 +38,9 @@ sudo systemctl restart systemd-networkd
 # Change to mesh_monitor directory
 cd /home/natak/mesh_monitor
 
-# Start Flask app in foreground
-echo "Starting Flask app on port 5000..."
-python3 app.py
+# Start web app in foreground: waitress with a bounded thread pool.
+# MESH_MONITOR_PROFILE=auto|default|lowmem (auto = lowmem below 1 GB RAM),
+# MESH_MONITOR_DEBUG=1 for the Flask development server (debugger, reloader).
+export MESH_MONITOR_PROFILE="${MESH_MONITOR_PROFILE:-auto}"
+echo "Starting web app on port 5000 (profile $MESH_MONITOR_PROFILE)..."
+exec python3 app.py
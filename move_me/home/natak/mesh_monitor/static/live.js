@@ -0,0 +1,32 @@
+// Live-Daten für die Seiten: Server-Sent Events von /api/stream (Push, sobald
+// der Server etwas Neues hat), Rückfall auf Polling von `url`, wenn der
+// Browser kein EventSource kann oder der Stream nicht verfügbar ist (z. B. 503).
+function liveData(topic, url, render, pollMs) {
+  let polling = false;
+
+  function poll() {
+    polling = true;
+    // no-cache: Browser revalidiert per ETag, unveränderte Daten kommen als 304
+    fetch(url, { cache: 'no-cache' })
+      .then(r => r.json())
+      .then(render)
+      .catch(() => {})
+      .finally(() => setTimeout(poll, pollMs));
+  }
+
+  if (!window.EventSource) { poll(); return; }
+
+  const es = new EventSource('/api/stream?topics=' + encodeURIComponent(topic));
+  let connected = false;
+  es.addEventListener(topic, e => {
+    connected = true;
+    try { render(JSON.parse(e.data)); } catch (err) { console.error(err); }
+  });
+  es.onerror = () => {
+    // nie verbunden oder endgültig geschlossen -> Polling; sonst verbindet EventSource selbst neu
+    if (!polling && (!connected || es.readyState === EventSource.CLOSED)) {
+      es.close();
+      poll();
+    }
+  };
+}